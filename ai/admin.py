@@ -1,10 +1,32 @@
 from django.contrib import admin
 
-from ai.models import AnalysisSession
+from ai.models import IN_FLIGHT_STATUSES, AnalysisLane, AnalysisSession, ArchivedSession
+from ai.services.analysis import create_or_reset_analysis_session
 
 
 @admin.register(AnalysisSession)
 class AnalysisSessionAdmin(admin.ModelAdmin):
-    list_display = ("id", "review_session", "status", "created_at")
-    list_filter = ("status",)
+    list_display = ("id", "review_session", "status", "lane", "attempts", "lease_expires_at", "created_at")
+    list_filter = ("status", "lane")
     search_fields = ("id", "review_session__id")
+    actions = ("rerun",)
+
+    @admin.action(description="Re-run selected analyses (bulk queue)")
+    def rerun(self, request, queryset):
+        # Bulk lane: these wait behind interactive work instead of delaying it.
+        count = 0
+        for analysis in queryset.exclude(status__in=IN_FLIGHT_STATUSES).select_related("review_session").iterator():
+            create_or_reset_analysis_session(
+                raw_answers=analysis.raw_answers,
+                review_session=analysis.review_session,
+                session_id=analysis.id,
+                lane=AnalysisLane.BULK,
+            )
+            count += 1
+        self.message_user(request, f"Queued {count} analyses on the bulk queue.")
+
+
+@admin.register(ArchivedSession)
+class ArchivedSessionAdmin(admin.ModelAdmin):
+    list_display = ("id", "path", "archived_at")
+    search_fields = ("id",)
@@ -1,36 +1,97 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import re
 from typing import Any
+from urllib.parse import parse_qs
 
+import orjson
 from channels.db import database_sync_to_async
+from channels.exceptions import StopConsumer
+from channels.generic.http import AsyncHttpConsumer
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
-from ai.models import AnalysisSession
+from ai.models import AnalysisSessionStatus
 from ai.serializers import CreateAnalysisSerializer
-from ai.services.analysis import collect_answers_for_review_session, create_or_reset_analysis_session
+from ai.services.analysis import (
+    collect_answers_for_review_session,
+    aget_status_snapshot,
+    create_or_reset_analysis_session,
+)
+from ai.services.events import areplay, group_name
+from core.fanout import FrameConsumerMixin, frame_bytes
+from core.sockets import GovernedSocketMixin, SocketTicket, client_ip, registry
 from review.models import ReviewSession
 
 logger = logging.getLogger(__name__)
 
+# Frames are orjson-encoded dicts whose first key is "type", after the
+# optional "seq" stamp, so the event name is read without parsing the body.
+_FRAME_TYPE = re.compile(rb'^\{(?:"seq":\d+,)?"type":"([a-z_]+)"')
+# Reconnect delay suggested to EventSource, in milliseconds.
+_SSE_RETRY_MS = 3000
+_TERMINAL_STATUSES = {AnalysisSessionStatus.SUCCEEDED, AnalysisSessionStatus.FAILED}
+_SSE_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache, no-transform"),
+    (b"x-accel-buffering", b"no"),
+]
 
-class AnalysisConsumer(AsyncJsonWebsocketConsumer):
+
+def sse_event(data: bytes, seq: int | None = None) -> bytes:
+    match = _FRAME_TYPE.match(data)
+    head = b"event: " + (match.group(1) if match else b"message") + b"\n"
+    if seq is not None:
+        head = b"id: %d\n" % seq + head
+    return head + b"data: " + data + b"\n\n"
+
+
+def _ends_run(data: bytes) -> bool | None:
     """
-    Websocket channel that streams analysis progress/results.
+    True for a frame after which nothing more is pushed for the run, False
+    for one that shows a run (re)starting, None for anything else.
+    """
+
+    match = _FRAME_TYPE.match(data)
+    kind = match.group(1) if match else None
+    if kind in (b"result", b"result_ready", b"error"):
+        return True
+    if kind == b"status":
+        return orjson.loads(data).get("status") in _TERMINAL_STATUSES
+    return None
+
+
+class AnalysisConsumer(GovernedSocketMixin, FrameConsumerMixin, AsyncJsonWebsocketConsumer):
+    """
+    Websocket channel that streams analysis progress/results. Events arrive
+    pre-encoded (``ws_frame``); the typed handlers below accept the older
+    dict messages.
+
+    Connecting with ``?last_seq=<n>`` replays the events after ``n`` from
+    the event log instead of sending the status snapshot, as long as the log
+    still holds all of them.
+
+    Once the run has finished the socket is reaped after WS_IDLE_TIMEOUT
+    seconds without client messages.
     """
 
+    socket_kind = "analysis"
     group_name: str
     session_key: str
 
     async def connect(self) -> None:
         self.session_key = str(self.scope["url_route"]["kwargs"]["session_id"])
         self.session_id = self.session_key  # for backwards compatibility with existing logic
-        self.group_name = f"analysis_{self.session_key}"
+        self.group_name = group_name(self.session_key)
+        if not await self.admit(self.group_name):
+            return
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
-        await self._send_current_status()
+        await self._resume(self._requested_last_seq())
 
     async def disconnect(self, code: int) -> None:
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
@@ -53,8 +114,14 @@ class AnalysisConsumer(AsyncJsonWebsocketConsumer):
             await self.send_json({"type": "error", "message": str(exc)})
             return
 
+        self.mark_done(False)
         await self.send_json({"type": "accepted", "session_id": str(analysis.id)})
 
+    async def write_frame(self, event: dict[str, Any], seq: int | None) -> None:
+        data = frame_bytes(event)
+        self._track(data)
+        await self.send(text_data=data.decode("utf-8"))
+
     async def progress(self, event: dict[str, Any]) -> None:
         await self.send_json({"type": "progress", "step": event.get("step")})
 
@@ -88,34 +155,36 @@ class AnalysisConsumer(AsyncJsonWebsocketConsumer):
             return None
         return json.loads(text_data)
 
-    async def _send_current_status(self) -> None:
-        snapshot = await self._get_status_snapshot()
-        await self.send_json(snapshot)
+    async def _resume(self, after: int | None) -> None:
+        # Call with the group joined, so no event falls between the log
+        # read and the live stream; duplicates are dropped by seq.
+        head, missed = await areplay(self.session_key, after)
+        if missed is None:
+            await self._send_current_status(head)
+        else:
+            for _, payload in missed:
+                self._track(payload)
+                await self.send(text_data=payload.decode("utf-8"))
+        self.last_seq = max(self.last_seq, head or 0)
 
-    @database_sync_to_async
-    def _get_status_snapshot(self) -> dict[str, Any]:
+    def _track(self, data: bytes) -> None:
+        ends = _ends_run(data)
+        if ends is not None:
+            self.mark_done(ends)
+
+    def _requested_last_seq(self) -> int | None:
+        query = parse_qs(self.scope.get("query_string", b"").decode("latin-1"))
         try:
-            session = AnalysisSession.objects.get(review_session_id=self.session_key)
-        except AnalysisSession.DoesNotExist:
-            try:
-                session = AnalysisSession.objects.get(id=self.session_key)
-            except AnalysisSession.DoesNotExist:
-                review_exists = ReviewSession.objects.filter(id=self.session_key).exists()
-                return {
-                    "type": "status",
-                    "status": "not_completed" if review_exists else "not_found",
-                    "session_id": None,
-                    "review_session_id": self.session_key,
-                }
-
-        return {
-            "type": "status",
-            "status": session.status,
-            "session_id": str(session.id),
-            "review_session_id": str(session.review_session_id) if session.review_session_id else None,
-            "error": session.error,
-            "result": session.dashboard_json,
-        }
+            return max(0, int(query["last_seq"][0]))
+        except (KeyError, ValueError):
+            return None
+
+    async def _send_current_status(self, seq: int | None = None) -> None:
+        snapshot = await aget_status_snapshot(self.session_key)
+        if seq is not None:
+            snapshot = {**snapshot, "seq": seq}
+        self.mark_done(snapshot.get("status") in _TERMINAL_STATUSES)
+        await self.send_json(snapshot)
 
     @database_sync_to_async
     def _start_analysis(self, data: dict[str, Any]):
@@ -143,3 +212,84 @@ class AnalysisConsumer(AsyncJsonWebsocketConsumer):
             session_id=self.session_key,
         )
         return analysis
+
+
+class AnalysisEventsConsumer(FrameConsumerMixin, AsyncHttpConsumer):
+    """
+    Server-Sent Events counterpart of AnalysisConsumer for clients that only
+    listen (``GET /api/ai/<id>/events/``). Each group frame is written
+    unchanged as the ``data`` of an event named after its ``type``, with its
+    ``seq`` as the event id; ``Last-Event-ID`` (or ``?last_event_id=``) on
+    reconnect follows the ``?last_seq=`` rules above.
+
+    Routed ahead of Django like the websocket consumers, so an idle stream
+    holds no request thread or middleware state. Comment lines every
+    SSE_HEARTBEAT_INTERVAL seconds keep it open through HTTP/1.1 proxies.
+    Streams count against the core.sockets caps like websockets.
+    """
+
+    socket_kind = "sse"
+    group_name: str | None = None
+    _ticket: SocketTicket | None = None
+    _heartbeat: asyncio.Task | None = None
+
+    async def http_request(self, message: dict[str, Any]) -> None:
+        # The stock consumer closes once handle() returns; a stream stays in
+        # the dispatch loop for group frames until the client disconnects.
+        if not message.get("more_body"):
+            await self.handle(b"")
+
+    async def handle(self, body: bytes) -> None:
+        if self.scope["method"] != "GET":
+            await self.send_response(405, b"", headers=[(b"allow", b"GET")])
+            raise StopConsumer()
+        session_key = str(self.scope["url_route"]["kwargs"]["session_id"])
+        self._ticket = registry.open(self.socket_kind, group_name(session_key), client_ip(self.scope))
+        if self._ticket is None:
+            # EventSource gives up on non-200 answers instead of retrying.
+            await self.send_response(429, b"Too many open streams.", headers=[(b"content-type", b"text/plain")])
+            raise StopConsumer()
+        self.group_name = group_name(session_key)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.send_headers(headers=_SSE_HEADERS)
+        after = self._last_event_id()
+        chunks = [b"retry: %d\n\n" % _SSE_RETRY_MS]
+        head, missed = await areplay(session_key, after)
+        if missed is None:
+            snapshot = await aget_status_snapshot(session_key)
+            if head is not None:
+                snapshot = {**snapshot, "seq": head}
+            chunks.append(sse_event(orjson.dumps(snapshot), head))
+        else:
+            chunks.extend(sse_event(payload, seq) for seq, payload in missed)
+        await self.send_body(b"".join(chunks), more_body=True)
+        self.last_seq = max(after or 0, head or 0)
+        self._heartbeat = asyncio.create_task(self._beat())
+
+    async def write_frame(self, event: dict[str, Any], seq: int | None) -> None:
+        await self.send_body(sse_event(frame_bytes(event), seq), more_body=True)
+
+    async def disconnect(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        if self._ticket is not None:
+            registry.close(self._ticket)
+            self._ticket = None
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SSE_HEARTBEAT_INTERVAL)
+            await self.send_body(b": heartbeat\n\n", more_body=True)
+
+    def _last_event_id(self) -> int | None:
+        value = dict(self.scope.get("headers", ())).get(b"last-event-id", b"").decode("latin-1")
+        if not value:
+            # EventSource polyfills that cannot set headers use the query.
+            query = parse_qs(self.scope.get("query_string", b"").decode("latin-1"))
+            value = query.get("last_event_id", [""])[0]
+        try:
+            return max(0, int(value))
+        except ValueError:
+            return None
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 02:09
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def lease_in_flight_rows(apps, schema_editor):
+    # Rows queued or running before this migration get a pickup window;
+    # whatever is still in flight afterwards is taken back by the sweeper.
+    AnalysisSession = apps.get_model("ai", "AnalysisSession")
+    AnalysisSession.objects.filter(status__in=("pending", "running")).update(
+        lease_expires_at=timezone.now() + timedelta(seconds=settings.ANALYSIS_PENDING_TIMEOUT)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0003_uuid7_primary_keys'),
+        ('review', '0004_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysissession',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analysissession',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='analysissession',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'running'))), fields=['created_at'], name='analysis_inflight_created'),
+        ),
+        migrations.AddIndex(
+            model_name='analysissession',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'running'))), fields=['lease_expires_at'], include=('id',), name='analysis_inflight_lease'),
+        ),
+        migrations.RunPython(lease_in_flight_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-19 02:13
+
+import core.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_analysis_leases'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analysissession',
+            name='ai_raw_response',
+            field=core.fields.CompressedTextField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='analysissession',
+            name='raw_answers',
+            field=core.fields.CompressedJSONField(),
+        ),
+    ]
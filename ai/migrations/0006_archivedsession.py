@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0005_compressed_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSession',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('path', models.CharField(max_length=512)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-19 02:45
+
+from django.db import migrations, models
+
+
+def queue_pending_rows(apps, schema_editor):
+    # Rows already waiting keep their place in line.
+    AnalysisSession = apps.get_model("ai", "AnalysisSession")
+    AnalysisSession.objects.filter(status="pending").update(queued_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0006_archivedsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysissession',
+            name='lane',
+            field=models.CharField(choices=[('interactive', 'Interactive'), ('repair', 'Repair'), ('bulk', 'Bulk')], default='interactive', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='analysissession',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analysissession',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='analysissession',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['lane', 'queued_at'], name='analysis_pending_queue'),
+        ),
+        migrations.RunPython(queue_pending_rows, migrations.RunPython.noop),
+    ]
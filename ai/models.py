@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import uuid
-
 from django.db import models
 
+from core.fields import CompressedJSONField, CompressedTextField
+from core.ids import uuid7
+
 
 class AnalysisSessionStatus(models.TextChoices):
     PENDING = "pending", "Pending"
@@ -12,12 +13,25 @@ class AnalysisSessionStatus(models.TextChoices):
     FAILED = "failed", "Failed"
 
 
+class AnalysisLane(models.TextChoices):
+    """
+    Who is waiting for a run; each lane has its own queue and workers.
+    """
+
+    INTERACTIVE = "interactive", "Interactive"
+    REPAIR = "repair", "Repair"
+    BULK = "bulk", "Bulk"
+
+
+IN_FLIGHT_STATUSES = (AnalysisSessionStatus.PENDING, AnalysisSessionStatus.RUNNING)
+
+
 class AnalysisSession(models.Model):
     """
     Stores the AI dashboard output for a review session.
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     review_session = models.OneToOneField(
         "review.ReviewSession",
         on_delete=models.SET_NULL,
@@ -26,22 +40,70 @@ class AnalysisSession(models.Model):
         related_name="analysis",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(
         max_length=16,
         choices=AnalysisSessionStatus.choices,
         default=AnalysisSessionStatus.PENDING,
     )
-    raw_answers = models.JSONField()
-    ai_raw_response = models.TextField(blank=True, default="")
+    raw_answers = CompressedJSONField()
+    ai_raw_response = CompressedTextField(blank=True, default="")
     dashboard_json = models.JSONField(null=True, blank=True)
     error = models.TextField(null=True, blank=True)
+    # While pending/running: when the sweeper may take the job back. A
+    # pending row gets ANALYSIS_PENDING_TIMEOUT to be picked up; a running
+    # row holds a lease of ANALYSIS_LEASE_SECONDS renewed by the worker.
+    # Cleared once the job finishes.
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    # Number of times a worker claimed the job; also fences out a worker
+    # whose lease was taken over.
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Lane the run was queued on and when; pending
+    # interactive rows in ``queued_at`` order are the line admission control
+    # reports positions in.
+    lane = models.CharField(max_length=16, choices=AnalysisLane.choices, default=AnalysisLane.INTERACTIVE)
+    queued_at = models.DateTimeField(null=True, blank=True)
+    # Set by each claim; with ``updated_at`` on finished rows it gives the
+    # recent run durations behind wait estimates.
+    started_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["-created_at"]),
+            # Partial indexes over the (small) in-flight set only, so the
+            # sweeper and queue views never touch the historical rows.
+            models.Index(
+                fields=["created_at"],
+                name="analysis_inflight_created",
+                condition=models.Q(status__in=IN_FLIGHT_STATUSES),
+            ),
+            models.Index(
+                fields=["lease_expires_at"],
+                name="analysis_inflight_lease",
+                include=["id"],
+                condition=models.Q(status__in=IN_FLIGHT_STATUSES),
+            ),
+            models.Index(
+                fields=["lane", "queued_at"],
+                name="analysis_pending_queue",
+                condition=models.Q(status=AnalysisSessionStatus.PENDING),
+            ),
         ]
         ordering = ("-created_at",)
 
     def __str__(self) -> str:
         return f"AnalysisSession({self.id}, status={self.status})"
+
+
+class ArchivedSession(models.Model):
+    """
+    Archive file holding a review or analysis session removed by retention.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    path = models.CharField(max_length=512)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"ArchivedSession({self.id}, path={self.path})"
@@ -6,6 +6,7 @@ from uuid import UUID
 from rest_framework import serializers
 
 from ai.models import AnalysisSession
+from core.serialization import FlatSerializer, as_datetime, as_str, field
 
 
 class AnswerItemSerializer(serializers.Serializer):
@@ -88,3 +89,17 @@ class AnalysisSessionSerializer(serializers.ModelSerializer):
 
     def get_review_session_id(self, obj: AnalysisSession) -> str | None:
         return str(obj.review_session_id) if obj.review_session_id else None
+
+
+# Flat counterpart of AnalysisSessionSerializer for the detail/create views;
+# works on instances and on ``.values()`` rows.
+flat_analysis_session = FlatSerializer(
+    field("id", as_str),
+    field("review_session_id", as_str),
+    field("status", as_str),
+    field("created_at", as_datetime),
+    field("raw_answers"),
+    field("dashboard_json"),
+    field("error", str),
+    field("ai_raw_response", str),
+)
@@ -0,0 +1,164 @@
+"""
+Admission control and queue positions for interactive analyses.
+
+Interactive runs wait in line as pending rows ordered by ``queued_at``. The
+wait ahead of a run is estimated from its place in that line, the number of
+interactive worker slots and the mean duration of recent runs. HTTP callers
+are shed (``AnalysisOverloaded``, answered with 503 and Retry-After) once
+the line or the estimate passes its limit; callers that cannot be asked to
+retry -- websocket clients, the audio pipeline -- are queued anyway.
+Waiting sessions get ``queued`` events with their position and ETA.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.db.models import DurationField, ExpressionWrapper, F
+
+from ai.models import AnalysisLane, AnalysisSession, AnalysisSessionStatus
+from ai.services import events
+from core.cache import ReadThroughCache
+
+# Recent finished runs averaged for the wait estimate.
+_RUN_SAMPLE = 50
+# Waiting sessions told their position per update round.
+_POSITION_UPDATE_LIMIT = 500
+
+run_time_cache = ReadThroughCache("analysis-run-time", timeout=30)
+
+
+@dataclass(slots=True, frozen=True)
+class QueueEstimate:
+    # 1-based place among waiting interactive runs.
+    position: int
+    eta_seconds: int
+
+
+class AnalysisOverloaded(Exception):
+    """
+    Raised instead of queueing an interactive run when the line is full.
+    ``payload`` is returned to the client with ``Retry-After``.
+    """
+
+    def __init__(self, estimate: QueueEstimate, retry_after: int) -> None:
+        super().__init__("Analysis is at capacity; try again later.")
+        self.estimate = estimate
+        self.retry_after = retry_after
+        self.payload = {
+            "detail": str(self),
+            "position": estimate.position,
+            "eta_seconds": estimate.eta_seconds,
+            "retry_after": retry_after,
+        }
+
+
+def _waiting():
+    return AnalysisSession.objects.filter(status=AnalysisSessionStatus.PENDING, lane=AnalysisLane.INTERACTIVE)
+
+
+def _load_mean_run_seconds() -> float | None:
+    durations = list(
+        AnalysisSession.objects.filter(status=AnalysisSessionStatus.SUCCEEDED, started_at__isnull=False)
+        .annotate(run=ExpressionWrapper(F("updated_at") - F("started_at"), output_field=DurationField()))
+        .order_by("-created_at")
+        .values_list("run", flat=True)[:_RUN_SAMPLE]
+    )
+    if not durations:
+        return None
+    return sum(duration.total_seconds() for duration in durations) / len(durations)
+
+
+def mean_run_seconds() -> float:
+    return run_time_cache.get("mean", _load_mean_run_seconds) or settings.ANALYSIS_DEFAULT_RUN_SECONDS
+
+
+def estimate(position: int, run_seconds: float | None = None) -> QueueEstimate:
+    """
+    Wait until the run at ``position`` finishes: the rounds of runs ahead of
+    it on ANALYSIS_INTERACTIVE_SLOTS workers, plus its own.
+    """
+
+    run_seconds = mean_run_seconds() if run_seconds is None else run_seconds
+    slots = max(1, settings.ANALYSIS_INTERACTIVE_SLOTS)
+    rounds = (max(position, 1) - 1) // slots + 1
+    return QueueEstimate(position=position, eta_seconds=math.ceil(rounds * run_seconds))
+
+
+def admit() -> QueueEstimate:
+    """
+    Estimate for a new interactive run, or ``AnalysisOverloaded`` when it
+    would exceed ANALYSIS_MAX_QUEUE or ANALYSIS_MAX_WAIT.
+    """
+
+    run_seconds = mean_run_seconds()
+    slots = max(1, settings.ANALYSIS_INTERACTIVE_SLOTS)
+    depth = _waiting().count()
+    queued = estimate(depth + 1, run_seconds)
+    limits = []
+    if settings.ANALYSIS_MAX_QUEUE:
+        limits.append(settings.ANALYSIS_MAX_QUEUE)
+    if settings.ANALYSIS_MAX_WAIT:
+        limits.append(max(1, int(settings.ANALYSIS_MAX_WAIT // run_seconds)) * slots)
+    if limits and depth >= min(limits):
+        # Time for the line to drain back under the limit.
+        excess = depth - min(limits) + 1
+        retry_after = max(1, math.ceil(math.ceil(excess / slots) * run_seconds))
+        raise AnalysisOverloaded(queued, retry_after)
+    return queued
+
+
+def position_of(instance: AnalysisSession) -> QueueEstimate | None:
+    if (
+        instance.status != AnalysisSessionStatus.PENDING
+        or instance.lane != AnalysisLane.INTERACTIVE
+        or instance.queued_at is None
+    ):
+        return None
+    ahead = _waiting().filter(queued_at__lt=instance.queued_at).count()
+    return estimate(ahead + 1)
+
+
+def queued_frame(instance: AnalysisSession, queued: QueueEstimate) -> dict[str, Any]:
+    return {
+        "type": "queued",
+        "session_id": str(instance.id),
+        "position": queued.position,
+        "eta_seconds": queued.eta_seconds,
+    }
+
+
+def publish_position(instance: AnalysisSession, queued: QueueEstimate) -> None:
+    # Positions go stale within seconds: not worth replaying on reconnect.
+    events.publish(
+        events.channel_key(instance.review_session_id, instance.id), queued_frame(instance, queued), log=False
+    )
+
+
+def publish_positions() -> int:
+    """
+    Tell the first waiting sessions where they stand; returns how many.
+    """
+
+    run_seconds = mean_run_seconds()
+    waiting = _waiting().order_by("queued_at").only("id", "review_session_id")[:_POSITION_UPDATE_LIMIT]
+    count = 0
+    for count, instance in enumerate(waiting, start=1):
+        publish_position(instance, estimate(count, run_seconds))
+    return count
+
+
+__all__ = [
+    "AnalysisOverloaded",
+    "QueueEstimate",
+    "admit",
+    "estimate",
+    "mean_run_seconds",
+    "position_of",
+    "publish_position",
+    "publish_positions",
+    "queued_frame",
+]
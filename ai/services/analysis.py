@@ -1,18 +1,30 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID
 
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
-from ai.models import AnalysisSession, AnalysisSessionStatus
-from review.models import ReviewAnswer, ReviewQuestion, ReviewSession
+from ai.models import AnalysisLane, AnalysisSession, AnalysisSessionStatus
+from ai.services import admission
+from ai.services.events import publish_status
+from core.cache import ReadThroughCache
+from core.db import get_asyncpg_pool
+from core.replicas import use_primary
+from jobs.services.queue import dispatch
+from review.models import AudioStatus, ReviewAnswer, ReviewQuestion, ReviewSession
 
 logger = logging.getLogger(__name__)
 
+# Keyed by whatever id a websocket client connected with: a review session
+# id or an analysis session id.
+status_snapshot_cache = ReadThroughCache("analysis-snapshot")
+
 
 def collect_answers_for_review_session(session: ReviewSession) -> dict[str, Any]:
     """
@@ -37,6 +49,10 @@ def collect_answers_for_review_session(session: ReviewSession) -> dict[str, Any]
             ) from exc
         answer_text = (answer.answer_text or "").strip()
         if not answer_text:
+            if answer.audio_status in (AudioStatus.PENDING, AudioStatus.PROCESSING):
+                raise ValueError(
+                    f"Audio answer for question {question.id} is still being transcribed."
+                )
             raise ValueError(f"Answer text missing for question {question.id}.")
         answers_payload.append(
             {
@@ -50,14 +66,64 @@ def collect_answers_for_review_session(session: ReviewSession) -> dict[str, Any]
     return {"session_id": str(session.id), "answers": answers_payload}
 
 
+def session_has_pending_audio(session: ReviewSession) -> bool:
+    """
+    True while any answer of the session is waiting for the audio pipeline.
+    """
+
+    return ReviewAnswer.objects.filter(
+        session=session,
+        audio_status__in=(AudioStatus.PENDING, AudioStatus.PROCESSING),
+    ).exists()
+
+
+# Queue setting and priority of each lane. Lower priorities run first, both
+# within a Celery queue and across queues on the PostgreSQL backend, whose
+# workers claim in priority order.
+_LANES = {
+    AnalysisLane.INTERACTIVE: ("ANALYSIS_INTERACTIVE_QUEUE", 0),
+    AnalysisLane.REPAIR: ("ANALYSIS_REPAIR_QUEUE", 3),
+    AnalysisLane.BULK: ("ANALYSIS_BULK_QUEUE", 9),
+}
+
+
+def pending_lease(lane: str = AnalysisLane.INTERACTIVE) -> datetime:
+    """
+    Deadline for a worker to pick up a freshly queued job.
+    """
+
+    if lane == AnalysisLane.BULK:
+        timeout = settings.ANALYSIS_BULK_PENDING_TIMEOUT
+    else:
+        timeout = settings.ANALYSIS_PENDING_TIMEOUT
+    return timezone.now() + timedelta(seconds=timeout)
+
+
+def queue_analysis(analysis_id: UUID | str, lane: str = AnalysisLane.INTERACTIVE) -> None:
+    """
+    Run the analysis in the background on its lane's queue and priority,
+    once the current transaction commits.
+    """
+
+    from ai.tasks import run_analysis
+
+    setting, priority = _LANES[lane]
+    dispatch(run_analysis, str(analysis_id), queue=getattr(settings, setting), priority=priority)
+
+
 def _reset_session_state(
-    instance: AnalysisSession, raw_answers: dict[str, Any], review_session: ReviewSession | None
+    instance: AnalysisSession,
+    raw_answers: dict[str, Any],
+    review_session: ReviewSession | None,
+    lease_expires_at: datetime,
 ) -> AnalysisSession:
     instance.raw_answers = raw_answers
     instance.status = AnalysisSessionStatus.PENDING
     instance.dashboard_json = None
     instance.ai_raw_response = ""
     instance.error = None
+    instance.lease_expires_at = lease_expires_at
+    instance.attempts = 0
     if review_session:
         instance.review_session = review_session
     instance.save(
@@ -67,10 +133,16 @@ def _reset_session_state(
             "dashboard_json",
             "ai_raw_response",
             "error",
+            "lease_expires_at",
+            "attempts",
             "review_session",
+            "lane",
+            "queued_at",
+            "updated_at",
         ]
     )
-    _send_status(instance)
+    invalidate_status_snapshot(instance)
+    publish_status(instance)
     return instance
 
 
@@ -79,11 +151,18 @@ def create_or_reset_analysis_session(
     raw_answers: dict[str, Any],
     review_session: ReviewSession | None = None,
     session_id: UUID | None = None,
+    lane: str = AnalysisLane.INTERACTIVE,
+    shed: bool = False,
 ) -> tuple[AnalysisSession, bool]:
     """
-    Create a new AnalysisSession or reset an existing one with fresh answers.
+    Create a new AnalysisSession or reset an existing one with fresh answers,
+    and queue it on ``lane``. With ``shed`` an interactive run is refused
+    with ``AnalysisOverloaded`` while the queue is full.
     """
 
+    if shed and lane == AnalysisLane.INTERACTIVE:
+        admission.admit()
+
     existing = None
     if review_session:
         try:
@@ -93,6 +172,8 @@ def create_or_reset_analysis_session(
         if existing:
             session_id = session_id or existing.id
 
+    lease_expires_at = pending_lease(lane)
+    queued_at = timezone.now()
     with transaction.atomic():
         if session_id:
             instance, created = AnalysisSession.objects.select_for_update().update_or_create(
@@ -101,6 +182,10 @@ def create_or_reset_analysis_session(
                     "review_session": review_session,
                     "raw_answers": raw_answers,
                     "status": AnalysisSessionStatus.PENDING,
+                    "lease_expires_at": lease_expires_at,
+                    "attempts": 0,
+                    "lane": lane,
+                    "queued_at": queued_at,
                 },
             )
         elif review_session:
@@ -109,12 +194,19 @@ def create_or_reset_analysis_session(
                 defaults={
                     "raw_answers": raw_answers,
                     "status": AnalysisSessionStatus.PENDING,
+                    "lease_expires_at": lease_expires_at,
+                    "attempts": 0,
+                    "lane": lane,
+                    "queued_at": queued_at,
                 },
             )
         else:
             instance = AnalysisSession.objects.create(
                 raw_answers=raw_answers,
                 review_session=review_session,
+                lease_expires_at=lease_expires_at,
+                lane=lane,
+                queued_at=queued_at,
             )
             created = True
         if not created:
@@ -122,54 +214,200 @@ def create_or_reset_analysis_session(
                 instance=instance,
                 raw_answers=raw_answers,
                 review_session=review_session,
+                lease_expires_at=lease_expires_at,
             )
         else:
-            _send_status(instance)
-
-    from ai.tasks import run_analysis
+            invalidate_status_snapshot(instance)
+            publish_status(instance)
 
-    run_analysis.delay(str(instance.id))
+    # Sent on commit (or queued in this transaction), so the worker never
+    # claims a row that still shows the previous run or does not exist yet.
+    queue_analysis(instance.id, lane)
+    if lane == AnalysisLane.INTERACTIVE:
+        transaction.on_commit(lambda: _announce_position(instance))
     return instance, created
 
 
-def enqueue_analysis_for_session(session: ReviewSession) -> AnalysisSession:
+def _announce_position(instance: AnalysisSession) -> None:
+    """
+    Send a ``queued`` event when the run has to wait for a free worker.
+    """
+
+    try:
+        queued = admission.position_of(instance)
+        if queued and queued.position > settings.ANALYSIS_INTERACTIVE_SLOTS:
+            admission.publish_position(instance, queued)
+    except Exception:  # pragma: no cover - best effort
+        logger.warning("Could not announce queue position of analysis %s", instance.id, exc_info=True)
+
+
+def enqueue_analysis_for_session(
+    session: ReviewSession, *, lane: str = AnalysisLane.INTERACTIVE, shed: bool = False
+) -> AnalysisSession:
     """
     Helper used by the review app to create an analysis job.
     """
 
     raw_answers = collect_answers_for_review_session(session)
     analysis, _ = create_or_reset_analysis_session(
-        raw_answers=raw_answers, review_session=session
+        raw_answers=raw_answers, review_session=session, lane=lane, shed=shed
     )
     logger.info("Enqueued analysis for review_session=%s analysis_id=%s", session.id, analysis.id)
     return analysis
 
 
-def _channel_key(review_session_id: UUID | None, session_id: UUID) -> str:
-    return str(review_session_id or session_id)
+def _snapshot(
+    session_key: str,
+    analysis_id: UUID | None,
+    status: str | None,
+    review_session_id: UUID | None,
+    error: str | None,
+    result: Any,
+    review_exists: bool,
+) -> dict[str, Any] | None:
+    if analysis_id is None:
+        if not review_exists:
+            return None
+        return {
+            "type": "status",
+            "status": "not_completed",
+            "session_id": None,
+            "review_session_id": session_key,
+        }
+    return {
+        "type": "status",
+        "status": status,
+        "session_id": str(analysis_id),
+        "review_session_id": str(review_session_id) if review_session_id else None,
+        "error": error,
+        "result": result,
+    }
 
 
-def _send_status(instance: AnalysisSession) -> None:
-    layer = get_channel_layer()
-    if not layer:
-        return
-    channel_key = _channel_key(instance.review_session_id, instance.id)
-    async_to_sync(layer.group_send)(
-        f"analysis_{channel_key}",
-        {
-            "type": "status",
-            "status": instance.status,
-            "error": instance.error,
-            "session_id": str(instance.id),
-            "review_session_id": str(instance.review_session_id) if instance.review_session_id else None,
-        },
+def _not_found(session_key: str) -> dict[str, Any]:
+    return {
+        "type": "status",
+        "status": "not_found",
+        "session_id": None,
+        "review_session_id": session_key,
+    }
+
+
+_SNAPSHOT_FIELDS = ("id", "status", "review_session_id", "error", "dashboard_json")
+
+
+def _pick_analysis(candidates: list[AnalysisSession], session_key: str) -> AnalysisSession | None:
+    # A match on review_session_id wins over a match on the analysis id.
+    for candidate in candidates:
+        if str(candidate.review_session_id) == session_key:
+            return candidate
+    return candidates[0] if candidates else None
+
+
+def _snapshot_from_analysis(
+    session_key: str, analysis: AnalysisSession | None, review_exists: bool
+) -> dict[str, Any] | None:
+    if analysis is None:
+        return _snapshot(session_key, None, None, None, None, None, review_exists)
+    return _snapshot(
+        session_key,
+        analysis.id,
+        analysis.status,
+        analysis.review_session_id,
+        analysis.error,
+        analysis.dashboard_json,
+        review_exists,
     )
 
 
+def _load_status_snapshot(session_key: str) -> dict[str, Any] | None:
+    candidates = list(
+        AnalysisSession.objects.filter(Q(review_session_id=session_key) | Q(id=session_key)).only(
+            *_SNAPSHOT_FIELDS
+        )[:2]
+    )
+    analysis = _pick_analysis(candidates, session_key)
+    review_exists = analysis is None and ReviewSession.objects.filter(id=session_key).exists()
+    return _snapshot_from_analysis(session_key, analysis, review_exists)
+
+
+# Both lookups (analysis by review session or by its own id, plus the review
+# session itself) in one round trip; each branch is a primary-key or
+# unique-index probe.
+_SNAPSHOT_SQL = f"""
+SELECT a.id, a.status, a.review_session_id, a.error, a.dashboard_json, r.id IS NOT NULL
+FROM (SELECT %(key)s::uuid AS key) AS k
+LEFT JOIN {ReviewSession._meta.db_table} AS r ON r.id = k.key
+LEFT JOIN LATERAL (
+    (SELECT id, status, review_session_id, error, dashboard_json, 0 AS rank
+       FROM {AnalysisSession._meta.db_table} WHERE review_session_id = k.key)
+    UNION ALL
+    (SELECT id, status, review_session_id, error, dashboard_json, 1 AS rank
+       FROM {AnalysisSession._meta.db_table} WHERE id = k.key)
+    ORDER BY rank
+    LIMIT 1
+) AS a ON true
+"""
+
+
+async def _aload_status_snapshot(session_key: str) -> dict[str, Any] | None:
+    pool = await get_asyncpg_pool()
+    if pool is None:
+        # No async PostgreSQL (e.g. SQLite in development): async ORM.
+        candidates = [
+            analysis
+            async for analysis in AnalysisSession.objects.filter(
+                Q(review_session_id=session_key) | Q(id=session_key)
+            ).only(*_SNAPSHOT_FIELDS)[:2]
+        ]
+        analysis = _pick_analysis(candidates, session_key)
+        review_exists = analysis is None and await ReviewSession.objects.filter(id=session_key).aexists()
+        return _snapshot_from_analysis(session_key, analysis, review_exists)
+
+    async with pool.acquire() as conn:
+        cursor = await conn.execute(_SNAPSHOT_SQL, {"key": session_key})
+        row = await cursor.fetchone()
+    return _snapshot(session_key, *row)
+
+
+def get_status_snapshot(session_key: str) -> dict[str, Any]:
+    """
+    Status frame sent to websocket clients on connect. Unknown ids are not
+    cached so a session created later is picked up immediately.
+    """
+
+    def load() -> dict[str, Any] | None:
+        with use_primary():
+            return _load_status_snapshot(session_key)
+
+    return status_snapshot_cache.get(session_key, load) or _not_found(session_key)
+
+
+async def aget_status_snapshot(session_key: str) -> dict[str, Any]:
+    """
+    ``get_status_snapshot`` without a thread-pool hop: one query on the
+    shared async connection pool (always the primary).
+    """
+
+    async def load() -> dict[str, Any] | None:
+        with use_primary():
+            return await _aload_status_snapshot(session_key)
+
+    return await status_snapshot_cache.aget(session_key, load) or _not_found(session_key)
+
+
+def invalidate_status_snapshot(instance: AnalysisSession) -> None:
+    status_snapshot_cache.invalidate(instance.id, instance.review_session_id)
+
+
 __all__ = [
     "collect_answers_for_review_session",
     "enqueue_analysis_for_session",
+    "session_has_pending_audio",
     "create_or_reset_analysis_session",
-    "_channel_key",
-    "_send_status",
+    "aget_status_snapshot",
+    "get_status_snapshot",
+    "invalidate_status_snapshot",
+    "pending_lease",
+    "queue_analysis",
 ]
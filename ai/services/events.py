@@ -0,0 +1,132 @@
+"""
+Events pushed to ``analysis_<key>`` websocket groups.
+
+Every frame is built in the exact shape clients receive and encoded once
+(see core.fanout). A large result can be replaced by a ``result_ready``
+notice pointing at the cacheable detail endpoint.
+
+Frames are also appended to the group's event log (core.eventlog), when
+there is one, and carry its sequence number as ``seq``, so a reconnecting
+client can ask for just the events it missed.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+from uuid import UUID
+
+import orjson
+from django.conf import settings
+from django.urls import reverse
+
+from ai.models import AnalysisSession
+from core.eventlog import get_event_log, stamp
+from core.fanout import group_send_frame
+
+logger = logging.getLogger(__name__)
+
+
+def channel_key(review_session_id: UUID | None, session_id: UUID) -> str:
+    return str(review_session_id or session_id)
+
+
+def group_name(key: str) -> str:
+    return f"analysis_{key}"
+
+
+def status_frame(instance: AnalysisSession) -> dict[str, Any]:
+    return {
+        "type": "status",
+        "status": instance.status,
+        "session_id": str(instance.id),
+        "review_session_id": str(instance.review_session_id) if instance.review_session_id else None,
+        "error": instance.error,
+        "result": None,
+    }
+
+
+def error_frame(message: Any) -> dict[str, Any]:
+    return {"type": "error", "message": message}
+
+
+def publish(key: str, frame: dict[str, Any] | bytes, *, log: bool = True) -> None:
+    """
+    Send a frame to ``key``'s group; ``log=False`` skips the event log for
+    transient frames a reconnecting client has no use for.
+    """
+
+    group = group_name(key)
+    payload = frame if isinstance(frame, bytes) else orjson.dumps(frame)
+    event_log = get_event_log() if log else None
+    if event_log is None:
+        group_send_frame(group, payload)
+        return
+    try:
+        seq = event_log.append(group, payload)
+    except Exception:  # pragma: no cover - log backend errors
+        # Live delivery matters more than replay; reconnects use the snapshot.
+        logger.warning("Could not log event for %s", group, exc_info=True)
+        group_send_frame(group, payload)
+        return
+    group_send_frame(group, stamp(payload, seq), seq=seq)
+
+
+async def areplay(key: str, after: int | None) -> tuple[int | None, list[tuple[int, bytes]] | None]:
+    """
+    Current sequence number of ``key``'s events and the frames after
+    ``after``, or ``(None, None)`` when the log is unavailable.
+    """
+
+    event_log = get_event_log()
+    if event_log is None:
+        return None, None
+    group = group_name(key)
+    try:
+        head, missed = await event_log.areplay(group, after)
+    except Exception:  # pragma: no cover - log backend errors
+        logger.warning("Could not replay events for %s", group, exc_info=True)
+        return None, None
+    if missed is not None:
+        missed = [(seq, stamp(payload, seq)) for seq, payload in missed]
+    return head, missed
+
+
+def publish_status(instance: AnalysisSession) -> None:
+    publish(channel_key(instance.review_session_id, instance.id), status_frame(instance))
+
+
+def publish_result(instance: AnalysisSession) -> None:
+    """
+    Send the dashboard inline, or -- above ANALYSIS_RESULT_INLINE_MAX_BYTES --
+    a ``result_ready`` notice so clients fetch it once over HTTP (ETag/cache)
+    instead of every socket in the group carrying it.
+    """
+
+    key = channel_key(instance.review_session_id, instance.id)
+    encoded = orjson.dumps({"type": "result", "data": instance.dashboard_json})
+    limit = settings.ANALYSIS_RESULT_INLINE_MAX_BYTES
+    if limit and len(encoded) > limit:
+        url = reverse("ai-detail", kwargs={"session_id": instance.id})
+        publish(
+            key,
+            {
+                "type": "result_ready",
+                "session_id": str(instance.id),
+                "url": f"{url}?fields=dashboard_json",
+            },
+        )
+        return
+    publish(key, encoded)
+
+
+__all__ = [
+    "areplay",
+    "channel_key",
+    "error_frame",
+    "group_name",
+    "publish",
+    "publish_result",
+    "publish_status",
+    "status_frame",
+]
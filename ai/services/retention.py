@@ -0,0 +1,223 @@
+"""
+Retention for review and analysis history.
+
+Review sessions idle for longer than RETENTION_DAYS (and finished analyses
+without a review session) are written, one JSON line per session tree --
+review session, answers, meeting requests and analysis -- to a
+zstd-compressed JSONL file on the default storage. The file is uploaded
+before anything is locked; a short transaction then re-locks the batch and
+deletes the trees that have not changed since they were written (a tree
+that has stays in the file, unreferenced, and is picked up by a later run).
+ArchivedSession maps every archived id to its file so a single session can
+be restored. Audio blobs are deleted once the batch commits; transcripts
+are kept in the archive.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+import orjson
+from django.conf import settings
+from django.core import serializers
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.utils import timezone
+
+from ai.models import IN_FLIGHT_STATUSES, AnalysisSession, AnalysisSessionStatus, ArchivedSession
+from ai.services.analysis import invalidate_status_snapshot
+from core.ids import uuid7
+from review.models import MeetingRequest, ReviewAnswer, ReviewSession
+from review.services.cache import invalidate_review_session
+from review.services.cleanup import delete_blobs
+
+try:  # pragma: no cover - optional codecs
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+_FINISHED = (AnalysisSessionStatus.SUCCEEDED, AnalysisSessionStatus.FAILED)
+
+
+def retention_cutoff(days: int | None = None) -> datetime:
+    return timezone.now() - timedelta(days=settings.RETENTION_DAYS if days is None else days)
+
+
+def _stale_sessions(cutoff: datetime) -> models.QuerySet[ReviewSession]:
+    return (
+        ReviewSession.objects.filter(updated_at__lt=cutoff)
+        .exclude(analysis__status__in=IN_FLIGHT_STATUSES)
+        .exclude(answers__created_at__gte=cutoff)
+    )
+
+
+def _stale_analyses(cutoff: datetime) -> models.QuerySet[AnalysisSession]:
+    return AnalysisSession.objects.filter(review_session__isnull=True, status__in=_FINISHED, updated_at__lt=cutoff)
+
+
+def _review_trees(sessions: list[ReviewSession], *, lock: bool = False) -> list[list[models.Model]]:
+    if not sessions:
+        return []
+    ids = [session.id for session in sessions]
+    answers: dict[Any, list[models.Model]] = {}
+    for answer in ReviewAnswer.objects.filter(session_id__in=ids).order_by("created_at"):
+        answers.setdefault(answer.session_id, []).append(answer)
+    meetings: dict[Any, list[models.Model]] = {}
+    for meeting in MeetingRequest.objects.filter(review_session_id__in=ids).order_by("created_at"):
+        meetings.setdefault(meeting.review_session_id, []).append(meeting)
+    analysis_rows = AnalysisSession.objects.filter(review_session_id__in=ids)
+    if lock:
+        analysis_rows = analysis_rows.select_for_update()
+    analyses = {analysis.review_session_id: analysis for analysis in analysis_rows}
+    trees = []
+    for session in sessions:
+        tree: list[models.Model] = [session, *answers.get(session.id, ()), *meetings.get(session.id, ())]
+        if session.id in analyses:
+            tree.append(analyses[session.id])
+        trees.append(tree)
+    return trees
+
+
+def _root(tree: list[models.Model]) -> tuple[str, Any]:
+    return tree[0]._meta.label, tree[0].pk
+
+
+def _lock_unchanged(
+    cutoff: datetime, trees: list[list[models.Model]], written: dict[tuple[str, Any], list[dict]]
+) -> list[list[models.Model]]:
+    """
+    Lock the batch again and keep the trees that are still due and exactly
+    as they were written (``written``, serialized by root): same rows, same
+    values.
+    """
+
+    session_ids = [tree[0].pk for tree in trees if isinstance(tree[0], ReviewSession)]
+    analysis_ids = [tree[0].pk for tree in trees if isinstance(tree[0], AnalysisSession)]
+    sessions = list(
+        _stale_sessions(cutoff).select_for_update(skip_locked=True, of=("self",)).filter(id__in=session_ids)
+    )
+    locked = _review_trees(sessions, lock=True)
+    if analysis_ids:
+        locked += [
+            [analysis]
+            for analysis in _stale_analyses(cutoff).select_for_update(skip_locked=True).filter(id__in=analysis_ids)
+        ]
+    return [tree for tree in locked if serializers.serialize("python", tree) == written[_root(tree)]]
+
+
+def _archived_ids(tree: list[models.Model]) -> list[str]:
+    return [str(obj.pk) for obj in tree if isinstance(obj, (ReviewSession, AnalysisSession))]
+
+
+def _write_archive(trees: list[list[models.Model]], written: dict[tuple[str, Any], list[dict]]) -> str:
+    lines = [orjson.dumps({"ids": _archived_ids(tree), "objects": written[_root(tree)]}) for tree in trees]
+    data = zstandard.ZstdCompressor(level=settings.ZSTD_FIELD_LEVEL).compress(b"\n".join(lines) + b"\n")
+    now = timezone.now()
+    name = f"{settings.RETENTION_ARCHIVE_PREFIX}/{now:%Y/%m/%d}/{uuid7().hex}.jsonl.zst"
+    return default_storage.save(name, ContentFile(data))
+
+
+def archive_batch(cutoff: datetime, *, batch: int | None = None) -> int:
+    """
+    Archive and delete up to ``batch`` session trees older than ``cutoff``.
+    Returns how many were archived; 0 means nothing is left.
+    """
+
+    if zstandard is None:
+        raise RuntimeError("Archiving requires the zstandard package.")
+    batch = batch or settings.RETENTION_BATCH
+    trees = _review_trees(list(_stale_sessions(cutoff).order_by("updated_at")[:batch]))
+    if len(trees) < batch:
+        trees += [[analysis] for analysis in _stale_analyses(cutoff).order_by("created_at")[: batch - len(trees)]]
+    if not trees:
+        return 0
+    written = {_root(tree): serializers.serialize("python", tree) for tree in trees}
+    # No row locks are held while a slow storage backend uploads.
+    path = _write_archive(trees, written)
+    try:
+        with transaction.atomic():
+            trees = _lock_unchanged(cutoff, trees, written)
+            if trees:
+                _delete_archived(trees, path)
+    except BaseException:
+        default_storage.delete(path)
+        raise
+    if not trees:
+        default_storage.delete(path)
+        return 0
+    logger.info("Archived %s session trees to %s", len(trees), path)
+    return len(trees)
+
+
+def _delete_archived(trees: list[list[models.Model]], path: str) -> None:
+    ArchivedSession.objects.bulk_create(
+        [ArchivedSession(id=archived_id, path=path) for tree in trees for archived_id in _archived_ids(tree)],
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=["path", "archived_at"],
+    )
+
+    objects = [obj for tree in trees for obj in tree]
+    session_ids = [obj.pk for obj in objects if isinstance(obj, ReviewSession)]
+    analyses = [obj for obj in objects if isinstance(obj, AnalysisSession)]
+    audio = [obj.audio_file.name for obj in objects if isinstance(obj, ReviewAnswer) and obj.audio_file]
+    MeetingRequest.objects.filter(review_session_id__in=session_ids).delete()
+    ReviewAnswer.objects.filter(session_id__in=session_ids).delete()
+    AnalysisSession.objects.filter(id__in=[analysis.pk for analysis in analyses]).delete()
+    ReviewSession.objects.filter(id__in=session_ids).delete()
+
+    for session_id in session_ids:
+        invalidate_review_session(session_id)
+    for analysis in analyses:
+        invalidate_status_snapshot(analysis)
+    if audio:
+        transaction.on_commit(lambda: delete_blobs(audio))
+
+
+def _find_record(path: str, archived_id: str) -> dict[str, Any]:
+    with default_storage.open(path, "rb") as handle:
+        text = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(handle), encoding="utf-8")
+        for line in text:
+            if archived_id not in line:
+                continue
+            record = orjson.loads(line)
+            if archived_id in record["ids"]:
+                return record
+    raise LookupError(f"{archived_id} is not in archive {path}.")
+
+
+def restore_session(session_id) -> list[str]:
+    """
+    Recreate an archived review session (with its answers, meeting requests
+    and analysis) or standalone analysis. Audio deleted at archive time is
+    not restored. Returns the restored review/analysis ids.
+    """
+
+    if zstandard is None:
+        raise RuntimeError("Restoring requires the zstandard package.")
+    entry = ArchivedSession.objects.filter(id=session_id).first()
+    if entry is None:
+        raise LookupError(f"No archive entry for {session_id}.")
+    record = _find_record(entry.path, str(session_id))
+
+    with transaction.atomic():
+        for deserialized in serializers.deserialize("python", record["objects"]):
+            obj = deserialized.object
+            if isinstance(obj, ReviewAnswer) and obj.audio_file and not default_storage.exists(obj.audio_file.name):
+                obj.audio_file = None
+            deserialized.save()
+            if isinstance(obj, ReviewSession):
+                invalidate_review_session(obj.pk)
+            elif isinstance(obj, AnalysisSession):
+                invalidate_status_snapshot(obj)
+        ArchivedSession.objects.filter(id__in=record["ids"]).delete()
+    return record["ids"]
+
+
+__all__ = ["archive_batch", "restore_session", "retention_cutoff"]
@@ -2,31 +2,25 @@ from __future__ import annotations
 
 import json
 import logging
+from datetime import timedelta
 from typing import Any
 from uuid import UUID
 
-from asgiref.sync import async_to_sync
 from celery import shared_task
-from channels.layers import get_channel_layer
 from django.conf import settings
 from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
-from ai.services import prompts
-from ai.models import AnalysisSession, AnalysisSessionStatus
+from ai.services import admission, events, prompts
+from ai.models import IN_FLIGHT_STATUSES, AnalysisLane, AnalysisSession, AnalysisSessionStatus
 from ai.services.ai_client import call_chat_completion
-from ai.services.analysis import _channel_key
+from ai.services.analysis import invalidate_status_snapshot, pending_lease, queue_analysis
 from ai.services.schema import validate_dashboard
 
 logger = logging.getLogger(__name__)
 
 
-def _send_group_message(channel_key: str, message: dict[str, Any]) -> None:
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        return
-    async_to_sync(channel_layer.group_send)(f"analysis_{channel_key}", message)
-
-
 def _parse_and_validate(raw_text: str, session_uuid: UUID) -> dict[str, Any]:
     try:
         data = json.loads(raw_text)
@@ -35,33 +29,96 @@ def _parse_and_validate(raw_text: str, session_uuid: UUID) -> dict[str, Any]:
     return validate_dashboard(data, session_uuid)
 
 
-def _update_status(instance: AnalysisSession, channel_key: str, status: str, error: str | None = None) -> None:
-    instance.status = status
-    instance.error = error
-    instance.save(update_fields=["status", "error"])
-    _send_group_message(
-        channel_key,
-        {
-            "type": "status",
-            "status": status,
-            "error": error,
-            "session_id": str(instance.id),
-            "review_session_id": str(instance.review_session_id) if instance.review_session_id else None,
-        },
+def _running_lease():
+    return timezone.now() + timedelta(seconds=settings.ANALYSIS_LEASE_SECONDS)
+
+
+def _claim(session_id: str) -> AnalysisSession | None:
+    """
+    Take the lease on a queued job, or on a running one whose worker stopped
+    renewing it. Returns None when the job is gone, finished, or held by a
+    live worker.
+    """
+
+    now = timezone.now()
+    claimed = AnalysisSession.objects.filter(
+        Q(status=AnalysisSessionStatus.PENDING)
+        | Q(status=AnalysisSessionStatus.RUNNING, lease_expires_at__lt=now),
+        id=session_id,
+    ).update(
+        status=AnalysisSessionStatus.RUNNING,
+        error=None,
+        attempts=F("attempts") + 1,
+        lease_expires_at=_running_lease(),
+        started_at=now,
+        updated_at=now,
+    )
+    if not claimed:
+        return None
+    return AnalysisSession.objects.get(id=session_id)
+
+
+def _renew_lease(instance: AnalysisSession) -> bool:
+    """
+    Heartbeat before each slow step. False once another worker took over.
+    """
+
+    return bool(
+        AnalysisSession.objects.filter(
+            id=instance.id, status=AnalysisSessionStatus.RUNNING, attempts=instance.attempts
+        ).update(lease_expires_at=_running_lease())
     )
 
 
+def _update_status(
+    instance: AnalysisSession,
+    channel_key: str,
+    status: str,
+    error: str | None = None,
+    **fields: Any,
+) -> bool:
+    """
+    Write a new status (plus any extra ``fields``) if this worker still holds
+    the job: still running under the same claim number. Finished jobs drop
+    their lease.
+    """
+
+    values = {
+        "status": status,
+        "error": error,
+        "lease_expires_at": None if status not in IN_FLIGHT_STATUSES else instance.lease_expires_at,
+        "updated_at": timezone.now(),
+        **fields,
+    }
+    updated = AnalysisSession.objects.filter(
+        id=instance.id, status=AnalysisSessionStatus.RUNNING, attempts=instance.attempts
+    ).update(**values)
+    if not updated:
+        logger.warning(
+            "Lost lease on analysis session=%s (attempt %s); dropping %s",
+            instance.id,
+            instance.attempts,
+            status,
+        )
+        return False
+    for name, value in values.items():
+        setattr(instance, name, value)
+    invalidate_status_snapshot(instance)
+    events.publish(channel_key, events.status_frame(instance))
+    return True
+
+
 @shared_task(bind=True)
 def run_analysis(self, session_id: str) -> None:
-    try:
-        session = AnalysisSession.objects.get(id=session_id)
-    except AnalysisSession.DoesNotExist:
-        logger.warning("AnalysisSession %s no longer exists", session_id)
+    session = _claim(session_id)
+    if session is None:
+        logger.info("AnalysisSession %s is gone, finished or already claimed", session_id)
         return
-    channel_key = _channel_key(session.review_session_id, session.id)
+    channel_key = events.channel_key(session.review_session_id, session.id)
 
-    logger.info("Starting analysis task for session=%s", session_id)
-    _update_status(session, channel_key, AnalysisSessionStatus.RUNNING, None)
+    logger.info("Starting analysis task for session=%s attempt=%s", session_id, session.attempts)
+    invalidate_status_snapshot(session)
+    events.publish(channel_key, events.status_frame(session))
 
     payload = session.raw_answers
     target_session_id = (
@@ -90,6 +147,9 @@ def run_analysis(self, session_id: str) -> None:
     except Exception as exc:
         logger.info("Attempting to repair invalid AI output for session=%s error=%s", session_id, exc)
         repair_prompt = prompts.build_repair_prompt(last_raw_text or "")
+        if not _renew_lease(session):
+            logger.warning("Lost lease on analysis session=%s; stopping", session_id)
+            return
         try:
             raw_text = call_chat_completion(
                 system_prompt=system_prompt,
@@ -102,36 +162,123 @@ def run_analysis(self, session_id: str) -> None:
             validated = _parse_and_validate(raw_text, target_uuid)
         except Exception as repair_exc:
             error_message = str(repair_exc)
-            session.ai_raw_response = last_raw_text or ""
-            session.dashboard_json = None
-            _update_status(session, channel_key, AnalysisSessionStatus.FAILED, error_message)
-            _send_group_message(
+            if not _update_status(
+                session,
                 channel_key,
-                {"type": "error", "message": error_message},
-            )
+                AnalysisSessionStatus.FAILED,
+                error_message,
+                ai_raw_response=last_raw_text or "",
+                dashboard_json=None,
+            ):
+                return
+            events.publish(channel_key, events.error_frame(error_message))
             logger.exception(
                 "Failed to repair AI output for session=%s error=%s",
                 session_id,
                 repair_exc,
             )
-            session.save(update_fields=["ai_raw_response", "dashboard_json"])
             return
     try:
         with transaction.atomic():
-            session.ai_raw_response = last_raw_text or ""
-            session.dashboard_json = validated
-            _update_status(session, channel_key, AnalysisSessionStatus.SUCCEEDED, None)
-            session.save(update_fields=["ai_raw_response", "dashboard_json"])
+            if not _update_status(
+                session,
+                channel_key,
+                AnalysisSessionStatus.SUCCEEDED,
+                None,
+                ai_raw_response=last_raw_text or "",
+                dashboard_json=validated,
+            ):
+                return
     except Exception as exc:  # pragma: no cover - safeguard
         logger.exception("Error saving analysis session=%s error=%s", session_id, exc)
-        _update_status(session, channel_key, AnalysisSessionStatus.FAILED, str(exc))
-        _send_group_message(
-            channel_key, {"type": "error", "message": "Failed to persist result."}
-        )
+        if _update_status(session, channel_key, AnalysisSessionStatus.FAILED, str(exc)):
+            events.publish(channel_key, events.error_frame("Failed to persist result."))
         return
 
-    _send_group_message(
-        channel_key,
-        {"type": "result", "data": session.dashboard_json},
-    )
+    events.publish_result(session)
     logger.info("Completed analysis for session=%s", session_id)
+
+
+def _sweep_one(session_id) -> str | None:
+    """
+    Re-check one expired job under a row lock and take it back: re-queue it,
+    or fail it once it has used up its attempts. Returns what was done.
+
+    A job nobody picked up is dispatched again on its own lane, and that
+    counts as an attempt, so a job whose messages keep getting lost still
+    fails in the end. Only a job whose worker died moves to the repair lane.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        session = (
+            AnalysisSession.objects.select_for_update(skip_locked=True)
+            .filter(id=session_id, status__in=IN_FLIGHT_STATUSES, lease_expires_at__lt=now)
+            .first()
+        )
+        if session is None:
+            return None
+        if session.attempts >= settings.ANALYSIS_MAX_ATTEMPTS:
+            session.status = AnalysisSessionStatus.FAILED
+            session.error = f"Analysis did not finish after {session.attempts} attempts."
+            session.lease_expires_at = None
+            action = "failed"
+        else:
+            if session.status == AnalysisSessionStatus.PENDING:
+                session.attempts += 1
+            else:
+                session.status = AnalysisSessionStatus.PENDING
+                session.lane = AnalysisLane.REPAIR
+            session.lease_expires_at = pending_lease(session.lane)
+            session.queued_at = now
+            action = "requeued"
+        session.save(
+            update_fields=["status", "error", "attempts", "lease_expires_at", "lane", "queued_at", "updated_at"]
+        )
+        invalidate_status_snapshot(session)
+
+        channel_key = events.channel_key(session.review_session_id, session.id)
+        frame = events.status_frame(session)
+        transaction.on_commit(lambda: events.publish(channel_key, frame))
+        if action == "failed":
+            error = events.error_frame(session.error)
+            transaction.on_commit(lambda: events.publish(channel_key, error))
+        else:
+            queue_analysis(session.id, session.lane)
+    return action
+
+
+@shared_task
+def sweep_stuck_analyses() -> dict[str, int]:
+    """
+    Periodic (celery beat) recovery of jobs whose worker died or whose queue
+    message was lost. The candidate scan reads only the in-flight partial
+    index on ``lease_expires_at``, so its cost tracks the number of queued
+    and running jobs, not the size of the table.
+    """
+
+    expired = list(
+        AnalysisSession.objects.filter(
+            status__in=IN_FLIGHT_STATUSES, lease_expires_at__lt=timezone.now()
+        )
+        .order_by("lease_expires_at")
+        .values_list("id", flat=True)[: settings.ANALYSIS_SWEEP_BATCH]
+    )
+    counts = {"requeued": 0, "failed": 0}
+    for session_id in expired:
+        action = _sweep_one(session_id)
+        if action:
+            counts[action] += 1
+    if expired:
+        logger.info("Analysis sweep: %s expired, %s", len(expired), counts)
+    return counts
+
+
+@shared_task
+def publish_queue_positions() -> int:
+    """
+    Periodic (celery beat) ``queued`` events for interactive sessions still
+    waiting for a worker.
+    """
+
+    return admission.publish_positions()
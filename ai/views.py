@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ai.models import AnalysisSession
-from ai.serializers import AnalysisSessionSerializer, CreateAnalysisSerializer
+from ai.serializers import CreateAnalysisSerializer, flat_analysis_session
+from ai.services.admission import AnalysisOverloaded
 from ai.services.analysis import collect_answers_for_review_session, create_or_reset_analysis_session
+from core.conditional import Validators
+from core.replicas import ReadOnlyViewMixin, primary_on_miss
+from core.serialization import requested_fields
 from review.models import ReviewSession
 
+# ai_raw_response is debugging output and often the largest column; anonymous
+# callers only get it when they ask for it explicitly.
+_PUBLIC_FIELDS = tuple(
+    name for name in flat_analysis_session.field_names if name != "ai_raw_response"
+)
+
 
 class AnalysisCreateView(APIView):
     authentication_classes: list = []
@@ -37,21 +49,68 @@ class AnalysisCreateView(APIView):
                 "answers": sorted(data["answers"], key=lambda x: x["order"]),
             }
 
-        analysis, created = create_or_reset_analysis_session(
-            raw_answers=raw_answers, review_session=review_session
-        )
-        response_serializer = AnalysisSessionSerializer(analysis)
+        try:
+            analysis, created = create_or_reset_analysis_session(
+                raw_answers=raw_answers, review_session=review_session, shed=True
+            )
+        except AnalysisOverloaded as exc:
+            return Response(
+                exc.payload,
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
         return Response(
-            response_serializer.data,
+            flat_analysis_session(analysis),
             status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
         )
 
 
-class AnalysisDetailView(APIView):
-    authentication_classes: list = []
+class AnalysisDetailView(ReadOnlyViewMixin, APIView):
+    """
+    Supports sparse fieldsets: ``?fields=status,dashboard_json`` or
+    ``?exclude=raw_answers``. Only the selected columns are fetched.
+    """
+
+    authentication_classes: list = [SessionAuthentication]
     permission_classes: list = []
 
     def get(self, request: Request, session_id) -> Response:
-        analysis = get_object_or_404(AnalysisSession, id=session_id)
-        serializer = AnalysisSessionSerializer(analysis)
-        return Response(serializer.data)
+        default = (
+            flat_analysis_session.field_names
+            if request.user.is_authenticated
+            else _PUBLIC_FIELDS
+        )
+        try:
+            names = requested_fields(
+                request.query_params, flat_analysis_session.field_names, default=default
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = flat_analysis_session.subset(names)
+
+        version = primary_on_miss(
+            lambda: AnalysisSession.objects.filter(id=session_id)
+            .values_list("updated_at", "status")
+            .first()
+        )
+        if version is None:
+            raise Http404("No AnalysisSession matches the given query.")
+        updated_at, analysis_status = version
+        validators = Validators(
+            "analysis",
+            updated_at.isoformat(),
+            analysis_status,
+            ",".join(names),
+        )
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        row = (
+            AnalysisSession.objects.filter(id=session_id)
+            .values(*serializer.row_keys())
+            .first()
+        )
+        if row is None:
+            raise Http404("No AnalysisSession matches the given query.")
+        return validators.apply(Response(serializer.row(row)))
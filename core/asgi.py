@@ -1,18 +1,76 @@
+import asyncio
 import os
+import sys
 
 from channels.auth import AuthMiddlewareStack
+from channels.layers import get_channel_layer
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
+from django.urls import re_path
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 django_asgi_app = get_asgi_application()
 
-from core.routing import websocket_urlpatterns  # noqa: E402
+from core.db import close_asyncpg_pool  # noqa: E402
+from core.eventlog import close_event_log  # noqa: E402
+from core.pglayer import PostgresChannelLayer  # noqa: E402
+from core.routing import http_urlpatterns, websocket_urlpatterns  # noqa: E402
+
+
+async def shutdown():
+    """
+    Stop the PostgreSQL channel layer listener and close the async database
+    pool and event log client.
+    """
+
+    layer = get_channel_layer()
+    if isinstance(layer, PostgresChannelLayer):
+        await layer.close()
+    await close_asyncpg_pool(final=True)
+    await close_event_log()
+
+
+async def lifespan(scope, receive, send):
+    """
+    ASGI lifespan, for servers that send it (uvicorn, hypercorn).
+    """
+
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+def _shutdown_with_daphne():
+    """
+    Daphne sends no lifespan events, so run ``shutdown`` from its Twisted
+    reactor instead, next to Daphne's own cancelling of open connections.
+    The "during" phase is too late: it starts by stopping the asyncio loop.
+    """
+
+    # Daphne imports daphne.server (which installs its reactor) before the
+    # application; any other server must not get a Twisted reactor from here.
+    if "daphne.server" not in sys.modules:
+        return
+    from twisted.internet import defer, reactor
+
+    reactor.addSystemEventTrigger(
+        "before", "shutdown", lambda: defer.Deferred.fromFuture(asyncio.ensure_future(shutdown()))
+    )
+
+
+_shutdown_with_daphne()
+
 
 application = ProtocolTypeRouter(
     {
-        "http": django_asgi_app,
+        "http": URLRouter([*http_urlpatterns, re_path(r"", django_asgi_app)]),
         "websocket": AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+        "lifespan": lifespan,
     }
 )
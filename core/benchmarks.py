@@ -0,0 +1,123 @@
+"""
+Shared fixtures and timing helpers for the ``bench_*`` management commands.
+Samples are unsaved model instances so CPU-bound benchmarks run without a
+database.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import time
+import uuid
+from typing import Any, Callable
+
+from django.utils import timezone
+
+from ai.services.prompts import SCHEMA_EXAMPLE
+
+_PERSIAN_SENTENCE = (
+    "تیم فروش ما در سه ماه گذشته با کاهش نرخ تبدیل روبه‌رو شده و "
+    "فرایند پیگیری مشتریان بالقوه هنوز به صورت دستی انجام می‌شود. "
+)
+
+
+def persian_text(sentences: int) -> str:
+    return (_PERSIAN_SENTENCE * sentences).strip()
+
+
+def sample_dashboard(session_id: uuid.UUID, *, richness: int = 6) -> dict[str, Any]:
+    dashboard = copy.deepcopy(SCHEMA_EXAMPLE)
+    dashboard["session_id"] = str(session_id)
+    challenge = dashboard["business_overview"]["main_challenge"]
+    challenge["body"] = persian_text(richness)
+    challenge["statistics"]["description"] = persian_text(richness // 2 or 1)
+    challenge["solution"]["description"] = persian_text(richness)
+    dashboard["recommendations"] = [
+        {"title": f"توصیه {index}: " + persian_text(2)} for index in range(1, 4)
+    ]
+    return dashboard
+
+
+def sample_raw_answers(session_id: uuid.UUID) -> dict[str, Any]:
+    return {
+        "session_id": str(session_id),
+        "answers": [
+            {
+                "order": order,
+                "question_id": order,
+                "prompt": f"سوال شماره {order} درباره اهداف کسب‌وکار شما چیست؟",
+                "answer": persian_text(3),
+            }
+            for order in range(1, 6)
+        ],
+    }
+
+
+def sample_objects() -> dict[str, Any]:
+    """
+    Unsaved instances shaped like the hot API responses.
+    """
+
+    from ai.models import AnalysisSession, AnalysisSessionStatus
+    from review.models import MeetingRequest, ReviewAnswer, ReviewQuestion, ReviewSession
+
+    now = timezone.now()
+    session = ReviewSession(
+        id=uuid.uuid4(),
+        phone_number="+989121234567",
+        email="user@example.com",
+        created_at=now,
+        updated_at=now,
+        completed_at=None,
+    )
+    question = ReviewQuestion(id=2, prompt="مهم‌ترین مانع رشد کسب‌وکار شما چیست؟", order=2)
+    answer = ReviewAnswer(
+        id=10,
+        session=session,
+        question=question,
+        answer_text=persian_text(3),
+        audio_file="review/audio/answer.ogg",
+        audio_status="ready",
+        audio_duration=12.4,
+        created_at=now,
+    )
+    dashboard = sample_dashboard(session.id)
+    analysis = AnalysisSession(
+        id=uuid.uuid4(),
+        review_session_id=session.id,
+        status=AnalysisSessionStatus.SUCCEEDED,
+        created_at=now,
+        updated_at=now,
+        raw_answers=sample_raw_answers(session.id),
+        dashboard_json=dashboard,
+        ai_raw_response=json.dumps(dashboard, ensure_ascii=False, indent=2),
+        error=None,
+    )
+    meeting_requests = [
+        MeetingRequest(id=index, review_session=session, created_at=now, updated_at=now)
+        for index in range(1, 4)
+    ]
+    return {
+        "session": session,
+        "question": question,
+        "answer": answer,
+        "analysis": analysis,
+        "meeting_requests": meeting_requests,
+    }
+
+
+def measure(func: Callable[[], Any], *, iterations: int) -> float:
+    """
+    Mean seconds per call over ``iterations`` runs (after one warm-up call).
+    """
+
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def micros(seconds: float) -> str:
+    return f"{seconds * 1_000_000:9.1f}µs"
@@ -0,0 +1,196 @@
+"""
+Read-through caching on the shared cache tier (Redis, or local memory in
+development) with write invalidation and batched hit/miss counters.
+
+Cache errors never fail a request: lookups fall back to the loader and
+invalidations are logged.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_STATS_PREFIX = "cache-stats"
+
+
+class _Stats:
+    """
+    Per-process counters folded into shared counters on the cache every
+    CACHE_STATS_FLUSH_INTERVAL seconds, so lookups don't pay an extra round
+    trip for bookkeeping.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Counter[str] = Counter()
+        self._flushed_at = time.monotonic()
+
+    def record(self, namespace: str, outcome: str) -> bool:
+        with self._lock:
+            self._pending[f"{namespace}:{outcome}"] += 1
+            return time.monotonic() - self._flushed_at >= settings.CACHE_STATS_FLUSH_INTERVAL
+
+    def _drain(self) -> Counter[str]:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+        return pending
+
+    def flush(self) -> None:
+        for name, count in self._drain().items():
+            key = f"{_STATS_PREFIX}:{name}"
+            try:
+                cache.add(key, 0, timeout=None)
+                cache.incr(key, count)
+            except Exception as exc:
+                logger.warning("Could not flush cache counter %s: %s", key, exc)
+
+    async def aflush(self) -> None:
+        for name, count in self._drain().items():
+            key = f"{_STATS_PREFIX}:{name}"
+            try:
+                await cache.aadd(key, 0, timeout=None)
+                await cache.aincr(key, count)
+            except Exception as exc:
+                logger.warning("Could not flush cache counter %s: %s", key, exc)
+
+
+_stats = _Stats()
+_namespaces: dict[str, ReadThroughCache] = {}
+
+
+class ReadThroughCache:
+    """
+    One cached entity type. ``None`` results are never cached, so missing
+    rows always go to the database.
+    """
+
+    def __init__(self, namespace: str, *, timeout: int | None = None) -> None:
+        self.namespace = namespace
+        self.timeout = timeout
+        _namespaces[namespace] = self
+
+    def key(self, ident: Any) -> str:
+        return f"{self.namespace}:{ident}"
+
+    @property
+    def _timeout(self) -> int:
+        return self.timeout if self.timeout is not None else settings.CACHE_READ_THROUGH_TIMEOUT
+
+    def _record(self, outcome: str) -> bool:
+        return _stats.record(self.namespace, outcome)
+
+    def get(self, ident: Any, loader: Callable[[], Any]) -> Any:
+        key = self.key(ident)
+        try:
+            value = cache.get(key)
+        except Exception as exc:
+            logger.warning("Cache read failed for %s: %s", key, exc)
+            value = None
+        if value is not None:
+            due = self._record("hit")
+        else:
+            due = self._record("miss")
+            value = loader()
+            if value is not None:
+                try:
+                    cache.set(key, value, self._timeout)
+                except Exception as exc:
+                    logger.warning("Cache write failed for %s: %s", key, exc)
+        if due:
+            _stats.flush()
+        return value
+
+    async def aget(self, ident: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        key = self.key(ident)
+        try:
+            value = await cache.aget(key)
+        except Exception as exc:
+            logger.warning("Cache read failed for %s: %s", key, exc)
+            value = None
+        if value is not None:
+            due = self._record("hit")
+        else:
+            due = self._record("miss")
+            value = await loader()
+            if value is not None:
+                try:
+                    await cache.aset(key, value, self._timeout)
+                except Exception as exc:
+                    logger.warning("Cache write failed for %s: %s", key, exc)
+        if due:
+            await _stats.aflush()
+        return value
+
+    def invalidate(self, *idents: Any) -> None:
+        """
+        Drop entries once the surrounding transaction commits (immediately in
+        autocommit mode), so readers never re-cache the pre-commit row.
+        """
+
+        keys = [self.key(ident) for ident in idents if ident is not None]
+        if keys:
+            transaction.on_commit(lambda: _delete_many(keys))
+
+    async def ainvalidate(self, *idents: Any) -> None:
+        """
+        Async variant for writes made outside a transaction (async ORM).
+        """
+
+        keys = [self.key(ident) for ident in idents if ident is not None]
+        if not keys:
+            return
+        try:
+            await cache.adelete_many(keys)
+        except Exception as exc:
+            logger.warning("Cache invalidation failed for %s: %s", keys, exc)
+
+
+def _delete_many(keys: list[str]) -> None:
+    try:
+        cache.delete_many(keys)
+    except Exception as exc:
+        logger.warning("Cache invalidation failed for %s: %s", keys, exc)
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """
+    Cluster-wide hit/miss counts per namespace, including this process's
+    unflushed counts.
+    """
+
+    _stats.flush()
+    keys = [
+        f"{_STATS_PREFIX}:{namespace}:{outcome}"
+        for namespace in _namespaces
+        for outcome in ("hit", "miss")
+    ]
+    try:
+        counts = cache.get_many(keys)
+    except Exception as exc:
+        logger.warning("Could not read cache counters: %s", exc)
+        counts = {}
+    stats: dict[str, dict[str, Any]] = {}
+    for namespace in _namespaces:
+        hits = counts.get(f"{_STATS_PREFIX}:{namespace}:hit", 0)
+        misses = counts.get(f"{_STATS_PREFIX}:{namespace}:miss", 0)
+        total = hits + misses
+        stats[namespace] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+__all__ = ["ReadThroughCache", "cache_stats"]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 
 from celery import Celery
+from celery.signals import worker_init
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
@@ -18,3 +19,19 @@ def debug_task(self):
     logger = get_task_logger(__name__)
     logger.info("Debug task called with request: %s", self.request)
 
+
+
+@worker_init.connect
+def close_db_pools_before_fork(**kwargs):
+    """
+    The prefork parent must not hand open pooled connections to its
+    children; each child builds its own pool on first use.
+    """
+
+    from django.db import connections
+
+    for connection in connections.all():
+        connection.close()
+        close_pool = getattr(connection, "close_pool", None)
+        if close_pool is not None:
+            close_pool()
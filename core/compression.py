@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import gzip
+from typing import Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:  # pragma: no cover - optional codecs
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # pragma: no cover - optional codecs
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# API payloads only. HTML pages (admin, login) carry CSRF tokens next to
+# reflected input, which compression would expose to BREACH.
+_COMPRESSIBLE_TYPES = ("application/json",)
+
+# Above this size the async path compresses off the event loop.
+_OFFLOAD_SIZE = 64 * 1024
+
+
+def _gzip(content: bytes) -> bytes:
+    return gzip.compress(content, compresslevel=settings.RESPONSE_COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _brotli(content: bytes) -> bytes:
+    return brotli.compress(content, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+
+
+def _zstd(content: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=settings.RESPONSE_COMPRESSION_ZSTD_LEVEL).compress(content)
+
+
+def available_codecs() -> dict[str, Callable[[bytes], bytes]]:
+    codecs: dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        codecs["zstd"] = _zstd
+    if brotli is not None:
+        codecs["br"] = _brotli
+    codecs["gzip"] = _gzip
+    return codecs
+
+
+def negotiate(accept_encoding: str, preferred: list[str]) -> str | None:
+    """
+    Pick the best encoding from an Accept-Encoding header. Client q-values
+    win; ties go to the server's preference order.
+    """
+
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    wildcard = weights.get("*")
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in preferred:
+        quality = weights.get(encoding, wildcard if wildcard is not None else 0.0)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Negotiated zstd/brotli/gzip compression for JSON responses above
+    RESPONSE_COMPRESSION_MIN_SIZE. Works under WSGI and ASGI; streaming
+    responses (static files, SSE) are left untouched.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.codecs = {
+            name: codec
+            for name, codec in available_codecs().items()
+            if name in settings.RESPONSE_COMPRESSION_ENCODINGS
+        }
+        self.preferred = [
+            name for name in settings.RESPONSE_COMPRESSION_ENCODINGS if name in self.codecs
+        ]
+        self.min_size = settings.RESPONSE_COMPRESSION_MIN_SIZE
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding = self._select(request, response)
+        if encoding:
+            self._compress(response, encoding)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self._select(request, response)
+        if encoding:
+            if len(response.content) >= _OFFLOAD_SIZE:
+                await sync_to_async(self._compress, thread_sensitive=False)(response, encoding)
+            else:
+                self._compress(response, encoding)
+        return response
+
+    def _select(self, request, response) -> str | None:
+        if response.streaming or not self.preferred:
+            return None
+        content_type = response.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if not content_type.startswith(_COMPRESSIBLE_TYPES):
+            return None
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding") or len(response.content) < self.min_size:
+            return None
+        return negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.preferred)
+
+    def _compress(self, response, encoding: str) -> None:
+        original = response.content
+        compressed = self.codecs[encoding](original)
+        if len(compressed) >= len(original):
+            return
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The representation changed, so a strong validator would be wrong.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
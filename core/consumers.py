@@ -1,23 +1,48 @@
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from psycopg.rows import dict_row
 
-from core.db import get_asyncpg_pool
+from core.cache import cache_stats
+from core.db import asyncpg_pool_stats, get_asyncpg_pool
+from core.sockets import GovernedSocketMixin, registry
 
 
-class HealthCheckConsumer(AsyncJsonWebsocketConsumer):
+class HealthCheckConsumer(GovernedSocketMixin, AsyncJsonWebsocketConsumer):
     """
     Minimal websocket endpoint to prove the stack works.
     Sends an initial handshake payload and echoes messages.
     """
 
+    socket_kind = "health"
+
     async def connect(self):
+        if not await self.admit():
+            return
+        # Nothing is ever pushed unprompted: idle sockets can go.
+        self.mark_done()
         await self.accept()
         await self.send_json({"status": "ok", "message": "connected"})
 
+    # Process internals, for logged-in staff only.
+    _STAFF_ACTIONS = {"db_stats", "cache_stats", "ws_stats"}
+
     async def receive_json(self, content, **kwargs):
         if content.get("action") == "db_ping":
             await self._handle_db_ping()
             return
+        if content.get("action") in self._STAFF_ACTIONS and not self._is_staff():
+            await self.send_json({"type": content["action"], "error": "Staff only."})
+            return
+        if content.get("action") == "db_stats":
+            await self.send_json({"type": "db_stats", "stats": asyncpg_pool_stats()})
+            return
+        if content.get("action") == "cache_stats":
+            stats = await database_sync_to_async(cache_stats)()
+            await self.send_json({"type": "cache_stats", "stats": stats})
+            return
+        if content.get("action") == "ws_stats":
+            await self.send_json({"type": "ws_stats", "stats": registry.stats()})
+            return
 
         await self.send_json({"type": "echo", "data": content})
 
@@ -25,6 +50,11 @@ class HealthCheckConsumer(AsyncJsonWebsocketConsumer):
         # No cleanup needed for this sample consumer.
         return await super().disconnect(code)
 
+    def _is_staff(self):
+        # AuthMiddlewareStack has already loaded the user.
+        user = self.scope.get("user")
+        return bool(user is not None and user.is_active and user.is_staff)
+
     async def _handle_db_ping(self):
         try:
             pool = await get_asyncpg_pool()
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import threading
+import time
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import Any, AsyncIterator
 
 import psycopg
 from django.conf import settings
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
 
+logger = logging.getLogger(__name__)
 
-class _AsyncConnectionWrapper:
+# Acquire latencies kept for the percentile figures in ``stats()``.
+_LATENCY_SAMPLES = 1024
+
+
+def on_main_loop() -> bool:
+    """
+    True on the loop of the process's main thread: Daphne's for the lifetime
+    of the server. ``async_to_sync`` always runs a fresh loop in a new thread
+    (Celery tasks, sync views outside ASGI), and that loop ends with the call.
+    """
+
+    return threading.current_thread() is threading.main_thread()
+
+
+class DirectConnections:
     """
-    Lightweight connection manager to provide an asyncpg-like acquire API
-    without adding extra dependencies.
+    The ``acquire()`` API without a pool: a one-shot connection each time.
     """
 
     def __init__(self, dsn: str):
@@ -26,25 +45,198 @@ class _AsyncConnectionWrapper:
             await conn.close()
 
 
-_pool_lock = asyncio.Lock()
-_pool: _AsyncConnectionWrapper | None = None
+class AsyncPool:
+    """
+    asyncpg-like ``acquire()`` API over a psycopg_pool AsyncConnectionPool.
+
+    The pool belongs to the event loop that opened it. Callers on any other
+    loop (``async_to_sync`` threads) get a one-shot connection instead of
+    touching the pool from the wrong loop.
+    """
+
+    def __init__(self, dsn: str):
+        self._dsn = dsn
+        self._loop = asyncio.get_running_loop()
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._acquired = 0
+        self._in_use = 0
+        self._timeouts = 0
+        self._fallbacks = 0
+        self._direct = DirectConnections(dsn)
+        self.pool = AsyncConnectionPool(
+            dsn,
+            min_size=settings.ASYNC_PG_POOL_MIN_SIZE,
+            max_size=settings.ASYNC_PG_POOL_MAX_SIZE,
+            timeout=settings.ASYNC_PG_POOL_TIMEOUT,
+            max_lifetime=settings.ASYNC_PG_POOL_MAX_LIFETIME,
+            max_idle=settings.ASYNC_PG_POOL_MAX_IDLE,
+            check=AsyncConnectionPool.check_connection if settings.ASYNC_PG_POOL_CHECK else None,
+            name="okrcoach-async",
+            open=False,
+        )
+
+    async def open(self) -> None:
+        # Don't block startup on the database; min_size fills in the background.
+        await self.pool.open(wait=False)
 
+    def _owns_current_loop(self) -> bool:
+        return asyncio.get_running_loop() is self._loop and not self.pool.closed
 
-async def get_asyncpg_pool() -> _AsyncConnectionWrapper | None:
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        if not self._owns_current_loop():
+            self._fallbacks += 1
+            async with self._direct.acquire() as conn:
+                yield conn
+            return
+
+        started = time.perf_counter()
+        try:
+            async with self.pool.connection() as conn:
+                self._latencies.append(time.perf_counter() - started)
+                self._acquired += 1
+                self._in_use += 1
+                try:
+                    yield conn
+                finally:
+                    self._in_use -= 1
+        except PoolTimeout:
+            self._timeouts += 1
+            raise
+
+    async def close(self) -> None:
+        if not self.pool.closed:
+            await self.pool.close()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        psycopg_pool counters (pool_size, pool_available, requests_waiting,
+        ...) plus checkout latency over the last acquires, in milliseconds.
+        """
+
+        stats: dict[str, Any] = dict(self.pool.get_stats())
+        stats.update(
+            in_use=self._in_use,
+            acquired=self._acquired,
+            acquire_timeouts=self._timeouts,
+            other_loop_fallbacks=self._fallbacks,
+        )
+        samples = sorted(self._latencies)
+        if samples:
+            stats["acquire_ms"] = {
+                "p50": round(samples[len(samples) // 2] * 1000, 3),
+                "p99": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+                "max": round(samples[-1] * 1000, 3),
+            }
+        return stats
+
+
+_pool_lock = threading.Lock()
+_pool: AsyncPool | None = None
+# Set by the server's final close: nothing may open a new pool after it.
+_shut_down = False
+
+
+def _pool_dsn() -> str | None:
+    dsn = getattr(settings, "ASYNC_DATABASE_URL", None)
+    if not dsn or not dsn.startswith(("postgres://", "postgresql://")):
+        return None
+    return dsn
+
+
+async def get_asyncpg_pool() -> AsyncPool | DirectConnections | None:
     """
-    Lazily build a connection wrapper using ASYNC_DATABASE_URL.
-    Returns None when async DB settings are not provided.
+    Lazily open the shared pool using ASYNC_DATABASE_URL.
+    Returns None when no PostgreSQL async database is configured.
+
+    The pool is only opened on the main loop. Before that, callers on other
+    loops get ``DirectConnections``: a pool bound to a loop that is about to
+    go away would leave its connections behind.
     """
 
     global _pool
     if _pool is not None:
         return _pool
 
-    dsn = getattr(settings, "ASYNC_DATABASE_URL", None)
+    dsn = _pool_dsn()
     if not dsn:
         return None
+    if _shut_down or not on_main_loop():
+        return DirectConnections(dsn)
 
-    async with _pool_lock:
+    pool = AsyncPool(dsn)
+    await pool.open()
+    with _pool_lock:
         if _pool is None:
-            _pool = _AsyncConnectionWrapper(dsn)
-    return _pool
+            _pool = pool
+            return pool
+        winner = _pool
+    # Another coroutine published its pool while this one was opening.
+    await pool.close()
+    return winner
+
+
+_sync_pool_lock = threading.Lock()
+_sync_pool: ConnectionPool | None = None
+
+
+def get_sync_pool() -> ConnectionPool | None:
+    """
+    Process-wide blocking pool on ASYNC_DATABASE_URL, for code that reaches
+    it from a short-lived ``async_to_sync`` loop on behalf of a sync caller
+    (Celery tasks, sync views). Such a loop serves that one call, so
+    blocking it is harmless, and the pool's connections outlive it.
+    Connections beyond ASYNC_PG_POOL_MAX_IDLE seconds idle are closed.
+    """
+
+    global _sync_pool
+    if _sync_pool is not None:
+        return _sync_pool
+    dsn = _pool_dsn()
+    if not dsn:
+        return None
+    with _sync_pool_lock:
+        if _sync_pool is None:
+            _sync_pool = ConnectionPool(
+                dsn,
+                min_size=0,
+                max_size=settings.ASYNC_PG_POOL_MAX_SIZE,
+                timeout=settings.ASYNC_PG_POOL_TIMEOUT,
+                max_lifetime=settings.ASYNC_PG_POOL_MAX_LIFETIME,
+                max_idle=settings.ASYNC_PG_POOL_MAX_IDLE,
+                check=ConnectionPool.check_connection if settings.ASYNC_PG_POOL_CHECK else None,
+                name="okrcoach-sync",
+                open=True,
+            )
+        return _sync_pool
+
+
+async def connect_dedicated(**kwargs: Any) -> psycopg.AsyncConnection:
+    """
+    A connection to ASYNC_DATABASE_URL outside the pool, for sessions that
+    must stay open and bound to one backend (LISTEN).
+    """
+
+    dsn = _pool_dsn()
+    if not dsn:
+        raise RuntimeError("ASYNC_DATABASE_URL is not a PostgreSQL database.")
+    return await psycopg.AsyncConnection.connect(dsn, **kwargs)
+
+
+async def close_asyncpg_pool(*, final: bool = False) -> None:
+    """
+    Close the shared pool; called on server shutdown (see core.asgi) with
+    ``final``, after which connections that are still closing get one-shot
+    connections instead of a fresh pool.
+    """
+
+    global _pool, _shut_down
+    _shut_down = _shut_down or final
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+        logger.info("Closed async database pool")
+
+
+def asyncpg_pool_stats() -> dict[str, Any] | None:
+    return _pool.stats() if _pool is not None else None
@@ -0,0 +1,192 @@
+"""
+Bounded, expiring per-stream event log for resumable websocket streams.
+
+Every appended event gets the next sequence number of its stream. A client
+reconnecting with the last sequence it saw is sent only what it missed;
+``areplay`` returns None instead when part of that range has been trimmed or
+expired, and the caller falls back to a full snapshot.
+
+Redis Streams back the log when EVENT_LOG_REDIS_URL is set. Without it an
+in-process stand-in is used with InMemoryChannelLayer, the only setup where
+publisher and consumer share a process. Otherwise there is no log: each
+process would number its events on its own, so frames go out without a
+sequence number and reconnecting clients get the snapshot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "okrcoach:events"
+
+# INCR and XADD in one step so concurrent publishers never add out of order;
+# the sequence number doubles as the stream entry id.
+_APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[2])
+redis.call('XADD', KEYS[1], 'MAXLEN', ARGV[2], seq .. '-0', 'f', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return seq
+"""
+
+Replay = tuple[int, list[tuple[int, bytes]] | None]
+
+
+def stamp(payload: bytes, seq: int) -> bytes:
+    """
+    Add ``"seq"`` to an encoded JSON object frame without re-encoding it.
+    """
+
+    return b'{"seq":%d,' % seq + payload[1:]
+
+
+def _missed(head: int, after: int, events: list[tuple[int, bytes]]) -> list[tuple[int, bytes]] | None:
+    if head < after:
+        # The log expired and restarted since the client last saw it.
+        return None
+    if head == after:
+        return []
+    if not events or events[0][0] != after + 1:
+        return None
+    return events
+
+
+class MemoryEventLog:
+    """
+    Process-local event log; expired streams are dropped as others are written.
+    """
+
+    def __init__(self, maxlen: int, ttl: int) -> None:
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._streams: OrderedDict[str, tuple[int, deque[tuple[int, bytes]], float]] = OrderedDict()
+
+    def _live(self, stream: str, now: float):
+        entry = self._streams.get(stream)
+        if entry is not None and entry[2] <= now:
+            del self._streams[stream]
+            return None
+        return entry
+
+    def append(self, stream: str, payload: bytes) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(stream, now)
+            seq, events = (entry[0], entry[1]) if entry else (0, deque(maxlen=self.maxlen))
+            seq += 1
+            events.append((seq, payload))
+            self._streams[stream] = (seq, events, now + self.ttl)
+            self._streams.move_to_end(stream)
+            while self._streams:
+                oldest = next(iter(self._streams.values()))
+                if oldest[2] > now:
+                    break
+                self._streams.popitem(last=False)
+        return seq
+
+    def replay(self, stream: str, after: int | None) -> Replay:
+        with self._lock:
+            entry = self._live(stream, time.monotonic())
+            head, events = (entry[0], list(entry[1])) if entry else (0, [])
+        if after is None:
+            return head, None
+        return head, _missed(head, after, [event for event in events if event[0] > after])
+
+    async def areplay(self, stream: str, after: int | None) -> Replay:
+        return self.replay(stream, after)
+
+
+class RedisEventLog:
+    """
+    One Redis stream per log stream plus a sequence counter, both expiring
+    EVENT_LOG_TTL seconds after the last append.
+    """
+
+    def __init__(self, url: str, maxlen: int, ttl: int) -> None:
+        import redis
+
+        self.url = url
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._append = self._client.register_script(_APPEND_SCRIPT)
+        self._async: tuple[asyncio.AbstractEventLoop, Any] | None = None
+
+    @staticmethod
+    def _keys(stream: str) -> tuple[str, str]:
+        # Hash tag keeps both keys in one slot on Redis Cluster.
+        return f"{_KEY_PREFIX}:{{{stream}}}", f"{_KEY_PREFIX}:{{{stream}}}:seq"
+
+    def _async_client(self):
+        # redis.asyncio clients are bound to the loop that created them.
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._async[0] is not loop:
+            import redis.asyncio
+
+            self._async = (loop, redis.asyncio.Redis.from_url(self.url))
+        return self._async[1]
+
+    def append(self, stream: str, payload: bytes) -> int:
+        return int(self._append(keys=self._keys(stream), args=[payload, self.maxlen, self.ttl]))
+
+    async def areplay(self, stream: str, after: int | None) -> Replay:
+        stream_key, seq_key = self._keys(stream)
+        client = self._async_client()
+        if after is None:
+            return int(await client.get(seq_key) or 0), None
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(seq_key)
+            pipe.xrange(stream_key, min=f"{after + 1}-0")
+            head, entries = await pipe.execute()
+        events = [(int(entry_id.split(b"-", 1)[0]), fields[b"f"]) for entry_id, fields in entries]
+        head = int(head or 0)
+        return head, _missed(head, after, events)
+
+    async def aclose(self) -> None:
+        if self._async is not None:
+            client, self._async = self._async[1], None
+            await client.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_event_log() -> MemoryEventLog | RedisEventLog | None:
+    """
+    The log shared by every publisher and consumer, or None when there is none.
+    """
+
+    if settings.EVENT_LOG_REDIS_URL:
+        return RedisEventLog(settings.EVENT_LOG_REDIS_URL, settings.EVENT_LOG_MAXLEN, settings.EVENT_LOG_TTL)
+    if settings.CHANNEL_LAYERS["default"]["BACKEND"] == "channels.layers.InMemoryChannelLayer":
+        return MemoryEventLog(settings.EVENT_LOG_MAXLEN, settings.EVENT_LOG_TTL)
+    return None
+
+
+async def close_event_log() -> None:
+    """
+    Close the loop-bound Redis client; called on server shutdown (see core.asgi).
+    """
+
+    if get_event_log.cache_info().currsize:
+        log = get_event_log()
+        if isinstance(log, RedisEventLog):
+            await log.aclose()
+
+
+__all__ = [
+    "MemoryEventLog",
+    "RedisEventLog",
+    "close_event_log",
+    "get_event_log",
+    "stamp",
+]
@@ -0,0 +1,96 @@
+"""
+Encode-once fan-out for websocket group messages.
+
+The sender serializes the client frame to JSON once; it travels through the
+channel layer as bytes (zstd-compressed above CHANNEL_FRAME_COMPRESS_MIN_SIZE)
+and every consumer in the group writes it to its socket unchanged instead of
+re-encoding the payload per connection. Frames stamped with a sequence
+number (core.eventlog) carry it on the event too, so a consumer that has
+already replayed a frame drops the live copy.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+try:  # pragma: no cover - optional codecs
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Dispatched by channels to ``FrameConsumerMixin.ws_frame``.
+FRAME_EVENT = "ws.frame"
+
+
+def encode_frame(frame: dict[str, Any] | bytes, *, seq: int | None = None) -> dict[str, Any]:
+    """
+    Channel-layer event carrying ``frame`` (a dict, or JSON already encoded
+    with orjson) as bytes.
+    """
+
+    payload = frame if isinstance(frame, bytes) else orjson.dumps(frame)
+    codec = None
+    min_size = settings.CHANNEL_FRAME_COMPRESS_MIN_SIZE
+    if zstandard is not None and min_size and len(payload) >= min_size:
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+        codec = "zstd"
+    return {"type": FRAME_EVENT, "payload": payload, "codec": codec, "seq": seq}
+
+
+def frame_bytes(event: dict[str, Any]) -> bytes:
+    payload = event["payload"]
+    if event.get("codec") == "zstd":
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+
+def decode_frame(event: dict[str, Any]) -> str:
+    return frame_bytes(event).decode("utf-8")
+
+
+async def agroup_send_frame(group: str, frame: dict[str, Any] | bytes, *, seq: int | None = None) -> None:
+    layer = get_channel_layer()
+    if layer is not None:
+        await layer.group_send(group, encode_frame(frame, seq=seq))
+
+
+def group_send_frame(group: str, frame: dict[str, Any] | bytes, *, seq: int | None = None) -> None:
+    if get_channel_layer() is not None:
+        async_to_sync(agroup_send_frame)(group, frame, seq=seq)
+
+
+class FrameConsumerMixin:
+    """
+    For consumers of pre-encoded group frames: skip sequenced frames at or
+    below ``last_seq`` and hand the rest to ``write_frame``, which sends them
+    as websocket text frames unless overridden.
+    """
+
+    last_seq = 0
+
+    async def ws_frame(self, event: dict[str, Any]) -> None:
+        seq = event.get("seq")
+        if seq is not None:
+            if seq <= self.last_seq:
+                return
+            self.last_seq = seq
+        await self.write_frame(event, seq)
+
+    async def write_frame(self, event: dict[str, Any], seq: int | None) -> None:
+        await self.send(text_data=decode_frame(event))
+
+
+__all__ = [
+    "FRAME_EVENT",
+    "FrameConsumerMixin",
+    "agroup_send_frame",
+    "decode_frame",
+    "encode_frame",
+    "frame_bytes",
+    "group_send_frame",
+]
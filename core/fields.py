@@ -0,0 +1,164 @@
+"""
+Model fields that keep large text/JSON values zstd-compressed in place.
+
+A compressed value is stored as ``MARKER + base64(zstd frame)`` in the
+column's existing type (text or jsonb string), so opting a column in needs
+no table rewrite: rows written earlier stay readable as plain values and
+``compress_analysis_columns`` converts them in small batches. Reads
+decompress transparently, including ``.values()`` rows.
+
+Frames compressed with a shared dictionary (``train_zstd_dictionary``) carry
+its id; every ``*.dict`` file in ZSTD_DICTIONARY_DIR stays available for
+decoding, while ZSTD_DICTIONARY names the one used for new writes.
+"""
+
+from __future__ import annotations
+
+import base64
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.models.expressions import Expression
+
+try:  # pragma: no cover - optional codecs
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+MARKER = "\x1bz1:"
+
+# Below this many bytes the base64 frame is rarely smaller than the value.
+MIN_PACK_SIZE = 256
+
+_local = threading.local()
+
+
+@lru_cache(maxsize=1)
+def _dictionaries() -> dict[int, Any]:
+    directory = Path(settings.ZSTD_DICTIONARY_DIR)
+    found: dict[int, Any] = {}
+    if directory.is_dir():
+        for path in sorted(directory.glob("*.dict")):
+            dictionary = zstandard.ZstdCompressionDict(path.read_bytes())
+            found[dictionary.dict_id()] = dictionary
+    return found
+
+
+@lru_cache(maxsize=1)
+def _active_dictionary():
+    if not settings.ZSTD_DICTIONARY:
+        return None
+    path = Path(settings.ZSTD_DICTIONARY_DIR) / settings.ZSTD_DICTIONARY
+    if not path.is_file():
+        raise ImproperlyConfigured(f"ZSTD_DICTIONARY {path} does not exist.")
+    return zstandard.ZstdCompressionDict(path.read_bytes())
+
+
+def _compressor():
+    # zstandard (de)compressors must not be shared between threads.
+    compressor = getattr(_local, "compressor", None)
+    if compressor is None:
+        compressor = _local.compressor = zstandard.ZstdCompressor(
+            level=settings.ZSTD_FIELD_LEVEL, dict_data=_active_dictionary()
+        )
+    return compressor
+
+
+def _decompressor(dict_id: int):
+    decompressors = getattr(_local, "decompressors", None)
+    if decompressors is None:
+        decompressors = _local.decompressors = {}
+    decompressor = decompressors.get(dict_id)
+    if decompressor is None:
+        dictionary = None
+        if dict_id:
+            dictionary = _dictionaries().get(dict_id)
+            if dictionary is None:
+                raise ImproperlyConfigured(
+                    f"Compressed value needs zstd dictionary {dict_id}, which is not in ZSTD_DICTIONARY_DIR."
+                )
+        decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+    return decompressor
+
+
+def is_packed(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(MARKER)
+
+
+def pack(data: bytes) -> str | None:
+    """
+    Marker-prefixed compressed form of ``data``, or None when compression
+    is off, unavailable or would not save space.
+    """
+
+    if not settings.COMPRESSED_FIELDS_ENABLED or zstandard is None or len(data) < MIN_PACK_SIZE:
+        return None
+    packed = MARKER + base64.b64encode(_compressor().compress(data)).decode("ascii")
+    if len(packed) >= len(data):
+        return None
+    return packed
+
+
+def unpack(value: str) -> bytes:
+    if zstandard is None:
+        raise ImproperlyConfigured("Reading compressed columns requires the zstandard package.")
+    frame = base64.b64decode(value[len(MARKER):])
+    dict_id = zstandard.get_frame_parameters(frame).dict_id
+    return _decompressor(dict_id).decompress(frame)
+
+
+class CompressedTextField(models.TextField):
+    """
+    TextField stored compressed; lookups compare against the stored form, so
+    only exact matches on short (never compressed) values are meaningful.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        if is_packed(value):
+            return unpack(value).decode("utf-8")
+        return value
+
+    def get_db_prep_save(self, value, connection):
+        if isinstance(value, str):
+            value = pack(value.encode("utf-8")) or value
+        return super().get_db_prep_save(value, connection)
+
+
+class CompressedJSONField(models.JSONField):
+    """
+    JSONField whose document is stored as one compressed JSON string.
+    Not for columns that are filtered on by key.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        value = super().from_db_value(value, expression, connection)
+        if is_packed(value):
+            return orjson.loads(unpack(value))
+        return value
+
+    def get_db_prep_save(self, value, connection):
+        if value is not None and not isinstance(value, Expression):
+            try:
+                packed = pack(orjson.dumps(value))
+            except orjson.JSONEncodeError:
+                packed = None
+            if packed is not None:
+                value = packed
+        return super().get_db_prep_save(value, connection)
+
+
+__all__ = [
+    "CompressedJSONField",
+    "CompressedTextField",
+    "MARKER",
+    "MIN_PACK_SIZE",
+    "is_packed",
+    "pack",
+    "unpack",
+]
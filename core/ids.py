@@ -0,0 +1,52 @@
+"""
+Time-ordered UUIDv7 (RFC 9562) primary keys.
+
+New rows land at the right edge of the primary-key B-tree instead of a
+random leaf, which keeps PK/FK indexes compact and recent rows hot in cache.
+The values are ordinary UUIDs, so ``<uuid:...>`` URL converters, channel
+group names and existing uuid4 rows are unaffected.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    48-bit Unix milliseconds, then a 12-bit counter (randomly seeded each
+    millisecond) so IDs from one process stay strictly increasing, then 62
+    random bits.
+    """
+
+    global _last_ms, _counter
+    with _lock:
+        now = time.time_ns() // 1_000_000
+        if now > _last_ms:
+            _last_ms = now
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond.
+                _last_ms += 1
+                _counter = secrets.randbits(11)
+        millis, counter = _last_ms, _counter
+    value = (
+        (millis & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+__all__ = ["uuid7"]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.services.retention import archive_batch, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive review sessions idle for longer than RETENTION_DAYS (and "
+        "finished standalone analyses) to zstd JSONL files on the default "
+        "storage, then delete them. Works in short batches so it can run "
+        "next to live traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Override RETENTION_DAYS.")
+        parser.add_argument("--batch", type=int, default=None, help="Override RETENTION_BATCH.")
+        parser.add_argument("--sleep", type=float, default=0.5, help="Seconds to pause between batches.")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many sessions (0 = all).")
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options["days"])
+        batch = options["batch"] or settings.RETENTION_BATCH
+        self.stdout.write(f"Archiving history idle since before {cutoff:%Y-%m-%d %H:%M}.")
+        total = 0
+        while True:
+            archived = archive_batch(cutoff, batch=batch)
+            total += archived
+            if archived:
+                self.stdout.write(f"{total} archived")
+            if not archived or (options["limit"] and total >= options["limit"]):
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} session trees archived."))
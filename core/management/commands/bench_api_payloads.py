@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from ai.serializers import AnalysisSessionSerializer
+from core.benchmarks import measure, micros, sample_objects
+from core.compression import available_codecs
+from core.renderers import ORJSONRenderer
+from review.serializers import (
+    MeetingRequestSerializer,
+    ReviewAnswerSerializer,
+    ReviewQuestionSerializer,
+    ReviewSessionSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-endpoint serialization, JSON rendering (stock DRF vs orjson) "
+        "and compression cost for representative API payloads. Needs no database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        objects = sample_objects()
+        request = RequestFactory().get("/", HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        session = objects["session"]
+        question = objects["question"]
+
+        builders = {
+            "start": lambda: {
+                "session": ReviewSessionSerializer(session).data,
+                "next_question": ReviewQuestionSerializer(question).data,
+            },
+            "next": lambda: {
+                "session": ReviewSessionSerializer(session).data,
+                "completed": False,
+                "next_question": ReviewQuestionSerializer(question).data,
+            },
+            "answer": lambda: {
+                "session": ReviewSessionSerializer(session).data,
+                "answer": ReviewAnswerSerializer(
+                    objects["answer"], context={"request": request}
+                ).data,
+                "next_question": ReviewQuestionSerializer(question).data,
+                "completed": False,
+            },
+            "meeting-requests": lambda: MeetingRequestSerializer(
+                objects["meeting_requests"], many=True
+            ).data,
+            "analysis-detail": lambda: AnalysisSessionSerializer(objects["analysis"]).data,
+        }
+        renderers = {"drf-json": JSONRenderer(), "orjson": ORJSONRenderer()}
+        codecs = available_codecs()
+
+        for endpoint, build in builders.items():
+            data = build()
+            self.stdout.write(self.style.MIGRATE_HEADING(endpoint))
+            self.stdout.write(f"  serialize     {micros(measure(build, iterations=iterations))}")
+            rendered = b""
+            for name, renderer in renderers.items():
+                elapsed = measure(lambda: renderer.render(data), iterations=iterations)
+                rendered = renderer.render(data)
+                self.stdout.write(
+                    f"  render {name:<7}{micros(elapsed)}  {len(rendered):>7} bytes"
+                )
+            for name, codec in codecs.items():
+                elapsed = measure(lambda: codec(rendered), iterations=max(1, iterations // 10))
+                size = len(codec(rendered))
+                self.stdout.write(
+                    f"  compress {name:<5}{micros(elapsed)}  {size:>7} bytes "
+                    f"({size / len(rendered):.0%})"
+                )
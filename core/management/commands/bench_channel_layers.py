@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import micros, sample_dashboard
+from core.db import close_asyncpg_pool
+from core.fanout import encode_frame
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _layers(redis_url: str | None) -> dict[str, tuple]:
+    """
+    Sender/receiver pairs: two instances each, so every message crosses
+    the backend as it does between a Celery worker and Daphne.
+    """
+
+    layers: dict[str, tuple] = {}
+    if (settings.ASYNC_DATABASE_URL or "").startswith(("postgres://", "postgresql://")):
+        from core.pglayer import PostgresChannelLayer
+
+        layers["postgres"] = (PostgresChannelLayer(), PostgresChannelLayer())
+    if redis_url:
+        from channels_redis.core import RedisChannelLayer
+
+        # Own key prefix: nothing here touches the live layer's keys.
+        layers["redis"] = tuple(RedisChannelLayer(hosts=[redis_url], prefix="asgi-bench") for _ in range(2))
+    return layers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the PostgreSQL LISTEN/NOTIFY channel layer with channels_redis: "
+        "send-to-receive latency for a small status frame and a large result "
+        "frame, and group fan-out throughput. Needs a PostgreSQL "
+        "ASYNC_DATABASE_URL and/or a Redis URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--group-size", type=int, default=50)
+        parser.add_argument("--messages", type=int, default=100, help="group_send calls for the throughput test.")
+        parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL"))
+
+    def handle(self, *args, **options):
+        layers = _layers(options["redis_url"])
+        if not layers:
+            raise CommandError("No PostgreSQL ASYNC_DATABASE_URL or --redis-url to benchmark.")
+        asyncio.run(self._run(layers, options))
+
+    async def _run(self, layers: dict[str, tuple], options) -> None:
+        session_id = uuid.uuid4()
+        frames = {
+            "status": encode_frame({"type": "status", "status": "running", "session_id": str(session_id)}),
+            "result": encode_frame({"type": "result", "data": sample_dashboard(session_id, richness=12)}),
+        }
+        for name, (sender, receiver) in layers.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            try:
+                await sender.new_channel()  # starts the sender's listener/pool, as on a server
+                for label, frame in frames.items():
+                    await self._latency(sender, receiver, label, frame, options["iterations"])
+                await self._fanout(sender, receiver, frames["status"], options["group_size"], options["messages"])
+            finally:
+                for layer in (sender, receiver):
+                    if hasattr(layer, "close_pools"):
+                        await layer.close_pools()
+                    else:
+                        await layer.close()
+        await close_asyncpg_pool()
+
+    async def _latency(self, sender, receiver, label: str, frame: dict, iterations: int) -> None:
+        channel = await receiver.new_channel()
+        samples = []
+        for _ in range(iterations + 5):
+            started = time.perf_counter()
+            await sender.send(channel, frame)
+            await receiver.receive(channel)
+            samples.append(time.perf_counter() - started)
+        samples = samples[5:]
+        self.stdout.write(
+            f"  {label:<7} send→receive  mean {micros(sum(samples) / len(samples))}  "
+            f"p50 {micros(_percentile(samples, 0.5))}  p99 {micros(_percentile(samples, 0.99))}"
+        )
+
+    async def _fanout(self, sender, receiver, frame: dict, group_size: int, messages: int) -> None:
+        group = f"bench_{uuid.uuid4().hex}"
+        channels = [await receiver.new_channel() for _ in range(group_size)]
+        for channel in channels:
+            await receiver.group_add(group, channel)
+
+        async def drain(channel: str) -> None:
+            for _ in range(messages):
+                await receiver.receive(channel)
+
+        started = time.perf_counter()
+        readers = asyncio.gather(*(drain(channel) for channel in channels))
+        for _ in range(messages):
+            await sender.group_send(group, frame)
+        await readers
+        elapsed = time.perf_counter() - started
+        delivered = group_size * messages
+        self.stdout.write(
+            f"  group   {messages} sends × {group_size} members  "
+            f"{delivered / elapsed:,.0f} deliveries/s  {messages / elapsed:,.0f} group_send/s"
+        )
+        for channel in channels:
+            await receiver.group_discard(group, channel)
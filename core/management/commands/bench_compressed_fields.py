@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+
+import orjson
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import measure, micros, sample_dashboard, sample_raw_answers
+from core.fields import MARKER, zstandard
+
+
+def _synthetic_rows(count: int) -> list[tuple[str, dict]]:
+    rows = []
+    for index in range(count):
+        session_id = uuid.uuid4()
+        dashboard = sample_dashboard(session_id, richness=3 + index % 6)
+        rows.append((json.dumps(dashboard, ensure_ascii=False, indent=2), sample_raw_answers(session_id)))
+    return rows
+
+
+def _database_rows(count: int) -> list[tuple[str, dict]]:
+    from ai.models import AnalysisSession, AnalysisSessionStatus
+
+    return list(
+        AnalysisSession.objects.filter(status=AnalysisSessionStatus.SUCCEEDED)
+        .order_by("-created_at")
+        .values_list("ai_raw_response", "raw_answers")[:count]
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure stored size and encode/decode cost of the compressed "
+        "AnalysisSession columns: plain, zstd, and zstd with a dictionary "
+        "trained on half of the samples and applied to the other half."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=400)
+        parser.add_argument("--iterations", type=int, default=500)
+        parser.add_argument("--dict-size", type=int, default=64 * 1024)
+        parser.add_argument(
+            "--from-db", action="store_true", help="Use recent successful analyses instead of synthetic ones."
+        )
+
+    def handle(self, *args, **options):
+        if zstandard is None:
+            raise CommandError("bench_compressed_fields requires the zstandard package.")
+        rows = (_database_rows if options["from_db"] else _synthetic_rows)(options["samples"])
+        if len(rows) < 20:
+            raise CommandError("Need at least 20 samples.")
+        columns = {
+            "ai_raw_response": [raw.encode("utf-8") for raw, _ in rows],
+            "raw_answers": [orjson.dumps(answers) for _, answers in rows],
+        }
+        level = settings.ZSTD_FIELD_LEVEL
+        iterations = options["iterations"]
+
+        for column, values in columns.items():
+            half = len(values) // 2
+            training, testing = values[:half], values[half:]
+            dictionary = zstandard.train_dictionary(options["dict_size"], training)
+            cases = {
+                "zstd": (zstandard.ZstdCompressor(level=level), zstandard.ZstdDecompressor()),
+                "zstd+dict": (
+                    zstandard.ZstdCompressor(level=level, dict_data=dictionary),
+                    zstandard.ZstdDecompressor(dict_data=dictionary),
+                ),
+            }
+            plain = sum(len(value) for value in testing)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{column} ({len(testing)} rows)"))
+            self.stdout.write(f"  plain      {plain / len(testing):9.0f} bytes/row")
+            sample = testing[0]
+            for name, (compressor, decompressor) in cases.items():
+                # Stored form as written by core.fields: marker + base64 frame.
+                stored = [MARKER + base64.b64encode(compressor.compress(value)).decode() for value in testing]
+                size = sum(len(value) for value in stored)
+                encoded = stored[0]
+                encode = measure(
+                    lambda: MARKER + base64.b64encode(compressor.compress(sample)).decode(),
+                    iterations=iterations,
+                )
+                decode = measure(
+                    lambda: decompressor.decompress(base64.b64decode(encoded[len(MARKER):])),
+                    iterations=iterations,
+                )
+                self.stdout.write(
+                    f"  {name:<10} {size / len(testing):9.0f} bytes/row ({size / plain:.0%})  "
+                    f"encode {micros(encode)}  decode {micros(decode)}"
+                )
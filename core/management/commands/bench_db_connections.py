@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+
+import psycopg
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from psycopg_pool import ConnectionPool
+
+from core.benchmarks import micros
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request/per-task connection cost against the configured "
+        "PostgreSQL database: a fresh connection each time versus a psycopg_pool "
+        "checkout, plus one full Django request cycle with the current settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("bench_db_connections needs a PostgreSQL DATABASE_URL.")
+        iterations = options["iterations"]
+        params = connection.get_connection_params()
+        params["autocommit"] = True
+
+        def fresh():
+            with psycopg.connect(**params) as conn:
+                conn.execute("SELECT 1")
+
+        pool = ConnectionPool(
+            kwargs=params,
+            min_size=1,
+            max_size=1,
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+
+        def pooled():
+            with pool.connection() as conn:
+                conn.execute("SELECT 1")
+
+        def django_cycle():
+            # What a gunicorn request or Celery task goes through: signals
+            # around the unit of work, one query in between.
+            close_old_connections()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            close_old_connections()
+
+        if connection.settings_dict["OPTIONS"].get("pool"):
+            mode = "pool"
+        else:
+            mode = f"CONN_MAX_AGE={connection.settings_dict['CONN_MAX_AGE']}"
+        cases = {
+            "fresh connection": fresh,
+            "pool checkout": pooled,
+            f"django cycle ({mode})": django_cycle,
+        }
+        results: dict[str, float] = {}
+        try:
+            for name, func in cases.items():
+                func()
+                samples = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    func()
+                    samples.append(time.perf_counter() - started)
+                mean = sum(samples) / len(samples)
+                results[name] = mean
+                self.stdout.write(
+                    f"{name:<32} mean {micros(mean)}  p50 {micros(_percentile(samples, 0.5))}  "
+                    f"p99 {micros(_percentile(samples, 0.99))}"
+                )
+        finally:
+            pool.close()
+            connection.close()
+
+        saved = results["fresh connection"] - results["pool checkout"]
+        self.stdout.write(
+            self.style.SUCCESS(f"connection setup removed per request/task: {micros(saved).strip()}")
+        )
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import msgpack
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import measure, micros, sample_dashboard
+from core.fanout import decode_frame, encode_frame
+
+
+class Command(BaseCommand):
+    help = (
+        "CPU cost of delivering one analysis result to a websocket group: "
+        "the dict message re-encoded by every consumer versus a frame encoded "
+        "once and forwarded as bytes. Includes the channel layer's msgpack "
+        "hop. Needs no database or Redis."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumers", type=int, default=50)
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--richness", type=int, default=12, help="Dashboard text size multiplier.")
+
+    def handle(self, *args, **options):
+        consumers = options["consumers"]
+        dashboard = sample_dashboard(uuid.uuid4(), richness=options["richness"])
+
+        def per_consumer():
+            # group_send packs once; each receiving consumer unpacks the dict
+            # and send_json() re-serializes it.
+            packed = msgpack.packb({"type": "result", "data": dashboard}, use_bin_type=True)
+            for _ in range(consumers):
+                event = msgpack.unpackb(packed, raw=False)
+                json.dumps({"type": "result", "data": event["data"]})
+
+        def encode_once():
+            packed = msgpack.packb(encode_frame({"type": "result", "data": dashboard}), use_bin_type=True)
+            for _ in range(consumers):
+                decode_frame(msgpack.unpackb(packed, raw=False))
+
+        frame = encode_frame({"type": "result", "data": dashboard})
+        self.stdout.write(
+            f"result frame {len(json.dumps(dashboard, ensure_ascii=False).encode())} bytes JSON, "
+            f"{len(frame['payload'])} bytes on the channel layer ({frame['codec'] or 'uncompressed'}), "
+            f"{consumers} consumers"
+        )
+        baseline = measure(per_consumer, iterations=options["iterations"])
+        optimized = measure(encode_once, iterations=options["iterations"])
+        self.stdout.write(f"  re-encode per consumer {micros(baseline)}")
+        self.stdout.write(f"  encode once            {micros(optimized)}")
+        self.stdout.write(self.style.SUCCESS(f"  {baseline / optimized:.1f}x less CPU per fan-out"))
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.benchmarks import micros
+from jobs.models import Job
+from jobs.services.queue import enqueue
+from jobs.services.worker import Worker
+
+BENCH_QUEUE = "bench"
+_NAME = "core.management.commands.bench_job_queue.record"
+_latencies: list[float] = []
+
+
+def record(enqueued_at: float | None = None) -> None:
+    if enqueued_at is not None:
+        _latencies.append(time.perf_counter() - enqueued_at)
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the PostgreSQL job queue on the configured database: "
+        "enqueue rate, drain throughput of one worker, and claim latency "
+        "(commit of an enqueue to the job starting on an idle worker). Uses "
+        "its own queue and removes its jobs afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--samples", type=int, default=100, help="Single enqueues timed for claim latency.")
+
+    def handle(self, *args, **options):
+        Job.objects.filter(queue=BENCH_QUEUE).delete()
+        count = options["jobs"]
+        worker = Worker([BENCH_QUEUE], concurrency=options["concurrency"], name="bench")
+        self.stdout.write(f"{connection.vendor}, {count} no-op jobs, {options['concurrency']} threads")
+        try:
+            started = time.perf_counter()
+            with transaction.atomic():
+                for _ in range(count):
+                    enqueue(_NAME, queue=BENCH_QUEUE)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  enqueue          {count / elapsed:9,.0f} jobs/s (one transaction)")
+
+            thread = threading.Thread(target=worker.run, daemon=True)
+            started = time.perf_counter()
+            thread.start()
+            while worker.processed < count and thread.is_alive():
+                time.sleep(0.005)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  drain            {count / elapsed:9,.0f} jobs/s")
+
+            _latencies.clear()
+            for _ in range(options["samples"]):
+                enqueue(_NAME, [time.perf_counter()], queue=BENCH_QUEUE)
+                expected = len(_latencies) + 1
+                while len(_latencies) < expected:
+                    time.sleep(0.0005)
+            self.stdout.write(
+                f"  claim latency    p50 {micros(_percentile(_latencies, 0.5))}  "
+                f"p99 {micros(_percentile(_latencies, 0.99))}"
+            )
+            if connection.vendor != "postgresql":
+                self.stdout.write(f"  (no LISTEN/NOTIFY: idle workers poll every {worker.poll_interval:g}s)")
+        finally:
+            worker.stop()
+            Job.objects.filter(queue=BENCH_QUEUE).delete()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from ai.serializers import AnalysisSessionSerializer, flat_analysis_session
+from core.benchmarks import measure, micros, sample_objects
+from core.renderers import dumps
+from review.serializers import (
+    MeetingRequestSerializer,
+    ReviewAnswerSerializer,
+    ReviewQuestionSerializer,
+    ReviewSessionSerializer,
+    flat_meeting_request,
+    flat_review_answer,
+    flat_review_question,
+    flat_review_session,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF ModelSerializers with the precompiled flat serializers for "
+        "the hot response shapes. Fails if the rendered bytes differ. Needs no database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        objects = sample_objects()
+        request = RequestFactory().get("/", HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        session = objects["session"]
+        question = objects["question"]
+        answer = objects["answer"]
+        analysis = objects["analysis"]
+        meeting_requests = objects["meeting_requests"]
+        analysis_row = {key: getattr(analysis, key) for key in flat_analysis_session.row_keys()}
+        meeting_rows = [
+            {
+                "id": item.id,
+                "review_session_id": item.review_session_id,
+                "status": item.status,
+                "review_session__email": session.email,
+                "review_session__phone_number": session.phone_number,
+                "created_at": item.created_at,
+            }
+            for item in meeting_requests
+        ]
+
+        cases = {
+            "session": (
+                lambda: ReviewSessionSerializer(session).data,
+                lambda: flat_review_session(session),
+            ),
+            "question": (
+                lambda: ReviewQuestionSerializer(question).data,
+                lambda: flat_review_question(question),
+            ),
+            "answer": (
+                lambda: ReviewAnswerSerializer(answer, context={"request": request}).data,
+                lambda: flat_review_answer(answer, {"request": request}),
+            ),
+            "meeting-requests (rows)": (
+                lambda: MeetingRequestSerializer(meeting_requests, many=True).data,
+                lambda: flat_meeting_request.rows(meeting_rows),
+            ),
+            "analysis": (
+                lambda: AnalysisSessionSerializer(analysis).data,
+                lambda: flat_analysis_session(analysis),
+            ),
+            "analysis (row)": (
+                lambda: AnalysisSessionSerializer(analysis).data,
+                lambda: flat_analysis_session.row(analysis_row),
+            ),
+        }
+
+        for name, (drf, flat) in cases.items():
+            if dumps(drf()) != dumps(flat()):
+                raise CommandError(f"{name}: flat output differs from DRF.")
+            drf_elapsed = measure(drf, iterations=iterations)
+            flat_elapsed = measure(flat, iterations=iterations)
+            self.stdout.write(
+                f"{name:<24} drf {micros(drf_elapsed)}  flat {micros(flat_elapsed)}  "
+                f"x{drf_elapsed / flat_elapsed:.1f}"
+            )
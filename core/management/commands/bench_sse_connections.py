@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import time
+import tracemalloc
+import uuid
+
+from asgiref.testing import ApplicationCommunicator
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.asgi import application
+from core.db import close_asyncpg_pool
+
+
+def _sse_scope(key: str) -> dict:
+    host = next((host for host in settings.ALLOWED_HOSTS if host[:1] not in ("*", ".")), "localhost")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/api/ai/{key}/events/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", host.encode()), (b"accept", b"text/event-stream")],
+        # No client address, like WebsocketCommunicator: WS_MAX_PER_IP would
+        # refuse most of the streams.
+        "client": None,
+        "server": ("localhost", 80),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Memory per idle analysis stream: the Server-Sent Events endpoint "
+        "against the websocket consumer, both through the ASGI application "
+        "and the configured channel layer. Opens N streams of each kind, waits "
+        "for the status snapshot and compares traced Python allocations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = options["connections"]
+        self.stdout.write(f"{count} idle connections each")
+        asyncio.run(self._run(count))
+
+    async def _run(self, count: int) -> None:
+        try:
+            for name, opener in (("websocket", self._open_ws), ("sse", self._open_sse)):
+                # One connection first, so imports and pools are not counted.
+                await self._measure(opener, 1)
+                per_connection, elapsed = await self._measure(opener, count)
+                self.stdout.write(
+                    f"  {name:<10} {per_connection / 1024:8.1f} KiB/connection  "
+                    f"open {elapsed * 1000 / count:6.2f}ms/connection"
+                )
+        finally:
+            await close_asyncpg_pool()
+
+    async def _measure(self, opener, count: int) -> tuple[float, float]:
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        connections = await asyncio.gather(*(opener(str(uuid.uuid4())) for _ in range(count)))
+        elapsed = time.perf_counter() - started
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+        await asyncio.gather(*(close() for close in connections))
+        return used / count, elapsed
+
+    async def _open_ws(self, key: str):
+        communicator = WebsocketCommunicator(application, f"/ws/analysis/{key}/")
+        await communicator.connect()
+        await communicator.receive_from(timeout=30)
+        return communicator.disconnect
+
+    async def _open_sse(self, key: str):
+        communicator = ApplicationCommunicator(application, _sse_scope(key))
+        await communicator.send_input({"type": "http.request", "body": b"", "more_body": False})
+        await communicator.receive_output(30)  # response start
+        await communicator.receive_output(30)  # retry hint and status snapshot
+
+        async def close() -> None:
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(30)
+
+        return close
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.ids import uuid7
+
+_GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare uuid4 and uuid7 primary keys on PostgreSQL: bulk insert "
+        "throughput, PK and FK index size, and buffer reads for a lookup of the "
+        "newest rows. Uses temporary tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2_000_000)
+        parser.add_argument("--batch", type=int, default=50_000)
+        parser.add_argument("--recent", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("bench_uuid_keys needs a PostgreSQL DATABASE_URL.")
+        rows, batch = options["rows"], options["batch"]
+
+        with connection.cursor() as cursor:
+            for name, generate in _GENERATORS.items():
+                parent, child = f"bench_{name}_session", f"bench_{name}_answer"
+                cursor.execute(
+                    f"CREATE TEMP TABLE {parent} (id uuid PRIMARY KEY, created_at timestamptz NOT NULL DEFAULT now())"
+                )
+                cursor.execute(
+                    f"CREATE TEMP TABLE {child} (id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY, "
+                    f"session_id uuid NOT NULL REFERENCES {parent} (id))"
+                )
+                cursor.execute(f"CREATE INDEX ON {child} (session_id)")
+
+                elapsed = 0.0
+                last_batch: list[uuid.UUID] = []
+                for offset in range(0, rows, batch):
+                    ids = [generate() for _ in range(min(batch, rows - offset))]
+                    started = time.perf_counter()
+                    with cursor.copy(f"COPY {parent} (id) FROM STDIN") as copy:
+                        for value in ids:
+                            copy.write_row((value,))
+                    with cursor.copy(f"COPY {child} (session_id) FROM STDIN") as copy:
+                        for value in ids:
+                            copy.write_row((value,))
+                    elapsed += time.perf_counter() - started
+                    last_batch = ids
+
+                cursor.execute(f"ANALYZE {parent}")
+                cursor.execute(
+                    "SELECT pg_relation_size(%s::regclass), pg_relation_size(%s::regclass)",
+                    [f"{parent}_pkey", f"{child}_session_id_idx"],
+                )
+                pk_size, fk_size = cursor.fetchone()
+
+                recent = last_batch[-options["recent"]:]
+                cursor.execute(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT id FROM {parent} WHERE id = ANY(%s)",
+                    [recent],
+                )
+                plan = cursor.fetchone()[0][0]["Plan"]
+                buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(f"  insert        {rows / elapsed:12,.0f} rows/s")
+                self.stdout.write(f"  pk index      {pk_size / 1024 / 1024:12.1f} MiB")
+                self.stdout.write(f"  fk index      {fk_size / 1024 / 1024:12.1f} MiB")
+                self.stdout.write(f"  recent lookup {buffers:12,} buffers for {len(recent)} newest ids")
+
+                cursor.execute(f"DROP TABLE {child}, {parent}")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import path
+
+from ai.consumers import AnalysisConsumer
+from ai.models import AnalysisSession
+from ai.services.analysis import get_status_snapshot, status_snapshot_cache
+from core.db import close_asyncpg_pool, get_asyncpg_pool
+
+
+class _ThreadPoolConsumer(AnalysisConsumer):
+    """
+    The previous connect path: the sync loader through the thread pool.
+    """
+
+    async def _send_current_status(self) -> None:
+        await self.send_json(await database_sync_to_async(get_status_snapshot)(self.session_key))
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a reconnect storm against AnalysisConsumer: N clients connect "
+        "at once with a cold snapshot cache and wait for the status frame. "
+        "Compares the thread-pool ORM path with the native async single query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("bench_ws_reconnect needs a PostgreSQL DATABASE_URL.")
+        clients = options["clients"]
+        # Mostly known analyses (by review session id), some unknown ids.
+        keys = [
+            str(key)
+            for key in AnalysisSession.objects.exclude(review_session=None)
+            .order_by("-created_at")
+            .values_list("review_session_id", flat=True)[: clients * 3 // 4]
+        ]
+        keys += [str(uuid.uuid4()) for _ in range(clients - len(keys))]
+        self.stdout.write(
+            f"{clients} concurrent clients, {options['rounds']} rounds, "
+            f"async pool max {settings.ASYNC_PG_POOL_MAX_SIZE}"
+        )
+        for name, consumer in (("thread pool", _ThreadPoolConsumer), ("native async", AnalysisConsumer)):
+            application = URLRouter([path("ws/analysis/<uuid:session_id>/", consumer.as_asgi())])
+            samples, wall = asyncio.run(self._storm(application, keys, options["rounds"]))
+            self.stdout.write(
+                f"{name:<14} p50 {_percentile(samples, 0.5) * 1000:8.2f}ms  "
+                f"p99 {_percentile(samples, 0.99) * 1000:8.2f}ms  "
+                f"max {max(samples) * 1000:8.2f}ms  storm {wall * 1000:8.1f}ms"
+            )
+
+    async def _storm(self, application, keys: list[str], rounds: int) -> tuple[list[float], float]:
+        await get_asyncpg_pool()
+
+        async def reconnect(key: str) -> float:
+            communicator = WebsocketCommunicator(application, f"/ws/analysis/{key}/")
+            started = time.perf_counter()
+            await communicator.connect()
+            await communicator.receive_json_from(timeout=30)
+            elapsed = time.perf_counter() - started
+            await communicator.disconnect()
+            return elapsed
+
+        samples: list[float] = []
+        wall = 0.0
+        try:
+            for _ in range(rounds):
+                await database_sync_to_async(status_snapshot_cache.invalidate)(*keys)
+                started = time.perf_counter()
+                samples += await asyncio.gather(*(reconnect(key) for key in keys))
+                wall += time.perf_counter() - started
+        finally:
+            await close_asyncpg_pool()
+        return samples, wall / rounds
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from review.services.cleanup import collect_abandoned_sessions, reconcile_orphaned_audio
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete abandoned review sessions (with their audio) and stored audio "
+        "that no answer references, one bounded batch at a time. The same "
+        "step runs from celery beat; use this to catch up after a backlog."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to pause between steps.")
+        parser.add_argument("--sessions-only", action="store_true")
+        parser.add_argument("--orphans-only", action="store_true")
+
+    def handle(self, *args, **options):
+        sessions = scanned = deleted = 0
+        sessions_done = options["orphans_only"]
+        orphans_done = options["sessions_only"]
+        while not (sessions_done and orphans_done):
+            if not sessions_done:
+                collected = collect_abandoned_sessions()
+                sessions += collected
+                sessions_done = collected == 0
+            if not orphans_done:
+                page = reconcile_orphaned_audio()
+                scanned += page["scanned"]
+                deleted += page["deleted"]
+                # A short page is the end of the listing (the scan wraps around).
+                orphans_done = page["scanned"] < settings.GC_ORPHAN_PAGE
+            self.stdout.write(f"{sessions} sessions collected, {deleted} of {scanned} stored objects deleted")
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+
+import orjson
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+from ai.models import AnalysisSession, AnalysisSessionStatus
+from core.fields import MIN_PACK_SIZE, is_packed
+
+_FINISHED = (AnalysisSessionStatus.SUCCEEDED, AnalysisSessionStatus.FAILED)
+
+
+def _needs_packing(stored: str | None, *, json: bool) -> bool:
+    if not stored or len(stored.encode("utf-8")) < MIN_PACK_SIZE:
+        return False
+    if json:
+        # A compressed document is a JSON string; anything else is plain.
+        return not (stored.startswith('"') and is_packed(orjson.loads(stored)))
+    return not is_packed(stored)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress ai_raw_response and raw_answers of finished analyses written "
+        "before the columns were compressed. Walks the primary key in small "
+        "batches, each its own short transaction that skips locked rows, so it "
+        "can run next to live traffic and be resumed with --after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=500)
+        parser.add_argument("--sleep", type=float, default=0.2, help="Seconds to pause between batches.")
+        parser.add_argument("--after", default=None, help="Resume after this analysis id.")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many rows (0 = all).")
+
+    def handle(self, *args, **options):
+        last_id = options["after"]
+        scanned = rewritten = 0
+        while True:
+            with transaction.atomic():
+                rows = AnalysisSession.objects.select_for_update(skip_locked=True).filter(status__in=_FINISHED)
+                if last_id:
+                    rows = rows.filter(id__gt=last_id)
+                # Cast to plain text so the stored (possibly compressed) form is
+                # seen instead of the transparently decoded value.
+                batch = list(
+                    rows.order_by("id")
+                    .annotate(
+                        stored_response=Cast("ai_raw_response", TextField()),
+                        stored_answers=Cast("raw_answers", TextField()),
+                    )
+                    .only("id", "ai_raw_response", "raw_answers")[: options["batch"]]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                pending = [
+                    row
+                    for row in batch
+                    if _needs_packing(row.stored_response, json=False)
+                    or _needs_packing(row.stored_answers, json=True)
+                ]
+                if pending:
+                    # The fields compress on save; already compressed or small
+                    # values are written back unchanged.
+                    AnalysisSession.objects.bulk_update(pending, ["ai_raw_response", "raw_answers"])
+            scanned += len(batch)
+            rewritten += len(pending)
+            self.stdout.write(f"{scanned} scanned, {rewritten} rewritten, last id {last_id}")
+            if options["limit"] and scanned >= options["limit"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {scanned} scanned, {rewritten} rewritten."))
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.services.retention import restore_session
+
+
+class Command(BaseCommand):
+    help = "Restore one review session or analysis session removed by archive_history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("session_id", help="Review session or analysis session id.")
+
+    def handle(self, *args, **options):
+        try:
+            restored = restore_session(options["session_id"])
+        except LookupError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f"Restored {', '.join(restored)}."))
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.models import DEFAULT_QUEUE
+from jobs.services.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the PostgreSQL queue (TASK_BACKEND=postgres) "
+        "on a pool of threads. With --beat the worker also enqueues the "
+        "periodic tasks of CELERY_BEAT_SCHEDULE; any number of workers may "
+        "run it, each run is enqueued once. SIGTERM/SIGINT stop claiming and "
+        "wait for running jobs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-Q", "--queues", default=None, help="Comma-separated queues to consume (default: all of them)."
+        )
+        parser.add_argument("-c", "--concurrency", type=int, default=4, help="Worker threads.")
+        parser.add_argument("--beat", action="store_true", help="Also enqueue due periodic tasks.")
+        parser.add_argument("-n", "--name", default=None, help="Worker name (default: host:pid).")
+
+    def handle(self, *args, **options):
+        if settings.TASK_BACKEND != "postgres":
+            self.stderr.write(
+                self.style.WARNING("TASK_BACKEND is not 'postgres': new work is sent to Celery, not to this worker.")
+            )
+        if options["queues"]:
+            queues = [name.strip() for name in options["queues"].split(",") if name.strip()]
+        else:
+            queues = sorted(
+                {
+                    DEFAULT_QUEUE,
+                    settings.ANALYSIS_REPAIR_QUEUE,
+                    settings.ANALYSIS_BULK_QUEUE,
+                    *(route["queue"] for route in settings.CELERY_TASK_ROUTES.values()),
+                }
+            )
+        worker = Worker(
+            queues,
+            concurrency=max(1, options["concurrency"]),
+            beat=options["beat"],
+            name=options["name"],
+        )
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker.stop())
+        worker.run()
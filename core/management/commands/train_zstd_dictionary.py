@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import orjson
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.models import AnalysisSession, AnalysisSessionStatus
+from core.fields import zstandard
+
+
+class Command(BaseCommand):
+    help = (
+        "Train a shared zstd dictionary on recent successful analyses "
+        "(raw AI responses and answer payloads) and write it to "
+        "ZSTD_DICTIONARY_DIR. Set ZSTD_DICTIONARY to the printed file name to "
+        "use it for new writes; keep older dictionaries so existing rows decode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=2000)
+        parser.add_argument("--size", type=int, default=64 * 1024, help="Dictionary size in bytes.")
+        parser.add_argument("--name", default=None, help="File name (default: okrcoach-<dict id>.dict).")
+
+    def handle(self, *args, **options):
+        if zstandard is None:
+            raise CommandError("train_zstd_dictionary requires the zstandard package.")
+        rows = (
+            AnalysisSession.objects.filter(status=AnalysisSessionStatus.SUCCEEDED)
+            .order_by("-created_at")
+            .values_list("ai_raw_response", "raw_answers")[: options["samples"]]
+        )
+        samples: list[bytes] = []
+        for raw_response, raw_answers in rows.iterator(chunk_size=200):
+            if raw_response:
+                samples.append(raw_response.encode("utf-8"))
+            samples.append(orjson.dumps(raw_answers))
+        if len(samples) < 10:
+            raise CommandError("Not enough successful analyses to train on.")
+
+        dictionary = zstandard.train_dictionary(options["size"], samples)
+        name = options["name"] or f"okrcoach-{dictionary.dict_id()}.dict"
+        directory = Path(settings.ZSTD_DICTIONARY_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / name
+        if path.exists():
+            raise CommandError(f"{path} already exists; dictionaries must never be overwritten.")
+        path.write_bytes(dictionary.as_bytes())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {path} ({len(dictionary.as_bytes())} bytes, id {dictionary.dict_id()}) "
+                f"from {len(samples)} samples. Set ZSTD_DICTIONARY={name}."
+            )
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'channels_payload',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChannelGroupMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group_name', models.CharField(max_length=100)),
+                ('channel', models.CharField(max_length=100)),
+                ('process', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'channels_group',
+                'indexes': [models.Index(fields=['group_name', 'process'], name='channels_group_process'), models.Index(fields=['expires_at'], name='channels_group_expires')],
+                'constraints': [models.UniqueConstraint(fields=('group_name', 'channel'), name='channels_group_member')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.db import models
+
+
+class ChannelGroupMember(models.Model):
+    """
+    Group membership for the PostgreSQL channel layer (core.pglayer): which
+    process's listener a group message must be sent to for each channel.
+    """
+
+    group_name = models.CharField(max_length=100)
+    channel = models.CharField(max_length=100)
+    process = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "channels_group"
+        constraints = [
+            models.UniqueConstraint(fields=["group_name", "channel"], name="channels_group_member"),
+        ]
+        indexes = [
+            models.Index(fields=["group_name", "process"], name="channels_group_process"),
+            models.Index(fields=["expires_at"], name="channels_group_expires"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.group_name} <- {self.channel}"
+
+
+class ChannelPayload(models.Model):
+    """
+    Message too large for a NOTIFY payload; the notification carries its id.
+    """
+
+    data = models.BinaryField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "channels_payload"
+
+    def __str__(self) -> str:
+        return f"ChannelPayload({self.pk})"
@@ -0,0 +1,286 @@
+"""
+Channel layer over PostgreSQL LISTEN/NOTIFY, for deployments without Redis.
+
+Every process that receives on channels (Daphne) holds one dedicated LISTEN
+connection on a notification channel derived from its ``client_prefix``;
+process-specific channel names embed that prefix, so a send goes straight
+to the owning process's listener. Group membership is kept in
+``channels_group`` with the owning process, and ``group_send`` is a single
+statement that notifies each process with members once; the listener fans
+the message out to its local channels.
+
+Messages are msgpack-encoded. One that does not fit a NOTIFY payload
+(8000 bytes) is stored in ``channels_payload`` and the notification carries
+its id. On the listener's event loop (and the server's main loop) writes go
+through the core.db async pool. Callers on the short-lived loops of
+``async_to_sync`` (Celery tasks, sync views) write through the process's
+blocking pool instead, so a publish does not pay for a new connection. Delivery is at most once, like
+channels_redis: nothing is redelivered to a listener that was disconnected.
+
+General (non ``!``) channels stay process-local, as in InMemoryChannelLayer;
+nothing in this project sends to them across processes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import msgpack
+import psycopg
+from channels.exceptions import ChannelFull
+from channels.layers import InMemoryChannelLayer
+from django.conf import settings
+from psycopg import sql
+
+from core.db import connect_dedicated, get_asyncpg_pool, get_sync_pool, on_main_loop
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must be shorter than 8000 bytes.
+NOTIFY_LIMIT = 7999
+_RECONNECT_DELAY = 1.0
+
+_SEND_SQL = "SELECT pg_notify(%(listen)s, %(head)s::text || %(body)s::text)"
+_SEND_STORED_SQL = """
+WITH stored AS (
+    INSERT INTO channels_payload (data, expires_at)
+    VALUES (%(data)s, now() + make_interval(secs => %(expiry)s::float8))
+    RETURNING id
+)
+SELECT pg_notify(%(listen)s, %(head)s::text || stored.id) FROM stored
+"""
+# The listen channel is derived in SQL exactly as in ``_listen_channel``.
+_GROUP_SEND_SQL = """
+SELECT pg_notify('channels_' || md5(process), %(head)s::text || %(body)s::text)
+FROM channels_group
+WHERE group_name = %(group)s AND expires_at > now() AND process <> %(skip)s
+GROUP BY process
+"""
+_GROUP_SEND_STORED_SQL = """
+WITH targets AS (
+    SELECT DISTINCT process FROM channels_group
+    WHERE group_name = %(group)s AND expires_at > now() AND process <> %(skip)s
+), stored AS (
+    INSERT INTO channels_payload (data, expires_at)
+    SELECT %(data)s, now() + make_interval(secs => %(expiry)s::float8)
+    WHERE EXISTS (SELECT 1 FROM targets)
+    RETURNING id
+)
+SELECT pg_notify('channels_' || md5(targets.process), %(head)s::text || stored.id)
+FROM targets CROSS JOIN stored
+"""
+_GROUP_ADD_SQL = """
+INSERT INTO channels_group (group_name, channel, process, expires_at)
+VALUES (%(group)s, %(channel)s, %(process)s, now() + make_interval(secs => %(expiry)s::float8))
+ON CONFLICT (group_name, channel)
+DO UPDATE SET process = EXCLUDED.process, expires_at = EXCLUDED.expires_at
+"""
+_GROUP_DISCARD_SQL = "DELETE FROM channels_group WHERE group_name = %(group)s AND channel = %(channel)s"
+_CLEANUP_SQL = (
+    "DELETE FROM channels_payload WHERE expires_at < now()",
+    "DELETE FROM channels_group WHERE expires_at < now()",
+)
+
+
+def _listen_channel(process: str) -> str:
+    return "channels_" + hashlib.md5(process.encode("ascii")).hexdigest()
+
+
+def _process(channel: str) -> str | None:
+    """
+    Owning process of a process-specific channel (``<prefix>.<process>!<local>``).
+    """
+
+    if "!" not in channel:
+        return None
+    return channel.split("!", 1)[0].rsplit(".", 1)[-1]
+
+
+class PostgresChannelLayer(InMemoryChannelLayer):
+    """
+    InMemoryChannelLayer for local queues and groups, plus LISTEN/NOTIFY
+    delivery between processes. Options: ``expiry`` (seconds a stored large
+    payload lives), ``group_expiry``, ``capacity``, ``channel_capacity`` and
+    ``cleanup_interval`` (seconds between purges of expired rows).
+    """
+
+    extensions = ["groups", "flush"]
+
+    def __init__(self, cleanup_interval: float = 60.0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cleanup_interval = cleanup_interval
+        self.client_prefix = secrets.token_hex(6)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._listener: asyncio.Task | None = None
+        self._listening: asyncio.Event | None = None
+
+    # Listener
+
+    def _on_listener_loop(self) -> bool:
+        return self._loop is asyncio.get_running_loop() and self._listener is not None and not self._listener.done()
+
+    async def _ensure_listener(self) -> None:
+        if not self._on_listener_loop():
+            self._loop = asyncio.get_running_loop()
+            self._listening = asyncio.Event()
+            self._listener = self._loop.create_task(self._listen())
+        if self._listening.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._listening.wait(), settings.ASYNC_PG_POOL_TIMEOUT)
+        except TimeoutError:
+            # Local delivery still works; remote messages arrive once connected.
+            logger.warning("Channel layer listener is not connected yet")
+
+    async def _listen(self) -> None:
+        channel = _listen_channel(self.client_prefix)
+        while True:
+            try:
+                async with await connect_dedicated(autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                    self._listening.set()
+                    while True:
+                        async for notify in conn.notifies(timeout=self.cleanup_interval):
+                            await self._dispatch(notify.payload)
+                        await self._cleanup()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._listening.clear()
+                logger.warning("Channel layer listener disconnected; reconnecting", exc_info=True)
+                await asyncio.sleep(_RECONNECT_DELAY)
+
+    async def _dispatch(self, payload: str) -> None:
+        kind, name, body = payload.split(" ", 2)
+        try:
+            if kind.isupper():
+                data = await self._fetch(int(body))
+                if data is None:
+                    logger.warning("Channel layer payload %s expired before delivery", body)
+                    return
+            else:
+                data = base64.b64decode(body)
+            message = msgpack.unpackb(data, raw=False)
+            if kind in ("g", "G"):
+                await super().group_send(name, message)
+            else:
+                await super().send(name, message)
+        except ChannelFull:
+            logger.warning("Channel %s is full; dropping message", name)
+        except Exception:
+            logger.exception("Could not deliver channel layer message to %s", name)
+
+    async def _fetch(self, payload_id: int) -> bytes | None:
+        async with self._connection() as conn:
+            cursor = await conn.execute("SELECT data FROM channels_payload WHERE id = %s", (payload_id,))
+            row = await cursor.fetchone()
+        return bytes(row[0]) if row else None
+
+    async def _cleanup(self) -> None:
+        try:
+            await self._execute(*_CLEANUP_SQL)
+        except Exception:  # pragma: no cover - database errors
+            logger.warning("Channel layer cleanup failed", exc_info=True)
+
+    # Writes
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        # On any other loop this is a one-shot connection (see core.db).
+        pool = await get_asyncpg_pool()
+        async with pool.acquire() as conn:
+            yield conn
+
+    async def _execute(self, *statements: str, params: dict[str, Any] | None = None) -> None:
+        if not (self._on_listener_loop() or on_main_loop()):
+            # A sync caller's async_to_sync loop: it serves only this call, so
+            # block it on the process's pool rather than connect afresh.
+            with get_sync_pool().connection() as conn:
+                for statement in statements:
+                    conn.execute(statement, params)
+            return
+        async with self._connection() as conn:
+            for statement in statements:
+                await conn.execute(statement, params)
+            # Pool fallback connections do not commit on exit.
+            await conn.commit()
+
+    async def _notify(self, kind: str, name: str, message: dict[str, Any], params: dict[str, Any]) -> None:
+        data = msgpack.packb(message, use_bin_type=True)
+        body = base64.b64encode(data).decode("ascii")
+        head = f"{kind} {name} "
+        params = {**params, "head": head}
+        if len(head) + len(body) <= NOTIFY_LIMIT:
+            statement = _GROUP_SEND_SQL if kind == "g" else _SEND_SQL
+            await self._execute(statement, params={**params, "body": body})
+        else:
+            statement = _GROUP_SEND_STORED_SQL if kind == "g" else _SEND_STORED_SQL
+            params.update(data=data, expiry=self.expiry, head=f"{kind.upper()} {name} ")
+            await self._execute(statement, params=params)
+
+    # Channel layer API
+
+    async def new_channel(self, prefix: str = "specific.") -> str:
+        await self._ensure_listener()
+        return f"{prefix}.{self.client_prefix}!{secrets.token_hex(6)}"
+
+    async def receive(self, channel: str) -> dict[str, Any]:
+        await self._ensure_listener()
+        return await super().receive(channel)
+
+    async def send(self, channel: str, message: dict[str, Any]) -> None:
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        process = _process(channel)
+        # Local queues belong to the listener's loop; other loops go via NOTIFY.
+        if process is None or (process == self.client_prefix and self._on_listener_loop()):
+            await super().send(channel, message)
+            return
+        await self._notify("c", channel, message, {"listen": _listen_channel(process)})
+
+    async def group_add(self, group: str, channel: str) -> None:
+        process = _process(channel)
+        if process in (None, self.client_prefix):
+            await super().group_add(group, channel)
+        if process is not None:
+            await self._execute(
+                _GROUP_ADD_SQL,
+                params={"group": group, "channel": channel, "process": process, "expiry": self.group_expiry},
+            )
+
+    async def group_discard(self, group: str, channel: str) -> None:
+        await super().group_discard(group, channel)
+        if _process(channel) is not None:
+            await self._execute(_GROUP_DISCARD_SQL, params={"group": group, "channel": channel})
+
+    async def group_send(self, group: str, message: dict[str, Any]) -> None:
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        skip = ""
+        if self._on_listener_loop():
+            await super().group_send(group, message)
+            skip = self.client_prefix
+        await self._notify("g", group, message, {"group": group, "skip": skip})
+
+    async def flush(self) -> None:
+        await super().flush()
+        await self._execute("DELETE FROM channels_group", "DELETE FROM channels_payload")
+
+    async def close(self) -> None:
+        """
+        Stop listening and drop this process's group memberships.
+        """
+
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        await self._execute("DELETE FROM channels_group WHERE process = %(process)s", params={"process": self.client_prefix})
+
+
+__all__ = ["NOTIFY_LIMIT", "PostgresChannelLayer"]
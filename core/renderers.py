@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from django.http import HttpResponse
+from django.utils.http import parse_header_parameters
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+
+# UUIDs and datetimes are native to orjson; OPT_UTC_Z matches DRF's "Z"
+# suffix for UTC. Output is UTF-8 (the ensure_ascii=False equivalent).
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    # Decimal, lazy translation strings, querysets, generators, etc.
+    return _fallback_encoder.default(obj)
+
+
+def dumps(data: Any, *, indent: bool = False) -> bytes:
+    option = (_OPTIONS | orjson.OPT_INDENT_2) if indent else _OPTIONS
+    return orjson.dumps(data, default=_default, option=option)
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data)
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    """
+    JSON response for plain Django (async) views, rendered like the DRF API.
+    """
+
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = False
+        if accepted_media_type:
+            _, params = parse_header_parameters(accepted_media_type)
+            requested = params.get("indent", "")
+            indent = requested.isdigit() and int(requested) > 0
+        return dumps(data, indent=indent)
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
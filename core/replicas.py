@@ -0,0 +1,174 @@
+"""
+Primary/replica routing for the optional DATABASE_REPLICA_URLS.
+
+Reads go to a replica only inside safe (GET/HEAD/OPTIONS) HTTP requests
+that are not pinned to the primary. Everything else -- Celery, consumers,
+management commands, writes and reads after a write -- uses the primary.
+
+A client is pinned for REPLICA_PIN_SECONDS after a successful write, by
+cookie and by a per-session cache key derived from ``session_id`` /
+``review_session_id`` URL kwargs (for clients that drop cookies).
+"""
+
+from __future__ import annotations
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, TypeVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+T = TypeVar("T")
+
+PIN_COOKIE = "okr_db_primary"
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+_SESSION_KWARGS = ("session_id", "review_session_id")
+
+# Alias to serve reads from; None means the primary.
+_read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+
+
+def _pin_key(session_id) -> str:
+    return f"db-pin:{session_id}"
+
+
+def pin_session(session_id) -> None:
+    cache.set(_pin_key(session_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def session_pinned(session_id) -> bool:
+    return bool(cache.get(_pin_key(session_id)))
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def reading_from_replica() -> bool:
+    return _read_alias.get() is not None
+
+
+def primary_on_miss(load: Callable[[], T]) -> T:
+    """
+    Run ``load`` and, if it finds nothing on a replica, retry on the primary
+    so rows created moments ago (before replication caught up) are found.
+    The rest of the request then stays on the primary as well.
+    """
+
+    value = load()
+    if value is None and reading_from_replica():
+        _read_alias.set(None)
+        value = load()
+    return value
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes for the rest of the current request/context.
+        _read_alias.set(None)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReadOnlyViewMixin:
+    """
+    For GET-only views: skip the ATOMIC_REQUESTS transaction so replica
+    reads don't also open a primary connection.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_alias.set(self._initial_alias(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        for session_id in self._pin_after_write(request, response):
+            pin_session(session_id)
+        return response
+
+    async def __acall__(self, request):
+        token = _read_alias.set(self._initial_alias(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        for session_id in self._pin_after_write(request, response):
+            await cache.aset(_pin_key(session_id), True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    @staticmethod
+    def _initial_alias(request) -> str | None:
+        if request.method not in _SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._db_pin_ids = [
+            view_kwargs[name] for name in _SESSION_KWARGS if name in view_kwargs
+        ]
+        if reading_from_replica() and any(
+            session_pinned(session_id) for session_id in request._db_pin_ids
+        ):
+            _read_alias.set(None)
+
+    @staticmethod
+    def _pin_after_write(request, response) -> list:
+        """
+        Set the pin cookie after a successful write and return the session
+        ids to pin.
+        """
+
+        if request.method in _SAFE_METHODS or response.status_code >= 400:
+            return []
+        response.set_cookie(
+            PIN_COOKIE,
+            "1",
+            max_age=settings.REPLICA_PIN_SECONDS,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+        return getattr(request, "_db_pin_ids", [])
+
+
+__all__ = [
+    "PIN_COOKIE",
+    "PrimaryReplicaRouter",
+    "ReadOnlyViewMixin",
+    "ReplicaRoutingMiddleware",
+    "pin_session",
+    "primary_on_miss",
+    "reading_from_replica",
+    "session_pinned",
+    "use_primary",
+]
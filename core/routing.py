@@ -2,6 +2,12 @@ from django.urls import path
 
 from core import consumers
 from ai import consumers as ai_consumers
+from review import consumers as review_consumers
+
+# Long-lived HTTP streams, matched before the Django application.
+http_urlpatterns = [
+    path("api/ai/<uuid:session_id>/events/", ai_consumers.AnalysisEventsConsumer.as_asgi()),
+]
 
 websocket_urlpatterns = [
     path("ws/health/", consumers.HealthCheckConsumer.as_asgi()),
@@ -9,4 +15,8 @@ websocket_urlpatterns = [
         "ws/analysis/<uuid:session_id>/",
         ai_consumers.AnalysisConsumer.as_asgi(),
     ),
+    path(
+        "ws/review/<uuid:session_id>/",
+        review_consumers.ReviewFlowConsumer.as_asgi(),
+    ),
 ]
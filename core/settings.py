@@ -1,3 +1,4 @@
+import copy
 from pathlib import Path
 
 import environ
@@ -39,6 +40,13 @@ CSRF_TRUSTED_ORIGINS = env.list("DJANGO_CSRF_TRUSTED_ORIGINS", default=[])
 TIME_ZONE = env("DJANGO_TIME_ZONE", default="Asia/Tehran")
 ALLOWED_WS_ORIGINS = env.list("DJANGO_ALLOWED_WS_ORIGINS", default=[])
 
+# Serve the hot review endpoints with native async views. Enable for the
+# ASGI (Daphne) processes; WSGI workers should keep the sync DRF views.
+REVIEW_ASYNC_VIEWS = env.bool("REVIEW_ASYNC_VIEWS", default=False)
+# Largest audio answer accepted in chunks over ws/review/<id>/; chunks are
+# spooled to a temporary file past FILE_UPLOAD_MAX_MEMORY_SIZE.
+REVIEW_WS_AUDIO_MAX_BYTES = env.int("REVIEW_WS_AUDIO_MAX_BYTES", default=25 * 1024 * 1024)
+
 USE_PROXY_HEADERS = env.bool("DJANGO_USE_PROXY_HEADERS", default=True)
 
 if USE_PROXY_HEADERS:
@@ -70,12 +78,15 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'channels',
+    'core',
     'ai',
     'review',
+    'jobs',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.compression.CompressionMiddleware',
     'core.whitenoise.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -131,14 +142,72 @@ DATABASES['default']['ATOMIC_REQUESTS'] = env.bool(
     'DJANGO_DB_ATOMIC_REQUESTS', default=True
 )
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # With pooling this also enables the pool's check-on-checkout.
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool(
+        'DJANGO_DB_CONN_HEALTH_CHECKS', default=True
+    )
+    if env.bool('DJANGO_DB_POOL', default=False):
+        # One pool per process: gunicorn sync workers and prefork Celery
+        # children run one request/task at a time, so keep it small and size
+        # Postgres for (processes x max_size). Connections go back to the pool
+        # after ATOMIC_REQUESTS has committed or rolled back, and the pool
+        # rolls back anything left open.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': env.int('DJANGO_DB_POOL_MIN_SIZE', default=1),
+            'max_size': env.int('DJANGO_DB_POOL_MAX_SIZE', default=4),
+            'timeout': env.float('DJANGO_DB_POOL_TIMEOUT', default=10.0),
+            'max_lifetime': env.float('DJANGO_DB_POOL_MAX_LIFETIME', default=1800.0),
+            'max_idle': env.float('DJANGO_DB_POOL_MAX_IDLE', default=300.0),
+        }
+    else:
+        DATABASES['default'].setdefault(
+            'CONN_MAX_AGE', env.int('DJANGO_DB_CONN_MAX_AGE', default=60)
+        )
+
+# Optional read replicas, e.g. DATABASE_REPLICA_URLS=postgres://...@replica1/db,...
+# Safe HTTP reads are routed to them (see core.replicas); without any the
+# router and middleware are not installed.
+DATABASE_REPLICAS = []
+for _index, _replica_url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    _replica = env.db_url_config(_replica_url)
+    for _key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS'):
+        if _key in DATABASES['default']:
+            _replica.setdefault(_key, copy.deepcopy(DATABASES['default'][_key]))
+    _replica['ATOMIC_REQUESTS'] = False
+    _replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica{_index}'] = _replica
+    DATABASE_REPLICAS.append(f'replica{_index}')
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['core.replicas.PrimaryReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('core.compression.CompressionMiddleware') + 1,
+        'core.replicas.ReplicaRoutingMiddleware',
+    )
+# Seconds a client/session reads from the primary after writing.
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
+
 ASYNC_DATABASE_URL = env(
     "ASYNC_DATABASE_URL", default=database_url, cast=str
 )
 ASYNC_DATABASE_URL = _normalize_async_database_url(ASYNC_DATABASE_URL) or _normalize_async_database_url(database_url)
 ASYNC_PG_POOL_MIN_SIZE = env.int("ASYNC_PG_POOL_MIN_SIZE", default=1)
 ASYNC_PG_POOL_MAX_SIZE = env.int("ASYNC_PG_POOL_MAX_SIZE", default=5)
+# Seconds to wait for a free connection before failing the request.
+ASYNC_PG_POOL_TIMEOUT = env.float("ASYNC_PG_POOL_TIMEOUT", default=5.0)
+ASYNC_PG_POOL_MAX_LIFETIME = env.float("ASYNC_PG_POOL_MAX_LIFETIME", default=1800.0)
+ASYNC_PG_POOL_MAX_IDLE = env.float("ASYNC_PG_POOL_MAX_IDLE", default=300.0)
+# Run a cheap liveness check on every checkout.
+ASYNC_PG_POOL_CHECK = env.bool("ASYNC_PG_POOL_CHECK", default=True)
 
 redis_url = env("REDIS_URL", default=None)
+# Without Redis, Celery workers reach Daphne through PostgreSQL LISTEN/NOTIFY
+# (core.pglayer); CHANNEL_LAYER_POSTGRES=0 selects the in-process layer.
+postgres_channel_layer = env.bool("CHANNEL_LAYER_POSTGRES", default=True) and (ASYNC_DATABASE_URL or "").startswith(
+    ("postgres://", "postgresql://")
+)
 if redis_url:
     CHANNEL_LAYERS = {
         "default": {
@@ -146,12 +215,89 @@ if redis_url:
             "CONFIG": {"hosts": [redis_url]},
         }
     }
+elif postgres_channel_layer:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "core.pglayer.PostgresChannelLayer",
+            "CONFIG": {"cleanup_interval": env.float("CHANNEL_LAYER_CLEANUP_INTERVAL", default=60.0)},
+        }
+    }
 else:
     CHANNEL_LAYERS = {
         "default": {
             "BACKEND": "channels.layers.InMemoryChannelLayer",
         }
     }
+# Pre-encoded group frames (core.fanout) at least this large travel
+# zstd-compressed through the channel layer; 0 disables compression.
+CHANNEL_FRAME_COMPRESS_MIN_SIZE = env.int("CHANNEL_FRAME_COMPRESS_MIN_SIZE", default=16 * 1024)
+# Replayable log of analysis websocket events (core.eventlog): Redis Streams
+# when a Redis URL is set, process memory with the in-process channel layer,
+# and none otherwise (events carry no seq). A session keeps its last
+# EVENT_LOG_MAXLEN events until EVENT_LOG_TTL seconds after the newest one.
+EVENT_LOG_REDIS_URL = env("EVENT_LOG_REDIS_URL", default=redis_url)
+EVENT_LOG_MAXLEN = env.int("EVENT_LOG_MAXLEN", default=64)
+EVENT_LOG_TTL = env.int("EVENT_LOG_TTL", default=3600)
+# Comment line sent on idle Server-Sent Events streams (/api/ai/<id>/events/)
+# so proxies with read timeouts (nginx default 60s) keep them open.
+SSE_HEARTBEAT_INTERVAL = env.float("SSE_HEARTBEAT_INTERVAL", default=15.0)
+# Websocket governance (core.sockets), per Daphne process: application
+# pings, reaping of sockets idle after their analysis finished, and caps on
+# concurrent websockets/SSE streams per analysis session and per client IP.
+# 0 disables each one.
+WS_PING_INTERVAL = env.float("WS_PING_INTERVAL", default=20.0)
+WS_PONG_TIMEOUT = env.float("WS_PONG_TIMEOUT", default=20.0)
+WS_IDLE_TIMEOUT = env.float("WS_IDLE_TIMEOUT", default=60.0)
+WS_MAX_PER_SESSION = env.int("WS_MAX_PER_SESSION", default=10)
+WS_MAX_PER_IP = env.int("WS_MAX_PER_IP", default=50)
+
+CACHE_READ_THROUGH_TIMEOUT = env.int("CACHE_READ_THROUGH_TIMEOUT", default=300)
+CACHE_STATS_FLUSH_INTERVAL = env.float("CACHE_STATS_FLUSH_INTERVAL", default=10.0)
+cache_url = env("CACHE_REDIS_URL", default=redis_url)
+if cache_url:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": cache_url,
+            "KEY_PREFIX": "okrcoach",
+            "TIMEOUT": CACHE_READ_THROUGH_TIMEOUT,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": CACHE_READ_THROUGH_TIMEOUT,
+        }
+    }
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+RESPONSE_COMPRESSION_MIN_SIZE = env.int("RESPONSE_COMPRESSION_MIN_SIZE", default=1024)
+RESPONSE_COMPRESSION_ENCODINGS = env.list(
+    "RESPONSE_COMPRESSION_ENCODINGS", default=["zstd", "br", "gzip"]
+)
+RESPONSE_COMPRESSION_GZIP_LEVEL = env.int("RESPONSE_COMPRESSION_GZIP_LEVEL", default=6)
+RESPONSE_COMPRESSION_BROTLI_QUALITY = env.int("RESPONSE_COMPRESSION_BROTLI_QUALITY", default=5)
+RESPONSE_COMPRESSION_ZSTD_LEVEL = env.int("RESPONSE_COMPRESSION_ZSTD_LEVEL", default=6)
+
+# Compressed model columns (core.fields). Turning this off only stops new
+# writes from being compressed; stored values stay readable.
+COMPRESSED_FIELDS_ENABLED = env.bool("COMPRESSED_FIELDS_ENABLED", default=True)
+ZSTD_FIELD_LEVEL = env.int("ZSTD_FIELD_LEVEL", default=9)
+ZSTD_DICTIONARY_DIR = env("ZSTD_DICTIONARY_DIR", default=str(BASE_DIR / "zstd_dicts"))
+# File name in ZSTD_DICTIONARY_DIR used for new writes; empty for none.
+ZSTD_DICTIONARY = env("ZSTD_DICTIONARY", default="")
 
 OPENAI_API_KEY = env("OPENAI_API_KEY", default=None)
 OPENAI_BASE_URL = env("OPENAI_BASE_URL", default=None)
@@ -159,6 +305,75 @@ OPENAI_MODEL = env("OPENAI_MODEL", default="gpt-4o-mini")
 AI_TEMPERATURE = env.float("AI_TEMPERATURE", default=None)
 AI_MAX_TOKENS = env.int("AI_MAX_TOKENS", default=None)
 AI_REQUEST_TIMEOUT = env.int("AI_REQUEST_TIMEOUT", default=30)
+# Analysis job leases: a queued job not picked up within the pending timeout,
+# or a running job whose worker stopped renewing its lease, is re-enqueued by
+# the sweeper (or failed after ANALYSIS_MAX_ATTEMPTS claims and re-dispatches).
+ANALYSIS_PENDING_TIMEOUT = env.int("ANALYSIS_PENDING_TIMEOUT", default=900)
+ANALYSIS_LEASE_SECONDS = env.int("ANALYSIS_LEASE_SECONDS", default=300)
+ANALYSIS_MAX_ATTEMPTS = env.int("ANALYSIS_MAX_ATTEMPTS", default=3)
+ANALYSIS_SWEEP_INTERVAL = env.float("ANALYSIS_SWEEP_INTERVAL", default=60.0)
+ANALYSIS_SWEEP_BATCH = env.int("ANALYSIS_SWEEP_BATCH", default=200)
+# Analysis runs are routed by who is waiting: people who just submitted
+# (interactive), sweeper re-runs after a worker died (repair) and admin re-runs/backfills (bulk),
+# each queue with its own workers so a backfill cannot starve users.
+ANALYSIS_INTERACTIVE_QUEUE = env("ANALYSIS_INTERACTIVE_QUEUE", default="interactive")
+ANALYSIS_REPAIR_QUEUE = env("ANALYSIS_REPAIR_QUEUE", default="repair")
+ANALYSIS_BULK_QUEUE = env("ANALYSIS_BULK_QUEUE", default="bulk")
+# Bulk runs may wait behind thousands of others before a worker picks them up.
+ANALYSIS_BULK_PENDING_TIMEOUT = env.int("ANALYSIS_BULK_PENDING_TIMEOUT", default=6 * 3600)
+# Admission control for interactive analyses requested over HTTP: shed with
+# 503 + Retry-After once ANALYSIS_MAX_QUEUE runs are waiting or the estimated
+# wait exceeds ANALYSIS_MAX_WAIT seconds (0 disables either limit). The wait
+# is the queue position over ANALYSIS_INTERACTIVE_SLOTS (interactive worker
+# threads across all hosts) times the mean duration of recent runs.
+ANALYSIS_MAX_QUEUE = env.int("ANALYSIS_MAX_QUEUE", default=500)
+ANALYSIS_MAX_WAIT = env.int("ANALYSIS_MAX_WAIT", default=600)
+ANALYSIS_INTERACTIVE_SLOTS = env.int("ANALYSIS_INTERACTIVE_SLOTS", default=4)
+# Run time assumed until some analyses have finished.
+ANALYSIS_DEFAULT_RUN_SECONDS = env.float("ANALYSIS_DEFAULT_RUN_SECONDS", default=20.0)
+# How often waiting sessions get a `queued` event with their position.
+ANALYSIS_QUEUE_UPDATE_INTERVAL = env.float("ANALYSIS_QUEUE_UPDATE_INTERVAL", default=10.0)
+# Above this size an analysis result is announced with a `result_ready`
+# notice (clients fetch it from the detail endpoint) instead of being pushed
+# to every socket; 0 always sends it inline.
+ANALYSIS_RESULT_INLINE_MAX_BYTES = env.int("ANALYSIS_RESULT_INLINE_MAX_BYTES", default=0)
+# History retention: review sessions idle (and standalone analyses finished)
+# for longer than RETENTION_DAYS are archived to default storage and deleted.
+RETENTION_DAYS = env.int("RETENTION_DAYS", default=365)
+RETENTION_BATCH = env.int("RETENTION_BATCH", default=200)
+RETENTION_ARCHIVE_PREFIX = env("RETENTION_ARCHIVE_PREFIX", default="archive/retention")
+# Garbage collection (celery beat, every GC_INTERVAL seconds): review
+# sessions never completed and idle past GC_SESSION_TTL_HOURS are deleted
+# with their audio, and stored audio no answer references is removed. Each
+# run handles at most one batch of sessions and one page of the listing.
+GC_INTERVAL = env.float("GC_INTERVAL", default=30.0)
+GC_SESSION_TTL_HOURS = env.int("GC_SESSION_TTL_HOURS", default=168)
+GC_SESSION_BATCH = env.int("GC_SESSION_BATCH", default=200)
+GC_ORPHAN_PAGE = env.int("GC_ORPHAN_PAGE", default=1000)
+GC_ORPHAN_GRACE_HOURS = env.int("GC_ORPHAN_GRACE_HOURS", default=24)
+GC_DELETE_WORKERS = env.int("GC_DELETE_WORKERS", default=4)
+
+AUDIO_TRANSCRIPTION_BACKEND = env(
+    "AUDIO_TRANSCRIPTION_BACKEND",
+    default="review.services.transcription.OpenAITranscriptionBackend",
+)
+AUDIO_TRANSCRIPTION_MODEL = env("AUDIO_TRANSCRIPTION_MODEL", default="whisper-1")
+AUDIO_TRANSCRIPTION_LANGUAGE = env("AUDIO_TRANSCRIPTION_LANGUAGE", default="fa")
+AUDIO_WHISPER_MODEL_SIZE = env("AUDIO_WHISPER_MODEL_SIZE", default="small")
+AUDIO_WHISPER_COMPUTE_TYPE = env("AUDIO_WHISPER_COMPUTE_TYPE", default="int8")
+AUDIO_WHISPER_CPU_THREADS = env.int("AUDIO_WHISPER_CPU_THREADS", default=2)
+AUDIO_TRANSCODE_BITRATE = env("AUDIO_TRANSCODE_BITRATE", default="24k")
+AUDIO_TRANSCODE_SAMPLE_RATE = env.int("AUDIO_TRANSCODE_SAMPLE_RATE", default=16000)
+AUDIO_PROCESS_TIMEOUT = env.int("AUDIO_PROCESS_TIMEOUT", default=120)
+AUDIO_BATCH_SIZE = env.int("AUDIO_BATCH_SIZE", default=8)
+# Answers claimed by the audio pipeline longer ago than this are taken back
+# (the worker died mid-batch); every AUDIO_SWEEP_INTERVAL seconds beat runs
+# the pipeline for them and for uploads whose trigger was lost.
+AUDIO_CLAIM_TIMEOUT = env.int("AUDIO_CLAIM_TIMEOUT", default=1800)
+AUDIO_SWEEP_INTERVAL = env.int("AUDIO_SWEEP_INTERVAL", default=300)
+AUDIO_QUEUE = env("AUDIO_QUEUE", default="audio")
+FFMPEG_BINARY = env("FFMPEG_BINARY", default="ffmpeg")
+FFPROBE_BINARY = env("FFPROBE_BINARY", default="ffprobe")
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -232,6 +447,51 @@ CELERY_TASK_EAGER_PROPAGATES = env.bool(
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+CELERY_TASK_ROUTES = {
+    "ai.tasks.run_analysis": {"queue": ANALYSIS_INTERACTIVE_QUEUE},
+    "review.tasks.process_pending_audio": {"queue": AUDIO_QUEUE},
+}
+# A worker consuming several queues drains them in the order given to -Q;
+# within a queue, lower task priorities (0-9) run first.
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "priority"}
+CELERY_BEAT_SCHEDULE = {
+    "sweep-stuck-analyses": {
+        "task": "ai.tasks.sweep_stuck_analyses",
+        "schedule": ANALYSIS_SWEEP_INTERVAL,
+        "options": {"expires": ANALYSIS_SWEEP_INTERVAL},
+    },
+    "publish-queue-positions": {
+        "task": "ai.tasks.publish_queue_positions",
+        "schedule": ANALYSIS_QUEUE_UPDATE_INTERVAL,
+        "options": {"expires": ANALYSIS_QUEUE_UPDATE_INTERVAL},
+    },
+    "process-pending-audio": {
+        "task": "review.tasks.process_pending_audio",
+        "schedule": AUDIO_SWEEP_INTERVAL,
+        "options": {"expires": AUDIO_SWEEP_INTERVAL},
+    },
+    "collect-garbage": {
+        "task": "review.tasks.collect_garbage",
+        "schedule": GC_INTERVAL,
+        "options": {"expires": GC_INTERVAL},
+    },
+}
+
+# Background work runs on Celery ("celery", needs CELERY_BROKER_URL) or on
+# the jobs table in the main database ("postgres", `manage.py run_jobs`).
+# Defaults to Celery when a broker or eager mode is configured.
+TASK_BACKEND = env(
+    "TASK_BACKEND",
+    default="celery" if redis_url or env("CELERY_BROKER_URL", default=None) or CELERY_TASK_ALWAYS_EAGER else "postgres",
+)
+# Seconds a claimed job is held; the worker renews it while the job runs.
+JOBS_LEASE_SECONDS = env.int("JOBS_LEASE_SECONDS", default=300)
+JOBS_MAX_ATTEMPTS = env.int("JOBS_MAX_ATTEMPTS", default=5)
+# Retry backoff: JOBS_RETRY_BASE seconds doubled per attempt, capped.
+JOBS_RETRY_BASE = env.float("JOBS_RETRY_BASE", default=5.0)
+JOBS_RETRY_MAX = env.float("JOBS_RETRY_MAX", default=600.0)
+# Fallback poll when no NOTIFY arrives (and the only wakeup on SQLite).
+JOBS_POLL_INTERVAL = env.float("JOBS_POLL_INTERVAL", default=5.0)
 
 LOGGING = {
     "version": 1,
@@ -0,0 +1,208 @@
+"""
+Limits and gauges for long-lived connections: websockets and Server-Sent
+Events streams.
+
+``registry`` counts this process's open connections by kind, by channel
+group and by client address. It refuses new ones past WS_MAX_PER_SESSION
+or WS_MAX_PER_IP and reports the counts (``ws_stats`` on ``ws/health/``, staff only).
+Limits are per Daphne process, which is what bounds its memory, and nothing
+shared is left behind when a process dies.
+
+``GovernedSocketMixin`` gives a websocket consumer the same admission plus
+an application-level ``{"type":"ping"}`` every WS_PING_INTERVAL seconds. A
+client that has answered ``{"type":"pong"}`` once is expected to keep
+answering within WS_PONG_TIMEOUT seconds. Clients that never answer are
+left to Daphne's protocol-level pings. A consumer marks itself done once
+nothing more will be pushed to it (an analysis reached a terminal state);
+it is then closed after WS_IDLE_TIMEOUT seconds without client messages.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Close codes seen by clients.
+CLOSE_IDLE = 4000
+CLOSE_PONG_TIMEOUT = 4001
+CLOSE_TRY_AGAIN_LATER = 1013
+
+_PING = '{"type":"ping"}'
+_PONG = re.compile(r'\s*\{\s*"type"\s*:\s*"pong"\s*[,}]')
+# Largest groups listed in the stats.
+_TOP_GROUPS = 10
+
+
+@dataclass(slots=True, frozen=True)
+class SocketTicket:
+    kind: str
+    group: str | None
+    ip: str
+
+
+def client_ip(scope: dict[str, Any]) -> str:
+    # Daphne fills "client" from X-Forwarded-For when run with --proxy-headers.
+    client = scope.get("client")
+    return client[0] if client else ""
+
+
+def _drop(counter: Counter[str], key: str) -> None:
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+class SocketRegistry:
+    """
+    Open connections of this process. Only touched from the event loop, so
+    it needs no lock.
+    """
+
+    def __init__(self) -> None:
+        self.by_kind: Counter[str] = Counter()
+        self.by_group: Counter[str] = Counter()
+        self.by_ip: Counter[str] = Counter()
+        self.refused: Counter[str] = Counter()
+        self.reaped: Counter[str] = Counter()
+
+    def open(self, kind: str, group: str | None, ip: str) -> SocketTicket | None:
+        """
+        Count a new connection, or return None when it would pass a cap.
+        """
+
+        if group and settings.WS_MAX_PER_SESSION and self.by_group[group] >= settings.WS_MAX_PER_SESSION:
+            self.refused["session_cap"] += 1
+            return None
+        if ip and settings.WS_MAX_PER_IP and self.by_ip[ip] >= settings.WS_MAX_PER_IP:
+            self.refused["ip_cap"] += 1
+            logger.warning("Refused %s connection from %s: %s already open", kind, ip, self.by_ip[ip])
+            return None
+        ticket = SocketTicket(kind=kind, group=group, ip=ip)
+        self.by_kind[kind] += 1
+        if group:
+            self.by_group[group] += 1
+        if ip:
+            self.by_ip[ip] += 1
+        return ticket
+
+    def close(self, ticket: SocketTicket) -> None:
+        _drop(self.by_kind, ticket.kind)
+        if ticket.group:
+            _drop(self.by_group, ticket.group)
+        if ticket.ip:
+            _drop(self.by_ip, ticket.ip)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "open": sum(self.by_kind.values()),
+            "by_kind": dict(self.by_kind),
+            "groups": len(self.by_group),
+            # Sizes only: a group name carries the session id, which is its credential.
+            "largest_groups": [size for _, size in self.by_group.most_common(_TOP_GROUPS)],
+            "client_ips": len(self.by_ip),
+            "max_per_ip": max(self.by_ip.values(), default=0),
+            "refused": dict(self.refused),
+            "reaped": dict(self.reaped),
+        }
+
+
+registry = SocketRegistry()
+
+
+class GovernedSocketMixin:
+    """
+    For websocket consumers: call ``admit()`` first in ``connect()`` and
+    ``mark_done()`` when the socket has nothing more to wait for.
+    """
+
+    socket_kind = "websocket"
+    _ticket: SocketTicket | None = None
+    _watchdog: asyncio.Task | None = None
+    _answers_pings = False
+    _last_seen = 0.0
+    _done_since: float | None = None
+
+    async def admit(self, group: str | None = None) -> bool:
+        """
+        Register the socket. Over a cap it is accepted and closed at once
+        with 1013 (try again later), so the client can tell why.
+        """
+
+        self._ticket = registry.open(self.socket_kind, group, client_ip(self.scope))
+        if self._ticket is None:
+            await self.accept()
+            await self.close(code=CLOSE_TRY_AGAIN_LATER)
+            return False
+        self._last_seen = asyncio.get_running_loop().time()
+        self._watchdog = asyncio.create_task(self._watch())
+        return True
+
+    def mark_done(self, done: bool = True) -> None:
+        if not done:
+            self._done_since = None
+        elif self._done_since is None:
+            self._done_since = asyncio.get_running_loop().time()
+
+    async def websocket_receive(self, message: dict[str, Any]) -> None:
+        self._last_seen = asyncio.get_running_loop().time()
+        text = message.get("text")
+        if text is not None and _PONG.match(text):
+            self._answers_pings = True
+            return
+        await super().websocket_receive(message)
+
+    async def websocket_disconnect(self, message: dict[str, Any]) -> None:
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+        if self._ticket is not None:
+            registry.close(self._ticket)
+            self._ticket = None
+        await super().websocket_disconnect(message)
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.WS_PING_INTERVAL or settings.WS_IDLE_TIMEOUT
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            if (
+                settings.WS_IDLE_TIMEOUT
+                and self._done_since is not None
+                and loop.time() - max(self._done_since, self._last_seen) >= settings.WS_IDLE_TIMEOUT
+            ):
+                await self._reap("idle", CLOSE_IDLE)
+                return
+            if not settings.WS_PING_INTERVAL:
+                continue
+            sent = loop.time()
+            await self.send(text_data=_PING)
+            if self._answers_pings and settings.WS_PONG_TIMEOUT:
+                await asyncio.sleep(settings.WS_PONG_TIMEOUT)
+                if self._last_seen < sent:
+                    await self._reap("pong_timeout", CLOSE_PONG_TIMEOUT)
+                    return
+
+    async def _reap(self, reason: str, code: int) -> None:
+        registry.reaped[reason] += 1
+        await self.close(code=code)
+
+
+__all__ = [
+    "CLOSE_IDLE",
+    "CLOSE_PONG_TIMEOUT",
+    "CLOSE_TRY_AGAIN_LATER",
+    "GovernedSocketMixin",
+    "SocketRegistry",
+    "SocketTicket",
+    "client_ip",
+    "registry",
+]
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from jobs.models import Job, JobSchedule
+from jobs.services.queue import retry_failed
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "queue", "priority", "status", "attempts", "run_after", "locked_by")
+    list_filter = ("status", "queue", "name")
+    search_fields = ("id", "name")
+    actions = ("retry",)
+
+    @admin.action(description="Retry selected failed jobs")
+    def retry(self, request, queryset):
+        count = retry_failed(queryset.values_list("id", flat=True))
+        self.message_user(request, f"Queued {count} jobs again.")
+
+
+@admin.register(JobSchedule)
+class JobScheduleAdmin(admin.ModelAdmin):
+    list_display = ("name", "next_run_at")
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 02:33
+
+import core.ids
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSchedule',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('next_run_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('args', models.JSONField(blank=True, default=list)),
+                ('kwargs', models.JSONField(blank=True, default=dict)),
+                ('queue', models.CharField(default='default', max_length=64)),
+                ('priority', models.PositiveSmallIntegerField(default=5)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField()),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['queue', 'priority', 'run_after'], name='job_ready'), models.Index(condition=models.Q(('status', 'running')), fields=['lease_expires_at'], name='job_running_lease')],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from django.db import models
+from django.utils import timezone
+
+from core.ids import uuid7
+
+DEFAULT_QUEUE = "default"
+# Lower runs first, as with Celery's Redis transport (0-9).
+DEFAULT_PRIORITY = 5
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    FAILED = "failed", "Failed"
+
+
+class Job(models.Model):
+    """
+    One unit of background work for the PostgreSQL queue (TASK_BACKEND=postgres).
+    Deleted once it succeeds; failed jobs are kept for inspection and retry.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Dotted path of the task, e.g. "ai.tasks.run_analysis".
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=64, default=DEFAULT_QUEUE)
+    priority = models.PositiveSmallIntegerField(default=DEFAULT_PRIORITY)
+    status = models.CharField(max_length=16, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    # Not claimed before this; pushed back by retry backoff.
+    run_after = models.DateTimeField(default=timezone.now)
+    # Claims so far; also fences out a worker whose lease was taken over.
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Claim order over the ready set only.
+            models.Index(
+                fields=["queue", "priority", "run_after"],
+                name="job_ready",
+                condition=models.Q(status=JobStatus.QUEUED),
+            ),
+            models.Index(
+                fields=["lease_expires_at"],
+                name="job_running_lease",
+                condition=models.Q(status=JobStatus.RUNNING),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job({self.name}, {self.id}, status={self.status})"
+
+
+class JobSchedule(models.Model):
+    """
+    Next due time of a periodic task (CELERY_BEAT_SCHEDULE) when workers run
+    with ``--beat``; advancing it is the lock that enqueues each run once.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    next_run_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"JobSchedule({self.name}, next={self.next_run_at})"
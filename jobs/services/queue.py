@@ -0,0 +1,285 @@
+"""
+PostgreSQL job queue, the alternative to Celery for installs without a
+broker (TASK_BACKEND=postgres).
+
+``enqueue`` inserts in the caller's transaction, so a job exists exactly
+when the writes that motivated it commit, and NOTIFYs ``jobs_<queue>``
+(delivered on commit) to wake idle workers. Workers claim ready jobs with
+FOR UPDATE SKIP LOCKED in priority order and hold a lease while running. A
+failed attempt is retried with exponential backoff up to ``max_attempts``;
+a job whose worker died is taken back once its lease expires.
+
+Task code is shared with Celery: a job's name is the dotted path of a
+``@shared_task`` and the worker calls its body directly. ``dispatch`` picks
+the backend, so call sites don't care which one is configured.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import DEFAULT_PRIORITY, DEFAULT_QUEUE, Job, JobSchedule, JobStatus
+
+_CLAIM_SQL = """
+UPDATE jobs_job
+SET status = 'running', attempts = attempts + 1, locked_by = %(worker)s,
+    lease_expires_at = now() + make_interval(secs => %(lease)s::float8), updated_at = now()
+WHERE id IN (
+    SELECT id FROM jobs_job
+    WHERE status = 'queued' AND queue = ANY(%(queues)s) AND run_after <= now()
+    ORDER BY priority, run_after
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING *
+"""
+
+
+def notify_channel(queue: str) -> str:
+    return f"jobs_{queue}"
+
+
+def route(name: str) -> str:
+    """
+    Queue of a task: its CELERY_TASK_ROUTES entry, so both backends agree.
+    """
+
+    return settings.CELERY_TASK_ROUTES.get(name, {}).get("queue", DEFAULT_QUEUE)
+
+
+def enqueue(
+    name: str,
+    args: Iterable[Any] = (),
+    kwargs: dict[str, Any] | None = None,
+    *,
+    queue: str | None = None,
+    priority: int | None = None,
+    countdown: float | None = None,
+    max_attempts: int | None = None,
+) -> Job:
+    """
+    Add a job in the current transaction; workers see it once it commits.
+    """
+
+    queue = queue or route(name)
+    run_after = timezone.now()
+    if countdown:
+        run_after += timedelta(seconds=countdown)
+    job = Job.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue,
+        priority=DEFAULT_PRIORITY if priority is None else priority,
+        run_after=run_after,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if connection.vendor == "postgresql":
+        # Repeated NOTIFYs in one transaction collapse into one.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, '')", [notify_channel(queue)])
+    return job
+
+
+def dispatch(
+    task,
+    *args: Any,
+    queue: str | None = None,
+    priority: int | None = None,
+    countdown: float | None = None,
+    **kwargs: Any,
+) -> None:
+    """
+    Run a Celery task in the background on the configured TASK_BACKEND.
+    With Celery the message is sent once the current transaction commits.
+    """
+
+    if settings.TASK_BACKEND == "postgres":
+        enqueue(task.name, args, kwargs, queue=queue, priority=priority, countdown=countdown)
+        return
+    options = {
+        key: value
+        for key, value in (("queue", queue), ("priority", priority), ("countdown", countdown))
+        if value is not None
+    }
+    transaction.on_commit(lambda: task.apply_async(args=args, kwargs=kwargs, **options))
+
+
+@lru_cache(maxsize=None)
+def handler(name: str) -> Callable[..., Any]:
+    task = import_string(name)
+    return getattr(task, "run", task)
+
+
+def claim(worker: str, queues: list[str], limit: int) -> list[Job]:
+    """
+    Take up to ``limit`` ready jobs from ``queues`` for ``worker``, most
+    urgent first.
+    """
+
+    if limit <= 0:
+        return []
+    lease = settings.JOBS_LEASE_SECONDS
+    if connection.vendor == "postgresql":
+        params = {"worker": worker, "lease": lease, "queues": queues, "limit": limit}
+        jobs = list(Job.objects.raw(_CLAIM_SQL, params))
+    else:
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=JobStatus.QUEUED, queue__in=queues, run_after__lte=now)
+                .order_by("priority", "run_after")
+                .values_list("id", flat=True)[:limit]
+            )
+            Job.objects.filter(id__in=ids).update(
+                status=JobStatus.RUNNING,
+                attempts=F("attempts") + 1,
+                locked_by=worker,
+                lease_expires_at=now + timedelta(seconds=lease),
+                updated_at=now,
+            )
+            jobs = list(Job.objects.filter(id__in=ids))
+    return sorted(jobs, key=lambda job: (job.priority, job.run_after))
+
+
+def _owned(job: Job):
+    return Job.objects.filter(id=job.id, status=JobStatus.RUNNING, locked_by=job.locked_by, attempts=job.attempts)
+
+
+def complete(job: Job) -> bool:
+    """
+    Delete a finished job; False if its lease was taken over meanwhile.
+    """
+
+    deleted, _ = _owned(job).delete()
+    return bool(deleted)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Exponential backoff with full jitter, capped at JOBS_RETRY_MAX.
+    """
+
+    ceiling = min(settings.JOBS_RETRY_MAX, settings.JOBS_RETRY_BASE * 2 ** max(attempts - 1, 0))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def fail(job: Job, error: str) -> str | None:
+    """
+    Record a failed attempt: schedule a retry or, once ``max_attempts`` are
+    used up, mark the job failed. Returns what was done.
+    """
+
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        updated = _owned(job).update(
+            status=JobStatus.FAILED, last_error=error, locked_by="", lease_expires_at=None, updated_at=now
+        )
+        return "failed" if updated else None
+    updated = _owned(job).update(
+        status=JobStatus.QUEUED,
+        last_error=error,
+        locked_by="",
+        lease_expires_at=None,
+        run_after=now + timedelta(seconds=retry_delay(job.attempts)),
+        updated_at=now,
+    )
+    return "retried" if updated else None
+
+
+def renew_leases(worker: str, ids: Iterable[Any]) -> int:
+    ids = list(ids)
+    if not ids:
+        return 0
+    now = timezone.now()
+    return Job.objects.filter(id__in=ids, status=JobStatus.RUNNING, locked_by=worker).update(
+        lease_expires_at=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS), updated_at=now
+    )
+
+
+def recover_expired() -> dict[str, int]:
+    """
+    Take back running jobs whose lease expired (worker died or hung): retry
+    them, or fail those that used up their attempts.
+    """
+
+    now = timezone.now()
+    expired = Job.objects.filter(status=JobStatus.RUNNING, lease_expires_at__lt=now)
+    failed = expired.filter(attempts__gte=F("max_attempts")).update(
+        status=JobStatus.FAILED,
+        last_error="Lease expired: the worker stopped without finishing the job.",
+        locked_by="",
+        lease_expires_at=None,
+        updated_at=now,
+    )
+    requeued = expired.update(
+        status=JobStatus.QUEUED, locked_by="", lease_expires_at=None, run_after=now, updated_at=now
+    )
+    return {"requeued": requeued, "failed": failed}
+
+
+def retry_failed(ids: Iterable[Any]) -> int:
+    """
+    Queue failed jobs again with a fresh set of attempts.
+    """
+
+    now = timezone.now()
+    return Job.objects.filter(id__in=list(ids), status=JobStatus.FAILED).update(
+        status=JobStatus.QUEUED, attempts=0, run_after=now, updated_at=now
+    )
+
+
+def ensure_schedules(schedule: dict[str, dict[str, Any]]) -> None:
+    now = timezone.now()
+    JobSchedule.objects.bulk_create(
+        [JobSchedule(name=name, next_run_at=now) for name in schedule], ignore_conflicts=True
+    )
+
+
+def enqueue_due(schedule: dict[str, dict[str, Any]], now: datetime | None = None) -> int:
+    """
+    Enqueue the periodic tasks that are due; moving ``next_run_at`` forward
+    and enqueueing happen in one transaction, so each run is enqueued by
+    exactly one worker.
+    """
+
+    now = now or timezone.now()
+    enqueued = 0
+    for name, entry in schedule.items():
+        interval = float(entry["schedule"])
+        with transaction.atomic():
+            advanced = JobSchedule.objects.filter(name=name, next_run_at__lte=now).update(
+                next_run_at=now + timedelta(seconds=interval)
+            )
+            if advanced:
+                enqueue(entry["task"], entry.get("args", ()), entry.get("kwargs"))
+                enqueued += 1
+    return enqueued
+
+
+__all__ = [
+    "claim",
+    "complete",
+    "dispatch",
+    "enqueue",
+    "enqueue_due",
+    "ensure_schedules",
+    "fail",
+    "handler",
+    "notify_channel",
+    "recover_expired",
+    "renew_leases",
+    "retry_delay",
+    "retry_failed",
+    "route",
+]
@@ -0,0 +1,159 @@
+"""
+Thread-pool worker for the PostgreSQL job queue (``manage.py run_jobs``).
+
+The main loop claims as many jobs as it has free threads and then sleeps
+until a NOTIFY on one of its queues, a finished job or the poll interval
+wakes it. A listener thread keeps one autocommit connection LISTENing; when
+the database is not PostgreSQL the worker simply polls. Between claims it
+renews the leases of its running jobs, takes back expired ones and, with
+``beat``, enqueues due periodic tasks.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import psycopg
+from django.conf import settings
+from django.db import close_old_connections, connection
+from psycopg import sql
+
+from jobs.models import Job
+from jobs.services import queue
+
+logger = logging.getLogger(__name__)
+
+_LISTEN_RECONNECT_DELAY = 1.0
+
+
+class Worker:
+    def __init__(
+        self,
+        queues: list[str],
+        *,
+        concurrency: int = 4,
+        beat: bool = False,
+        name: str | None = None,
+        poll_interval: float | None = None,
+    ) -> None:
+        self.queues = queues
+        self.concurrency = concurrency
+        self.beat = beat
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.processed = 0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._running: dict[Any, Job] = {}
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+    # Main loop
+
+    def run(self) -> None:
+        if connection.vendor == "postgresql":
+            threading.Thread(target=self._listen, name="job-listener", daemon=True).start()
+        if self.beat:
+            queue.ensure_schedules(settings.CELERY_BEAT_SCHEDULE)
+        logger.info("Job worker %s on %s (concurrency %s)", self.name, ",".join(self.queues), self.concurrency)
+
+        next_maintenance = 0.0
+        try:
+            while not self._stopping.is_set():
+                self._wake.clear()
+                now = time.monotonic()
+                if now >= next_maintenance:
+                    self._maintain()
+                    next_maintenance = now + min(self.poll_interval, settings.JOBS_LEASE_SECONDS / 3)
+                with self._lock:
+                    free = self.concurrency - len(self._running)
+                try:
+                    claimed = queue.claim(self.name, self.queues, free)
+                except Exception:
+                    logger.exception("Claiming jobs failed")
+                    close_old_connections()
+                    claimed = []
+                for job in claimed:
+                    with self._lock:
+                        self._running[job.id] = job
+                    self._pool.submit(self._execute, job)
+                # Either every thread is busy or nothing else is ready: the
+                # next chance to claim is a finished job or a NOTIFY.
+                self._wake.wait(self.poll_interval)
+        finally:
+            self._pool.shutdown(wait=True)
+            close_old_connections()
+            logger.info("Job worker %s stopped after %s jobs", self.name, self.processed)
+
+    def _maintain(self) -> None:
+        close_old_connections()
+        with self._lock:
+            running = list(self._running)
+        try:
+            queue.renew_leases(self.name, running)
+            recovered = queue.recover_expired()
+            if any(recovered.values()):
+                logger.warning("Took back expired jobs: %s", recovered)
+            if self.beat:
+                queue.enqueue_due(settings.CELERY_BEAT_SCHEDULE)
+        except Exception:  # pragma: no cover - database errors
+            logger.exception("Job worker maintenance failed")
+
+    # Jobs
+
+    def _execute(self, job: Job) -> None:
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            queue.handler(job.name)(*job.args, **job.kwargs)
+        except Exception as exc:
+            outcome = queue.fail(job, "".join(traceback.format_exception(exc)))
+            logger.warning(
+                "Job %s %s attempt %s/%s raised %r: %s",
+                job.name, job.id, job.attempts, job.max_attempts, exc, outcome or "lease lost",
+            )
+        else:
+            if not queue.complete(job):
+                logger.warning("Job %s %s finished after its lease was taken over", job.name, job.id)
+            logger.info("Job %s %s done in %.3fs", job.name, job.id, time.perf_counter() - started)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._running.pop(job.id, None)
+                self.processed += 1
+            self._wake.set()
+
+    # Wakeups
+
+    def _listen(self) -> None:
+        params = connection.get_connection_params()
+        params["autocommit"] = True
+        statement = sql.SQL("; ").join(
+            sql.SQL("LISTEN {}").format(sql.Identifier(queue.notify_channel(name))) for name in self.queues
+        )
+        while not self._stopping.is_set():
+            try:
+                with psycopg.connect(**params) as conn:
+                    conn.execute(statement)
+                    # Catch up on anything enqueued while not listening.
+                    self._wake.set()
+                    while not self._stopping.is_set():
+                        for _ in conn.notifies(timeout=1.0):
+                            self._wake.set()
+            except Exception:
+                logger.warning("Job listener disconnected; reconnecting", exc_info=True)
+                self._stopping.wait(_LISTEN_RECONNECT_DELAY)
+
+
+__all__ = ["Worker"]
@@ -21,9 +21,9 @@ class ReviewQuestionAdmin(admin.ModelAdmin):
 
 @admin.register(ReviewAnswer)
 class ReviewAnswerAdmin(admin.ModelAdmin):
-    list_display = ("session", "question", "created_at")
+    list_display = ("session", "question", "audio_status", "created_at")
     search_fields = ("session__id", "question__prompt", "answer_text")
-    list_filter = ("question", "created_at")
+    list_filter = ("question", "audio_status", "created_at")
     autocomplete_fields = ("session", "question")
 
 
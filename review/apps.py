@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ReviewConfig(AppConfig):
     name = 'review'
+
+    def ready(self):
+        from review import signals  # noqa: F401
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from ai.services.admission import AnalysisOverloaded
+from core.renderers import json_response, loads
+from review.models import MeetingRequest, ReviewSession
+from review.serializers import (
+    ContactInfoSerializer,
+    CreateReviewSessionSerializer,
+    MeetingRequestCreateSerializer,
+    SubmitAnswerSerializer,
+    flat_meeting_request,
+    flat_review_answer,
+    flat_review_question,
+    flat_review_session,
+)
+from review.services.answers import (
+    AnswerRejected,
+    aget_next_question,
+    anext_question_validators,
+    submit_answer_atomic,
+)
+from review.services.cache import aget_review_session, ainvalidate_review_session
+
+_SESSION_NOT_FOUND = {"detail": "Session not found."}
+
+
+class _ParseError(Exception):
+    pass
+
+
+class AsyncReviewView(View):
+    """
+    Native async counterpart of the review APIViews, enabled with
+    REVIEW_ASYNC_VIEWS. Payloads and status codes match the DRF views; DRF
+    serializers validate input and the flat serializers render output.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # ATOMIC_REQUESTS cannot wrap async views; writes that need a
+        # transaction open one explicitly.
+        view = transaction.non_atomic_requests(super().as_view(**initkwargs))
+        return csrf_exempt(view)
+
+    @staticmethod
+    def respond(payload: Any, status: int = 200) -> HttpResponse:
+        return json_response(payload, status=status)
+
+    @staticmethod
+    def parse_data(request: HttpRequest):
+        if request.content_type == "application/json":
+            if not request.body:
+                return {}
+            try:
+                return loads(request.body)
+            except ValueError as exc:
+                raise _ParseError(f"JSON parse error - {exc}") from exc
+        data = request.POST.copy()
+        data.update(request.FILES)
+        return data
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except _ParseError as exc:
+            return self.respond({"detail": str(exc)}, status=400)
+
+
+class StartSessionView(AsyncReviewView):
+    async def post(self, request):
+        payload_serializer = CreateReviewSessionSerializer(data=self.parse_data(request))
+        if not payload_serializer.is_valid():
+            return self.respond(payload_serializer.errors, status=400)
+        session = await ReviewSession.objects.acreate(**payload_serializer.validated_data)
+        next_question = await aget_next_question(session)
+        payload = {
+            "session": flat_review_session(session),
+            "next_question": flat_review_question(next_question)
+            if next_question
+            else None,
+        }
+        return self.respond(payload, status=201)
+
+
+class NextQuestionView(AsyncReviewView):
+    async def get(self, request, session_id):
+        session = await aget_review_session(session_id)
+        if session is None:
+            return self.respond(_SESSION_NOT_FOUND, status=404)
+        validators = await anext_question_validators(session)
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        next_question = await aget_next_question(session)
+        return validators.apply(
+            self.respond(
+                {
+                    "session": flat_review_session(session),
+                    "completed": next_question is None,
+                    "next_question": flat_review_question(next_question)
+                    if next_question
+                    else None,
+                }
+            )
+        )
+
+
+class SessionContactView(AsyncReviewView):
+    async def post(self, request):
+        serializer = ContactInfoSerializer(data=self.parse_data(request))
+        if not serializer.is_valid():
+            return self.respond(serializer.errors, status=400)
+
+        session = await aget_review_session(serializer.validated_data["review_session_id"])
+        if session is None:
+            return self.respond(_SESSION_NOT_FOUND, status=404)
+
+        session.email = serializer.validated_data["email"]
+        session.phone_number = serializer.validated_data["phone_number"]
+        await session.asave(update_fields=["email", "phone_number", "updated_at"])
+        await ainvalidate_review_session(session.id)
+
+        return self.respond(
+            {
+                "review_session_id": str(session.id),
+                "email": session.email,
+                "phone_number": session.phone_number,
+            }
+        )
+
+
+class SubmitAnswerView(AsyncReviewView):
+    async def post(self, request, session_id):
+        session = await aget_review_session(session_id)
+        if session is None:
+            return self.respond(_SESSION_NOT_FOUND, status=404)
+
+        if session.completed_at:
+            return self.respond({"detail": "Session already completed."}, status=400)
+
+        serializer = SubmitAnswerSerializer(data=self.parse_data(request))
+        if not serializer.is_valid():
+            return self.respond(serializer.errors, status=400)
+
+        # Ordering checks, the write and completion must share one
+        # transaction, which the async ORM cannot provide yet.
+        try:
+            submitted = await sync_to_async(submit_answer_atomic)(
+                session,
+                question_id=serializer.validated_data["question_id"],
+                answer_text=serializer.validated_data.get("answer_text", ""),
+                audio_file=serializer.validated_data.get("audio_file"),
+                shed=True,
+            )
+        except AnswerRejected as exc:
+            return self.respond(exc.payload, status=exc.status_code)
+        except AnalysisOverloaded as exc:
+            response = self.respond(exc.payload, status=503)
+            response["Retry-After"] = str(exc.retry_after)
+            return response
+
+        next_question = submitted.next_question
+        return self.respond(
+            {
+                "session": flat_review_session(session),
+                "answer": flat_review_answer(submitted.answer, {"request": request}),
+                "next_question": flat_review_question(next_question)
+                if next_question
+                else None,
+                "completed": next_question is None,
+            },
+            status=201,
+        )
+
+
+class MeetingRequestCreateView(AsyncReviewView):
+    async def post(self, request):
+        serializer = MeetingRequestCreateSerializer(data=self.parse_data(request))
+        if not serializer.is_valid():
+            return self.respond(serializer.errors, status=400)
+
+        session = await aget_review_session(serializer.validated_data["review_session_id"])
+        if session is None:
+            return self.respond(_SESSION_NOT_FOUND, status=404)
+
+        if not session.email or not session.phone_number:
+            return self.respond(
+                {
+                    "detail": "You should first add your phone and email to the review session."
+                },
+                status=400,
+            )
+
+        meeting_request = await MeetingRequest.objects.acreate(review_session=session)
+        return self.respond(flat_meeting_request(meeting_request), status=201)
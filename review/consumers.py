@@ -0,0 +1,289 @@
+"""
+The whole review questionnaire over one websocket, ``ws/review/<id>/``.
+
+The client connects with its session id, or a new UUID followed by a
+``start`` message. Every answer is acknowledged together with the next
+question. Once the last answer is in, the same socket carries the session's
+analysis events, as ``ws/analysis/<id>/`` would. Input is validated by the
+serializers of the HTTP views and answers go through ``submit_answer``, so
+ordering and completion follow the same rules.
+
+An audio answer is an ``audio`` message, binary frames with the file's
+bytes, then ``audio_end``.
+"""
+
+from __future__ import annotations
+
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError
+from django.http import HttpRequest
+
+from ai.consumers import AnalysisConsumer
+from ai.services.events import group_name
+from review.models import ReviewSession
+from review.serializers import (
+    ContactInfoSerializer,
+    CreateReviewSessionSerializer,
+    SubmitAnswerSerializer,
+    flat_review_answer,
+    flat_review_question,
+    flat_review_session,
+)
+from review.services.answers import AnswerRejected, aget_next_question, submit_answer_atomic
+from review.services.cache import aget_review_session, ainvalidate_review_session
+
+logger = logging.getLogger(__name__)
+
+_SESSION_NOT_FOUND = {"detail": "Session not found."}
+
+
+def _spool() -> IO[bytes]:
+    return tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+
+
+class _HandshakeRequest(HttpRequest):
+    """
+    The websocket handshake's headers, host and scheme as a request, so
+    answers carry the same absolute ``audio_url`` as the HTTP endpoints.
+    """
+
+    def __init__(self, scope: dict[str, Any]) -> None:
+        super().__init__()
+        for name, value in scope.get("headers", ()):
+            key = "HTTP_" + name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            self.META[key] = f"{self.META[key]},{value}" if key in self.META else value
+        server = scope.get("server") or ("", "")
+        self.META["SERVER_NAME"], self.META["SERVER_PORT"] = str(server[0]), str(server[1] or "")
+        self._scope_scheme = "https" if scope.get("scheme") in ("wss", "https") else "http"
+
+    def _get_scheme(self) -> str:
+        return self._scope_scheme
+
+
+@dataclass(slots=True)
+class _AudioUpload:
+    # Answer fields from the ``audio`` message, validated with the file.
+    fields: dict[str, Any]
+    name: str
+    content_type: str
+    file: IO[bytes] = field(default_factory=_spool)
+    size: int = 0
+
+
+class ReviewFlowConsumer(AnalysisConsumer):
+    """
+    Client messages carry an ``action``: ``start``, ``next``, ``answer``,
+    ``audio``/``audio_end`` and ``contact``. Failures come back as
+    ``error`` frames naming the action, with the HTTP status and body the
+    matching endpoint would have returned.
+    """
+
+    socket_kind = "review"
+    _upload: _AudioUpload | None = None
+    _url_request: HttpRequest | None = None
+
+    _ACTIONS = {
+        "start": "_start",
+        "next": "_next",
+        "answer": "_answer",
+        "audio": "_audio",
+        "audio_end": "_audio_end",
+        "contact": "_contact",
+    }
+
+    async def connect(self) -> None:
+        self.session_key = str(self.scope["url_route"]["kwargs"]["session_id"])
+        self.session_id = self.session_key
+        self.group_name = group_name(self.session_key)
+        if not await self.admit(self.group_name):
+            return
+        # Joined up front: nothing is published for the session before its
+        # last answer, and then the first analysis events cannot slip by.
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        session = await aget_review_session(self.session_key)
+        await self._send_session(session)
+        if session is not None and session.completed_at:
+            await self._resume(self._requested_last_seq())
+
+    async def disconnect(self, code: int) -> None:
+        self._discard_upload()
+        await super().disconnect(code)
+
+    async def receive(self, text_data: str | None = None, bytes_data: bytes | None = None, **kwargs: Any) -> None:
+        if bytes_data is not None:
+            await self._receive_chunk(bytes_data)
+            return
+        await super().receive(text_data=text_data, **kwargs)
+
+    async def receive_json(self, content: dict[str, Any], **kwargs: Any) -> None:
+        if not isinstance(content, dict) or not content:
+            await self._error(None, {"detail": "Empty payload"})
+            return
+        action = content.get("action")
+        handler = self._ACTIONS.get(action)
+        if handler is None:
+            await self._error(action, {"detail": "Unknown action."})
+            return
+        await getattr(self, handler)(content)
+
+    # Actions
+
+    async def _start(self, content: dict[str, Any]) -> None:
+        serializer = CreateReviewSessionSerializer(data=content)
+        if not serializer.is_valid():
+            await self._error("start", {"errors": serializer.errors})
+            return
+        try:
+            session = await ReviewSession.objects.acreate(id=self.session_key, **serializer.validated_data)
+        except IntegrityError:
+            await self._error("start", {"detail": "Session already exists."}, status=409)
+            return
+        await self._send_session(session)
+
+    async def _next(self, content: dict[str, Any]) -> None:
+        await self._send_session(await aget_review_session(self.session_key))
+
+    async def _answer(self, content: dict[str, Any]) -> None:
+        serializer = SubmitAnswerSerializer(data=content)
+        if not serializer.is_valid():
+            await self._error("answer", {"errors": serializer.errors})
+            return
+        await self._submit("answer", serializer.validated_data)
+
+    async def _audio(self, content: dict[str, Any]) -> None:
+        self._discard_upload()
+        self._upload = _AudioUpload(
+            fields={key: content[key] for key in ("question_id", "answer_text") if key in content},
+            name=str(content.get("filename") or "answer"),
+            content_type=str(content.get("content_type") or "application/octet-stream"),
+        )
+
+    async def _receive_chunk(self, chunk: bytes) -> None:
+        upload = self._upload
+        if upload is None:
+            await self._error("audio", {"detail": "Send an audio message before its data."})
+            return
+        if upload.size + len(chunk) > settings.REVIEW_WS_AUDIO_MAX_BYTES:
+            self._discard_upload()
+            await self._error("audio", {"detail": "Audio file is too large."}, status=413)
+            return
+        # Past FILE_UPLOAD_MAX_MEMORY_SIZE the spool is on disk: keep that off the loop.
+        await sync_to_async(upload.file.write, thread_sensitive=False)(chunk)
+        upload.size += len(chunk)
+
+    async def _audio_end(self, content: dict[str, Any]) -> None:
+        upload, self._upload = self._upload, None
+        if upload is None:
+            await self._error("audio", {"detail": "No audio upload in progress."})
+            return
+        try:
+            upload.file.seek(0)
+            audio = UploadedFile(upload.file, name=upload.name, content_type=upload.content_type, size=upload.size)
+            serializer = SubmitAnswerSerializer(data={**upload.fields, "audio_file": audio})
+            if not serializer.is_valid():
+                await self._error("audio", {"errors": serializer.errors})
+                return
+            await self._submit("audio", serializer.validated_data)
+        finally:
+            upload.file.close()
+
+    async def _contact(self, content: dict[str, Any]) -> None:
+        serializer = ContactInfoSerializer(data={**content, "review_session_id": self.session_key})
+        if not serializer.is_valid():
+            await self._error("contact", {"errors": serializer.errors})
+            return
+        session = await aget_review_session(self.session_key)
+        if session is None:
+            await self._error("contact", _SESSION_NOT_FOUND, status=404)
+            return
+        session.email = serializer.validated_data["email"]
+        session.phone_number = serializer.validated_data["phone_number"]
+        await session.asave(update_fields=["email", "phone_number", "updated_at"])
+        await ainvalidate_review_session(session.id)
+        await self.send_json(
+            {
+                "type": "contact",
+                "review_session_id": str(session.id),
+                "email": session.email,
+                "phone_number": session.phone_number,
+            }
+        )
+
+    # Helpers
+
+    async def _submit(self, action: str, data: dict[str, Any]) -> None:
+        session = await aget_review_session(self.session_key)
+        if session is None:
+            await self._error(action, _SESSION_NOT_FOUND, status=404)
+            return
+        if session.completed_at:
+            await self._error(action, {"detail": "Session already completed."})
+            return
+        try:
+            # Not shed: a websocket client cannot be told to retry, so the
+            # completing answer is always queued (see ai.services.admission).
+            submitted = await database_sync_to_async(submit_answer_atomic)(
+                session,
+                question_id=data["question_id"],
+                answer_text=data.get("answer_text", ""),
+                audio_file=data.get("audio_file"),
+            )
+        except AnswerRejected as exc:
+            await self._error(action, exc.payload, status=exc.status_code)
+            return
+
+        next_question = submitted.next_question
+        await self.send_json(
+            {
+                "type": "answered",
+                "session": flat_review_session(session),
+                "answer": flat_review_answer(submitted.answer, {"request": self._request()}),
+                "next_question": flat_review_question(next_question) if next_question else None,
+                "completed": next_question is None,
+            }
+        )
+        if next_question is None:
+            # From here on the socket streams the analysis.
+            await self._resume(None)
+
+    async def _send_session(self, session: ReviewSession | None) -> None:
+        next_question = await aget_next_question(session) if session is not None else None
+        await self.send_json(
+            {
+                "type": "session",
+                "session": flat_review_session(session) if session is not None else None,
+                "completed": session is not None and next_question is None,
+                "next_question": flat_review_question(next_question) if next_question else None,
+            }
+        )
+
+    def _request(self) -> HttpRequest | None:
+        # None (relative URLs) for a Host the HTTP endpoints would refuse.
+        if self._url_request is None:
+            request = _HandshakeRequest(self.scope)
+            try:
+                request.get_host()
+            except DisallowedHost:
+                return None
+            self._url_request = request
+        return self._url_request
+
+    async def _error(self, action: str | None, payload: dict[str, Any], status: int = 400) -> None:
+        await self.send_json({"type": "error", "action": action, "status": status, **payload})
+
+    def _discard_upload(self) -> None:
+        if self._upload is not None:
+            self._upload.file.close()
+            self._upload = None
+
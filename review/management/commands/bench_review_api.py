@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the hot review endpoints (start, next, answer, contact, meeting "
+        "request) on one or more running servers and report requests/sec and "
+        "latency percentiles. Run it against a gunicorn (sync views) and a daphne "
+        "(REVIEW_ASYNC_VIEWS=1) deployment sharing the same database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="NAME=BASE_URL, e.g. sync=http://localhost:8000 (repeatable).",
+        )
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--flows", type=int, default=500, help="Review flows per target.")
+        parser.add_argument(
+            "--answers",
+            type=int,
+            default=1,
+            help="Answers submitted per flow. Keep below the question count to avoid "
+            "triggering AI analyses.",
+        )
+        parser.add_argument("--phone", default="+989121234567")
+
+    def handle(self, *args, **options):
+        targets = []
+        for raw in options["target"]:
+            name, sep, url = raw.partition("=")
+            if not sep or not url:
+                raise CommandError(f"Invalid --target {raw!r}; expected NAME=URL.")
+            targets.append((name, url.rstrip("/")))
+
+        for name, base_url in targets:
+            result = asyncio.run(self._run_target(base_url, options))
+            self._report(name, result)
+
+    async def _run_target(self, base_url: str, options) -> dict:
+        latencies: dict[str, list[float]] = defaultdict(list)
+        errors: dict[str, int] = defaultdict(int)
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        limits = httpx.Limits(
+            max_connections=options["concurrency"],
+            max_keepalive_connections=options["concurrency"],
+        )
+
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+            async def call(label: str, method: str, url: str, **kwargs):
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                except httpx.HTTPError:
+                    errors[label] += 1
+                    return None
+                latencies[label].append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors[label] += 1
+                    return None
+                return response.json()
+
+            async def flow() -> None:
+                async with semaphore:
+                    started = await call("start", "POST", "/api/review/start/", json={})
+                    if not started:
+                        return
+                    session_id = started["session"]["id"]
+                    question = started["next_question"]
+                    for _ in range(options["answers"]):
+                        if not question:
+                            break
+                        await call("next", "GET", f"/api/review/{session_id}/next/")
+                        answered = await call(
+                            "answer",
+                            "POST",
+                            f"/api/review/{session_id}/answer/",
+                            json={"question_id": question["id"], "answer_text": "پاسخ آزمایشی"},
+                        )
+                        question = answered and answered["next_question"]
+                    await call(
+                        "contact",
+                        "POST",
+                        "/api/review/session/contact/",
+                        json={
+                            "review_session_id": session_id,
+                            "email": "bench@example.com",
+                            "phone_number": options["phone"],
+                        },
+                    )
+                    await call(
+                        "meeting",
+                        "POST",
+                        "/api/review/session/meeting/request/",
+                        json={"review_session_id": session_id},
+                    )
+
+            wall_started = time.perf_counter()
+            await asyncio.gather(*(flow() for _ in range(options["flows"])))
+            wall = time.perf_counter() - wall_started
+
+        return {"latencies": latencies, "errors": errors, "wall": wall}
+
+    def _report(self, name: str, result: dict) -> None:
+        latencies = result["latencies"]
+        all_latencies = [value for values in latencies.values() for value in values]
+        total = len(all_latencies)
+        rps = total / result["wall"] if result["wall"] else 0.0
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"{name}: {total} requests in {result['wall']:.2f}s = {rps:.1f} req/s, "
+                f"p50={_percentile(all_latencies, 50) * 1000:.1f}ms "
+                f"p99={_percentile(all_latencies, 99) * 1000:.1f}ms"
+            )
+        )
+        for label, values in latencies.items():
+            self.stdout.write(
+                f"  {label:<8} n={len(values):<6} "
+                f"mean={statistics.fmean(values) * 1000:7.1f}ms "
+                f"p50={_percentile(values, 50) * 1000:7.1f}ms "
+                f"p99={_percentile(values, 99) * 1000:7.1f}ms "
+                f"errors={result['errors'].get(label, 0)}"
+            )
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewanswer',
+            name='audio_duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewanswer',
+            name='audio_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='reviewanswer',
+            name='audio_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='reviewanswer',
+            index=models.Index(condition=models.Q(('audio_status', 'pending')), fields=['created_at'], name='review_answer_audio_pending'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 02:07
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0003_reviewquestion_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reviewsession',
+            name='id',
+            field=models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0004_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reviewsession',
+            index=models.Index(fields=['updated_at'], name='review_session_updated'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0005_reviewsession_review_session_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CleanupCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('position', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reviewanswer',
+            index=models.Index(fields=['audio_file'], name='review_answer_audio_file'),
+        ),
+        migrations.AddIndex(
+            model_name='reviewsession',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['updated_at'], name='review_session_open_updated'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0006_cleanup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewanswer',
+            name='audio_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reviewanswer',
+            index=models.Index(condition=models.Q(('audio_status', 'processing')), fields=['audio_claimed_at'], name='review_answer_audio_claimed'),
+        ),
+    ]
@@ -1,17 +1,17 @@
 from __future__ import annotations
 
-import uuid
-
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from core.ids import uuid7
+
 
 class ReviewSession(models.Model):
     """
     Anonymous review session keyed by a UUID token.
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     phone_number = models.CharField(max_length=32, blank=True, default="")
     email = models.EmailField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -20,6 +20,15 @@ class ReviewSession(models.Model):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Retention and cleanup scan for sessions idle since a cutoff.
+            models.Index(fields=["updated_at"], name="review_session_updated"),
+            models.Index(
+                fields=["updated_at"],
+                name="review_session_open_updated",
+                condition=models.Q(completed_at__isnull=True),
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"ReviewSession({self.id})"
@@ -33,6 +42,7 @@ class ReviewQuestion(models.Model):
     prompt = models.TextField()
     order = models.PositiveIntegerField(unique=True)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("order",)
@@ -41,6 +51,13 @@ class ReviewQuestion(models.Model):
         return f"Q{self.order}: {self.prompt[:32]}..."
 
 
+class AudioStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    PROCESSING = "processing", "Processing"
+    READY = "ready", "Ready"
+    FAILED = "failed", "Failed"
+
+
 class ReviewAnswer(models.Model):
     """
     Captures the answer for a question within a session.
@@ -56,11 +73,33 @@ class ReviewAnswer(models.Model):
     audio_file = models.FileField(
         upload_to="review/audio/", blank=True, null=True
     )
+    audio_status = models.CharField(
+        max_length=16, choices=AudioStatus.choices, blank=True, default=""
+    )
+    audio_duration = models.FloatField(null=True, blank=True)
+    audio_error = models.TextField(blank=True, default="")
+    # When the audio pipeline claimed the answer; a claim older than
+    # AUDIO_CLAIM_TIMEOUT belongs to a dead worker and is taken back.
+    audio_claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("session", "question")
         ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(audio_status="pending"),
+                name="review_answer_audio_pending",
+            ),
+            models.Index(
+                fields=["audio_claimed_at"],
+                condition=models.Q(audio_status="processing"),
+                name="review_answer_audio_claimed",
+            ),
+            # Storage reconciliation looks stored objects up by name.
+            models.Index(fields=["audio_file"], name="review_answer_audio_file"),
+        ]
 
     def __str__(self) -> str:
         return f"Answer(session={self.session_id}, question={self.question_id})"
@@ -98,3 +137,16 @@ class MeetingRequest(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
         return super().save(*args, **kwargs)
+
+
+class CleanupCheckpoint(models.Model):
+    """
+    Resume position of an incremental cleanup scan.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    position = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"CleanupCheckpoint({self.name}, position={self.position!r})"
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
+from core.serialization import FlatSerializer, absolute_url, as_datetime, as_str, field, method_field
 from review.models import MeetingRequest, ReviewAnswer, ReviewQuestion, ReviewSession
 from review.utils.phone import normalize_ir_phone
 
@@ -47,7 +48,15 @@ class ReviewAnswerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ReviewAnswer
-        fields = ("id", "question", "answer_text", "audio_url", "created_at")
+        fields = (
+            "id",
+            "question",
+            "answer_text",
+            "audio_url",
+            "audio_status",
+            "audio_duration",
+            "created_at",
+        )
 
     def get_audio_url(self, obj: ReviewAnswer):
         if obj.audio_file:
@@ -100,3 +109,58 @@ class MeetingRequestSerializer(serializers.ModelSerializer):
 
 class MeetingRequestCreateSerializer(serializers.Serializer):
     review_session_id = serializers.UUIDField()
+
+
+# Flat counterparts of the response serializers above, used on the hot paths.
+# Output must stay identical to the DRF serializers; ``bench_serializers``
+# checks the rendered bytes.
+
+
+def _audio_url(answer: ReviewAnswer, context) -> str:
+    if not answer.audio_file:
+        return ""
+    url = answer.audio_file.url
+    request = context.get("request")
+    if request is not None:
+        return absolute_url(request, url)
+    return url
+
+
+flat_review_question = FlatSerializer(
+    field("id", int),
+    field("prompt", str),
+    field("order", int),
+)
+
+flat_review_session = FlatSerializer(
+    field("id", as_str),
+    field("phone_number", str),
+    field("email", str),
+    field("created_at", as_datetime),
+    field("updated_at", as_datetime),
+    field("completed_at", as_datetime),
+)
+
+
+def _answer_question(answer: ReviewAnswer, context):
+    return flat_review_question(answer.question) if answer.question is not None else None
+
+
+flat_review_answer = FlatSerializer(
+    field("id", int),
+    method_field("question", _answer_question),
+    field("answer_text", str),
+    method_field("audio_url", _audio_url),
+    field("audio_status", as_str),
+    field("audio_duration", float),
+    field("created_at", as_datetime),
+)
+
+flat_meeting_request = FlatSerializer(
+    field("id", int),
+    field("review_session_id", as_str),
+    field("status", as_str),
+    field("email", str, source="review_session.email"),
+    field("phone_number", str, source="review_session.phone_number"),
+    field("created_at", as_datetime),
+)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import transaction
+from django.utils import timezone
+
+from ai.services import admission
+from ai.services.analysis import enqueue_analysis_for_session, session_has_pending_audio
+from core.conditional import Validators
+from review.models import AudioStatus, ReviewAnswer, ReviewQuestion, ReviewSession
+from review.services.cache import aget_questions, get_questions, invalidate_review_session
+from review.tasks import schedule_audio_processing
+
+
+class AnswerRejected(Exception):
+    """
+    Raised when an answer breaks the questionnaire rules.
+    ``payload`` is returned to the client as-is.
+    """
+
+    def __init__(self, detail: str, status_code: int = 400, **extra: Any) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.payload = {"detail": detail, **extra}
+
+
+@dataclass(slots=True)
+class SubmittedAnswer:
+    answer: ReviewAnswer
+    next_question: ReviewQuestion | None
+
+
+def _first_unanswered(
+    questions: list[ReviewQuestion], answered_ids: set[int]
+) -> ReviewQuestion | None:
+    for question in questions:
+        if question.is_active and question.id not in answered_ids:
+            return question
+    return None
+
+
+def _answered_question_ids(session_id):
+    return ReviewAnswer.objects.filter(session_id=session_id).values_list(
+        "question_id", flat=True
+    )
+
+
+def get_next_question(session: ReviewSession) -> ReviewQuestion | None:
+    return _first_unanswered(get_questions(), set(_answered_question_ids(session.id)))
+
+
+async def aget_next_question(session: ReviewSession) -> ReviewQuestion | None:
+    answered_ids = {question_id async for question_id in _answered_question_ids(session.id)}
+    return _first_unanswered(await aget_questions(), answered_ids)
+
+
+def _next_question_validators(
+    session: ReviewSession, questions: list[ReviewQuestion]
+) -> Validators:
+    # The next question depends on the session's answers (each answer bumps
+    # ReviewSession.updated_at) and on the question set itself.
+    questions_changed_at = max((question.updated_at for question in questions), default=None)
+    return Validators(
+        "next",
+        session.updated_at.isoformat(),
+        questions_changed_at.isoformat() if questions_changed_at else None,
+        len(questions),
+    )
+
+
+def next_question_validators(session: ReviewSession) -> Validators:
+    """
+    ETag for the next-question endpoint, computed from the
+    cached session row and question set without touching the database.
+    """
+
+    return _next_question_validators(session, get_questions())
+
+
+async def anext_question_validators(session: ReviewSession) -> Validators:
+    return _next_question_validators(session, await aget_questions())
+
+
+def submit_answer(
+    session: ReviewSession,
+    *,
+    question_id: int,
+    answer_text: str = "",
+    audio_file=None,
+    shed: bool = False,
+) -> SubmittedAnswer:
+    """
+    Store an answer for the next expected question and complete the session
+    (enqueueing its analysis) once every active question is answered.
+
+    With ``shed`` the completing answer raises ``AnalysisOverloaded`` while
+    the analysis queue is full. It is raised before anything is written, so
+    the client can submit the same answer again.
+    """
+
+    if session.completed_at:
+        raise AnswerRejected("Session already completed.")
+
+    questions = get_questions()
+    question = next(
+        (
+            question
+            for question in questions
+            if question.id == question_id and question.is_active
+        ),
+        None,
+    )
+    if question is None:
+        raise AnswerRejected("Question not found.", status_code=404)
+
+    answered_ids = set(_answered_question_ids(session.id))
+    expected_question = _first_unanswered(questions, answered_ids)
+    if expected_question and question.id != expected_question.id:
+        raise AnswerRejected(
+            "Answers must be submitted in order.",
+            expected_question_id=expected_question.id,
+        )
+    if not expected_question and not session.completed_at:
+        raise AnswerRejected("All questions already answered.")
+
+    completes = _first_unanswered(questions, answered_ids | {question.id}) is None
+    # Audio answers leave the analysis to the audio pipeline, which is never
+    # shed; a text answer that completes the session is admitted up front.
+    if shed and completes and not audio_file and not session_has_pending_audio(session):
+        admission.admit()
+
+    try:
+        return _store_answer(session, question, answer_text=answer_text, audio_file=audio_file)
+    finally:
+        # Whatever happened after the first write, cached copies of the
+        # session must not outlive it.
+        invalidate_review_session(session.id)
+
+
+def _store_answer(
+    session: ReviewSession, question: ReviewQuestion, *, answer_text: str, audio_file
+) -> SubmittedAnswer:
+    audio_status = AudioStatus.PENDING if audio_file else ""
+    answer, created = ReviewAnswer.objects.get_or_create(
+        session=session,
+        question=question,
+        defaults={
+            "answer_text": answer_text,
+            "audio_file": audio_file,
+            "audio_status": audio_status,
+        },
+    )
+    if not created:
+        answer.answer_text = answer_text
+        update_fields = ["answer_text"]
+        if audio_file:
+            answer.audio_file = audio_file
+            answer.audio_status = audio_status
+            update_fields.extend(["audio_file", "audio_status"])
+        answer.save(update_fields=update_fields)
+    if audio_file:
+        schedule_audio_processing()
+
+    next_question = get_next_question(session)
+    if not next_question and not session.completed_at:
+        session.completed_at = timezone.now()
+        session.save(update_fields=["completed_at", "updated_at"])
+        # Audio-only answers get their text from the audio pipeline,
+        # which enqueues the analysis once transcription finishes.
+        if not session_has_pending_audio(session):
+            enqueue_analysis_for_session(session)
+    else:
+        # Bump the row version so conditional GETs on /next/ see the answer.
+        session.save(update_fields=["updated_at"])
+
+    return SubmittedAnswer(answer=answer, next_question=next_question)
+
+
+def submit_answer_atomic(session: ReviewSession, **kwargs: Any) -> SubmittedAnswer:
+    """
+    ``submit_answer`` in its own transaction, for callers that are not
+    wrapped by ATOMIC_REQUESTS (async views, websocket consumers).
+    """
+
+    with transaction.atomic():
+        return submit_answer(session, **kwargs)
+
+
+__all__ = [
+    "AnswerRejected",
+    "SubmittedAnswer",
+    "aget_next_question",
+    "anext_question_validators",
+    "get_next_question",
+    "next_question_validators",
+    "submit_answer",
+    "submit_answer_atomic",
+]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+
+from review.models import ReviewAnswer
+
+logger = logging.getLogger(__name__)
+
+
+class AudioProcessingError(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class TranscodedAudio:
+    path: Path
+    duration: float | None
+
+
+def _run(command: list[str], *, timeout: int) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(
+            command,
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except FileNotFoundError as exc:
+        raise AudioProcessingError(f"{command[0]} is not installed.") from exc
+    except subprocess.TimeoutExpired as exc:
+        raise AudioProcessingError(f"{command[0]} timed out after {timeout}s.") from exc
+    except subprocess.CalledProcessError as exc:
+        stderr = (exc.stderr or "").strip().splitlines()
+        detail = stderr[-1] if stderr else f"exit code {exc.returncode}"
+        raise AudioProcessingError(f"{command[0]} failed: {detail}") from exc
+
+
+def probe_duration(path: Path) -> float | None:
+    """
+    Return the container duration in seconds as reported by ffprobe.
+    """
+
+    result = _run(
+        [
+            settings.FFPROBE_BINARY,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(path),
+        ],
+        timeout=settings.AUDIO_PROCESS_TIMEOUT,
+    )
+    try:
+        return round(float(result.stdout.strip()), 3)
+    except ValueError:
+        return None
+
+
+def transcode(source: Path, workdir: Path) -> TranscodedAudio:
+    """
+    Transcode any input into mono Opus at a bounded bitrate.
+
+    16 kHz mono is what speech models expect, so the same file feeds the
+    transcription backend and replaces the stored upload.
+    """
+
+    target = workdir / f"{source.stem}.ogg"
+    _run(
+        [
+            settings.FFMPEG_BINARY,
+            "-nostdin",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(source),
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(settings.AUDIO_TRANSCODE_SAMPLE_RATE),
+            "-c:a",
+            "libopus",
+            "-b:a",
+            settings.AUDIO_TRANSCODE_BITRATE,
+            "-application",
+            "voip",
+            str(target),
+        ],
+        timeout=settings.AUDIO_PROCESS_TIMEOUT,
+    )
+    return TranscodedAudio(path=target, duration=probe_duration(target))
+
+
+def download_to(answer: ReviewAnswer, workdir: Path) -> Path:
+    """
+    Copy the stored upload into a local file (works for S3 and filesystem storage).
+    """
+
+    name = Path(answer.audio_file.name).name or f"answer-{answer.id}"
+    target = workdir / f"source-{name}"
+    with answer.audio_file.open("rb") as src, target.open("wb") as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+    return target
+
+
+def replace_stored_audio(answer: ReviewAnswer, transcoded: TranscodedAudio) -> str:
+    """
+    Store the transcoded file in place of the original upload.
+    Returns the name of the original object so the caller can delete it
+    once the row update has committed.
+    """
+
+    old_name = answer.audio_file.name
+    with transcoded.path.open("rb") as fh:
+        answer.audio_file.save(transcoded.path.name, File(fh), save=False)
+    return old_name
+
+
+def make_workdir() -> tempfile.TemporaryDirectory:
+    return tempfile.TemporaryDirectory(prefix="okrcoach-audio-")
+
+
+__all__ = [
+    "AudioProcessingError",
+    "TranscodedAudio",
+    "download_to",
+    "make_workdir",
+    "probe_duration",
+    "replace_stored_audio",
+    "transcode",
+]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from core.cache import ReadThroughCache
+from core.replicas import use_primary
+from review.models import ReviewQuestion, ReviewSession
+
+session_cache = ReadThroughCache("review-session")
+question_cache = ReadThroughCache("review-questions")
+
+# The question set is a single cache entry.
+_ALL_QUESTIONS = "all"
+
+# Loaders always read the primary: a row read from a lagging replica would
+# otherwise stay cached long after the write that invalidated it.
+
+
+def get_review_session(session_id) -> ReviewSession | None:
+    def load() -> ReviewSession | None:
+        with use_primary():
+            return ReviewSession.objects.filter(id=session_id).first()
+
+    return session_cache.get(session_id, load)
+
+
+async def aget_review_session(session_id) -> ReviewSession | None:
+    async def load() -> ReviewSession | None:
+        with use_primary():
+            return await ReviewSession.objects.filter(id=session_id).afirst()
+
+    return await session_cache.aget(session_id, load)
+
+
+def invalidate_review_session(session_id) -> None:
+    session_cache.invalidate(session_id)
+
+
+async def ainvalidate_review_session(session_id) -> None:
+    await session_cache.ainvalidate(session_id)
+
+
+def get_questions() -> list[ReviewQuestion]:
+    """
+    Every question (active or not) ordered by ``order``.
+    """
+
+    def load() -> list[ReviewQuestion]:
+        with use_primary():
+            return list(ReviewQuestion.objects.order_by("order"))
+
+    return question_cache.get(_ALL_QUESTIONS, load)
+
+
+async def aget_questions() -> list[ReviewQuestion]:
+    async def load() -> list[ReviewQuestion]:
+        with use_primary():
+            return [question async for question in ReviewQuestion.objects.order_by("order")]
+
+    return await question_cache.aget(_ALL_QUESTIONS, load)
+
+
+def invalidate_questions() -> None:
+    question_cache.invalidate(_ALL_QUESTIONS)
+
+
+__all__ = [
+    "aget_questions",
+    "aget_review_session",
+    "ainvalidate_review_session",
+    "get_questions",
+    "get_review_session",
+    "invalidate_questions",
+    "invalidate_review_session",
+]
@@ -0,0 +1,189 @@
+"""
+Garbage collection for abandoned review sessions and orphaned audio.
+
+Every step does a bounded amount of work -- one batch of sessions, one page
+of the storage listing -- so the beat task can run continuously without I/O
+spikes. The storage scan resumes from a CleanupCheckpoint row and wraps
+around once the listing is exhausted.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.core.files.storage import Storage, default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from review.models import CleanupCheckpoint, ReviewAnswer, ReviewSession
+from review.services.cache import invalidate_review_session
+
+logger = logging.getLogger(__name__)
+
+AUDIO_PREFIX = "review/audio/"
+_ORPHAN_CHECKPOINT = "orphaned-audio"
+# S3 DeleteObjects accepts at most 1000 keys per request.
+_S3_DELETE_LIMIT = 1000
+
+
+def _is_s3(storage: Storage) -> bool:
+    return hasattr(storage, "bucket") and hasattr(storage, "_normalize_name")
+
+
+def _s3_key(storage: Storage, name: str) -> str:
+    from storages.utils import clean_name
+
+    return storage._normalize_name(clean_name(name))
+
+
+def _s3_name(storage: Storage, key: str) -> str:
+    location = storage.location.strip("/")
+    return key[len(location) + 1:] if location else key
+
+
+def _delete_one(storage: Storage, name: str) -> int:
+    try:
+        storage.delete(name)
+    except Exception:  # pragma: no cover - storage backend errors
+        logger.warning("Could not delete %s", name, exc_info=True)
+        return 0
+    return 1
+
+
+def _delete_s3_chunk(storage: Storage, names: list[str]) -> int:
+    response = storage.bucket.meta.client.delete_objects(
+        Bucket=storage.bucket_name,
+        Delete={"Objects": [{"Key": _s3_key(storage, name)} for name in names], "Quiet": True},
+    )
+    errors = response.get("Errors", [])
+    for error in errors:
+        logger.warning("Could not delete %s: %s", error.get("Key"), error.get("Message"))
+    return len(names) - len(errors)
+
+
+def delete_blobs(names: Iterable[str], storage: Storage | None = None) -> int:
+    """
+    Delete stored files, in parallel: 1000-key DeleteObjects requests on S3,
+    single deletes elsewhere. Returns how many were deleted.
+    """
+
+    storage = storage or default_storage
+    names = [name for name in dict.fromkeys(names) if name]
+    if not names:
+        return 0
+    if _is_s3(storage):
+        chunks = [names[start:start + _S3_DELETE_LIMIT] for start in range(0, len(names), _S3_DELETE_LIMIT)]
+        work, args = _delete_s3_chunk, chunks
+    else:
+        work, args = _delete_one, names
+    workers = max(1, min(settings.GC_DELETE_WORKERS, len(args)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda item: work(storage, item), args))
+
+
+def _abandoned_cutoff() -> datetime:
+    return timezone.now() - timedelta(hours=settings.GC_SESSION_TTL_HOURS)
+
+
+def collect_abandoned_sessions(*, batch: int | None = None) -> int:
+    """
+    Delete up to ``batch`` sessions that were never completed and have been
+    idle past GC_SESSION_TTL_HOURS, with their answers and audio. Sessions
+    that left contact details, a meeting request or an analysis are kept.
+    """
+
+    cutoff = _abandoned_cutoff()
+    with transaction.atomic():
+        ids = list(
+            ReviewSession.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(completed_at__isnull=True, updated_at__lt=cutoff, phone_number="", email="")
+            .filter(analysis__isnull=True, meeting_requests__isnull=True)
+            .exclude(answers__created_at__gte=cutoff)
+            .order_by("updated_at")
+            .values_list("id", flat=True)[: batch or settings.GC_SESSION_BATCH]
+        )
+        if not ids:
+            return 0
+        audio = list(
+            ReviewAnswer.objects.filter(session_id__in=ids)
+            .exclude(audio_file="")
+            .exclude(audio_file__isnull=True)
+            .values_list("audio_file", flat=True)
+        )
+        ReviewAnswer.objects.filter(session_id__in=ids).delete()
+        ReviewSession.objects.filter(id__in=ids).delete()
+        for session_id in ids:
+            invalidate_review_session(session_id)
+        if audio:
+            transaction.on_commit(lambda: delete_blobs(audio))
+    logger.info("Collected %s abandoned review sessions (%s audio files)", len(ids), len(audio))
+    return len(ids)
+
+
+def _list_page(storage: Storage, after: str, limit: int) -> list[tuple[str, datetime | None]]:
+    """
+    Up to ``limit`` stored audio names sorted after ``after``, with their
+    modification time when the listing provides it.
+    """
+
+    if _is_s3(storage):
+        response = storage.bucket.meta.client.list_objects_v2(
+            Bucket=storage.bucket_name,
+            Prefix=_s3_key(storage, AUDIO_PREFIX),
+            StartAfter=_s3_key(storage, after) if after else "",
+            MaxKeys=limit,
+        )
+        return [
+            (_s3_name(storage, item["Key"]), item["LastModified"]) for item in response.get("Contents", [])
+        ]
+
+    names: list[str] = []
+    pending = [AUDIO_PREFIX.rstrip("/")]
+    while pending:
+        directory = pending.pop()
+        if not storage.exists(directory):
+            continue
+        dirs, files = storage.listdir(directory)
+        pending.extend(f"{directory}/{name}" for name in dirs)
+        names.extend(f"{directory}/{name}" for name in files)
+    page = [name for name in sorted(names) if name > after][:limit]
+    return [(name, storage.get_modified_time(name)) for name in page]
+
+
+def reconcile_orphaned_audio(*, page: int | None = None, storage: Storage | None = None) -> dict[str, int]:
+    """
+    Check the next page of stored audio against ReviewAnswer and delete
+    objects nothing references. Objects younger than GC_ORPHAN_GRACE_HOURS
+    are skipped: their row may not be committed yet.
+    """
+
+    storage = storage or default_storage
+    page = page or settings.GC_ORPHAN_PAGE
+    checkpoint, _ = CleanupCheckpoint.objects.get_or_create(name=_ORPHAN_CHECKPOINT)
+    listing = _list_page(storage, checkpoint.position, page)
+    grace = timezone.now() - timedelta(hours=settings.GC_ORPHAN_GRACE_HOURS)
+    candidates = [name for name, modified in listing if modified is None or modified < grace]
+    referenced = set(
+        ReviewAnswer.objects.filter(audio_file__in=candidates).values_list("audio_file", flat=True)
+    )
+    orphans = [name for name in candidates if name not in referenced]
+    deleted = delete_blobs(orphans, storage)
+
+    # A short page means the end of the listing: start over next time.
+    checkpoint.position = listing[-1][0] if len(listing) == page else ""
+    checkpoint.save(update_fields=["position", "updated_at"])
+    if orphans:
+        logger.info("Deleted %s orphaned audio objects of %s scanned", deleted, len(listing))
+    return {"scanned": len(listing), "deleted": deleted}
+
+
+__all__ = [
+    "AUDIO_PREFIX",
+    "collect_abandoned_sessions",
+    "delete_blobs",
+    "reconcile_orphaned_audio",
+]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionBackend:
+    """
+    Base class for speech-to-text backends.
+
+    Backends receive a batch of local, already transcoded files so expensive
+    state (models, HTTP clients) is loaded once per worker process.
+    """
+
+    def transcribe_batch(self, paths: Sequence[Path]) -> list[str]:
+        raise NotImplementedError
+
+
+class FakeTranscriptionBackend(TranscriptionBackend):
+    """
+    Offline backend for tests and local development.
+    Returns a deterministic placeholder transcript per file.
+    """
+
+    def transcribe_batch(self, paths: Sequence[Path]) -> list[str]:
+        return [f"Transcribed audio answer ({path.stem})." for path in paths]
+
+
+class OpenAITranscriptionBackend(TranscriptionBackend):
+    """
+    Uses the configured OpenAI-compatible endpoint's audio transcription API.
+    """
+
+    def __init__(self) -> None:
+        from ai.services.ai_client import get_client
+
+        self._client = get_client()
+
+    def transcribe_batch(self, paths: Sequence[Path]) -> list[str]:
+        transcripts: list[str] = []
+        for path in paths:
+            with path.open("rb") as fh:
+                response = self._client.audio.transcriptions.create(
+                    model=settings.AUDIO_TRANSCRIPTION_MODEL,
+                    file=fh,
+                    language=settings.AUDIO_TRANSCRIPTION_LANGUAGE or None,
+                )
+            transcripts.append((response.text or "").strip())
+        return transcripts
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    Local CPU transcription with faster-whisper (optional dependency).
+    """
+
+    def __init__(self) -> None:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImproperlyConfigured(
+                "FasterWhisperBackend requires the 'faster-whisper' package."
+            ) from exc
+
+        self._model = WhisperModel(
+            settings.AUDIO_WHISPER_MODEL_SIZE,
+            device="cpu",
+            compute_type=settings.AUDIO_WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.AUDIO_WHISPER_CPU_THREADS,
+        )
+
+    def transcribe_batch(self, paths: Sequence[Path]) -> list[str]:
+        transcripts: list[str] = []
+        for path in paths:
+            segments, _ = self._model.transcribe(
+                str(path),
+                language=settings.AUDIO_TRANSCRIPTION_LANGUAGE or None,
+                vad_filter=True,
+            )
+            transcripts.append(" ".join(segment.text.strip() for segment in segments).strip())
+        return transcripts
+
+
+@lru_cache(maxsize=1)
+def get_transcription_backend() -> TranscriptionBackend:
+    backend_path = settings.AUDIO_TRANSCRIPTION_BACKEND
+    try:
+        backend_class = import_string(backend_path)
+    except ImportError as exc:
+        raise ImproperlyConfigured(
+            f"Invalid AUDIO_TRANSCRIPTION_BACKEND: {backend_path}"
+        ) from exc
+    logger.info("Loading transcription backend %s", backend_path)
+    return backend_class()
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from review.models import ReviewQuestion
+from review.services.cache import invalidate_questions
+
+
+@receiver(post_save, sender=ReviewQuestion, dispatch_uid="review_question_saved")
+@receiver(post_delete, sender=ReviewQuestion, dispatch_uid="review_question_deleted")
+def _drop_cached_questions(sender, **kwargs) -> None:
+    # Questions are edited through the admin, outside the API save paths.
+    invalidate_questions()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ai.services import events
+from ai.services.analysis import enqueue_analysis_for_session, session_has_pending_audio
+from jobs.services.queue import dispatch
+from review.models import AudioStatus, ReviewAnswer, ReviewSession
+from review.services import audio, cleanup
+from review.services.transcription import get_transcription_backend
+
+logger = logging.getLogger(__name__)
+
+
+def _claim_pending_answers(batch_size: int) -> list[ReviewAnswer]:
+    """
+    Claim pending answers, and answers whose claim outlived
+    AUDIO_CLAIM_TIMEOUT because the worker holding it died.
+    """
+
+    now = timezone.now()
+    stale = Q(audio_status=AudioStatus.PROCESSING) & (
+        Q(audio_claimed_at__lt=now - timedelta(seconds=settings.AUDIO_CLAIM_TIMEOUT))
+        | Q(audio_claimed_at__isnull=True)
+    )
+    with transaction.atomic():
+        ids = list(
+            ReviewAnswer.objects.select_for_update(skip_locked=True)
+            .filter(Q(audio_status=AudioStatus.PENDING) | stale)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        ReviewAnswer.objects.filter(id__in=ids).update(audio_status=AudioStatus.PROCESSING, audio_claimed_at=now)
+    return list(ReviewAnswer.objects.filter(id__in=ids).order_by("created_at"))
+
+
+def _mark_failed(answer: ReviewAnswer, error: str) -> None:
+    answer.audio_status = AudioStatus.FAILED
+    answer.audio_error = error
+    try:
+        answer.save(update_fields=["audio_status", "audio_error"])
+    except Exception:  # pragma: no cover - database errors
+        # Left PROCESSING; taken back once its claim goes stale.
+        logger.exception("Could not mark audio failed for answer=%s", answer.id)
+
+
+def _delete_replaced(storage, name: str) -> None:
+    try:
+        storage.delete(name)
+    except Exception:  # pragma: no cover - best effort cleanup
+        logger.warning("Could not delete original audio %s", name, exc_info=True)
+
+
+def _store_transcript(answer: ReviewAnswer, transcoded: audio.TranscodedAudio, transcript: str) -> None:
+    storage = answer.audio_file.storage
+    old_name = audio.replace_stored_audio(answer, transcoded)
+    answer.audio_duration = transcoded.duration
+    answer.audio_status = AudioStatus.READY
+    answer.audio_error = ""
+    update_fields = ["audio_file", "audio_duration", "audio_status", "audio_error"]
+    if not (answer.answer_text or "").strip():
+        answer.answer_text = transcript
+        update_fields.append("answer_text")
+    with transaction.atomic():
+        answer.save(update_fields=update_fields)
+        if old_name and old_name != answer.audio_file.name:
+            transaction.on_commit(
+                lambda storage=storage, name=old_name: _delete_replaced(storage, name)
+            )
+
+
+def _process_batch(answers: list[ReviewAnswer]) -> set:
+    """
+    Transcode every answer, then transcribe the whole batch in one backend call.
+    Every answer ends READY or FAILED; returns the ids of their sessions.
+    """
+
+    backend = get_transcription_backend()
+    ready: list[tuple[ReviewAnswer, audio.TranscodedAudio]] = []
+    touched_sessions = {answer.session_id for answer in answers}
+
+    with audio.make_workdir() as tmp:
+        workdir = Path(tmp)
+        for answer in answers:
+            try:
+                source = audio.download_to(answer, workdir)
+                ready.append((answer, audio.transcode(source, workdir)))
+            except Exception as exc:
+                logger.warning("Audio transcode failed for answer=%s error=%s", answer.id, exc)
+                _mark_failed(answer, str(exc))
+
+        if not ready:
+            return touched_sessions
+
+        try:
+            transcripts = backend.transcribe_batch([item.path for _, item in ready])
+        except Exception as exc:
+            logger.exception("Transcription failed for %s answers", len(ready))
+            for answer, _ in ready:
+                _mark_failed(answer, f"Transcription failed: {exc}")
+            return touched_sessions
+
+        if len(transcripts) != len(ready):
+            # Transcripts cannot be matched to files any more.
+            logger.error("Transcription returned %s results for %s files", len(transcripts), len(ready))
+            for answer, _ in ready:
+                _mark_failed(answer, f"Transcription returned {len(transcripts)} results for {len(ready)} files.")
+            return touched_sessions
+
+        for (answer, transcoded), transcript in zip(ready, transcripts):
+            try:
+                _store_transcript(answer, transcoded, transcript)
+            except Exception as exc:
+                logger.exception("Storing transcribed audio failed for answer=%s", answer.id)
+                _mark_failed(answer, f"Storing audio failed: {exc}")
+
+    return touched_sessions
+
+
+def _enqueue_ready_sessions(session_ids: set) -> None:
+    sessions = ReviewSession.objects.filter(
+        id__in=session_ids,
+        completed_at__isnull=False,
+        analysis__isnull=True,
+    )
+    for session in sessions:
+        if session_has_pending_audio(session):
+            continue
+        # Failed audio answers go in with the text the client typed, if any.
+        try:
+            enqueue_analysis_for_session(session)
+        except ValueError as exc:
+            logger.warning(
+                "Analysis not enqueued for review_session=%s error=%s", session.id, exc
+            )
+            # Tell a client waiting for the analysis that none is coming.
+            events.publish(str(session.id), events.error_frame(f"Analysis could not start: {exc}"))
+
+
+@shared_task
+def process_pending_audio(batch_size: int | None = None) -> int:
+    """
+    Drain one batch of pending audio answers: transcode, transcribe, fill
+    ``answer_text`` and enqueue analysis for sessions that became complete.
+    """
+
+    batch_size = batch_size or settings.AUDIO_BATCH_SIZE
+    answers = _claim_pending_answers(batch_size)
+    if not answers:
+        return 0
+
+    logger.info("Processing %s audio answers", len(answers))
+    touched_sessions = _process_batch(answers)
+    if touched_sessions:
+        _enqueue_ready_sessions(touched_sessions)
+
+    if len(answers) == batch_size:
+        # More work is probably waiting; keep draining in a fresh task so the
+        # worker can interleave other batches fairly.
+        dispatch(process_pending_audio, batch_size)
+    return len(answers)
+
+
+@shared_task
+def collect_garbage() -> dict[str, int]:
+    """
+    One bounded garbage-collection step (celery beat): a batch of abandoned
+    sessions and a page of the stored-audio reconciliation.
+    """
+
+    sessions = cleanup.collect_abandoned_sessions()
+    orphans = cleanup.reconcile_orphaned_audio()
+    return {"sessions": sessions, **orphans}
+
+
+def schedule_audio_processing() -> None:
+    """
+    Trigger the audio pipeline once the current transaction commits.
+    """
+
+    dispatch(process_pending_audio)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ai.models import AnalysisLane, AnalysisSession
+from review.models import ReviewAnswer, ReviewQuestion, ReviewSession
+from review.services.cache import invalidate_questions
+
+
+@override_settings(ANALYSIS_MAX_QUEUE=1, ANALYSIS_MAX_WAIT=0, SECURE_SSL_REDIRECT=False)
+class ShedCompletingAnswerTests(TestCase):
+    def setUp(self):
+        self.questions = [ReviewQuestion.objects.create(prompt=f"Q{order}", order=order) for order in range(1, 6)]
+        invalidate_questions()
+        self.session = ReviewSession.objects.create()
+        for question in self.questions[:-1]:
+            ReviewAnswer.objects.create(session=self.session, question=question, answer_text="answer")
+        # Fills the interactive line.
+        self.waiting = AnalysisSession.objects.create(
+            raw_answers={}, lane=AnalysisLane.INTERACTIVE, queued_at=timezone.now()
+        )
+
+    def submit(self):
+        return self.client.post(
+            reverse("review-answer", args=[self.session.id]),
+            {"question_id": self.questions[-1].id, "answer_text": "last"},
+            content_type="application/json",
+        )
+
+    def test_resubmit_after_503(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+        self.session.refresh_from_db()
+        self.assertIsNone(self.session.completed_at)
+        self.assertFalse(ReviewAnswer.objects.filter(session=self.session, question=self.questions[-1]).exists())
+
+        self.waiting.delete()
+        response = self.submit()
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()["completed"])
+        self.session.refresh_from_db()
+        self.assertIsNotNone(self.session.completed_at)
+        self.assertTrue(AnalysisSession.objects.filter(review_session=self.session).exists())
@@ -1,12 +1,18 @@
+from django.conf import settings
 from django.urls import path
 
 from review import views
 
+if settings.REVIEW_ASYNC_VIEWS:
+    from review import async_views as hot_views
+else:
+    hot_views = views
+
 urlpatterns = [
-    path("start/", views.StartSessionView.as_view(), name="review-start"),
-    path("<uuid:session_id>/next/", views.NextQuestionView.as_view(), name="review-next"),
-    path("<uuid:session_id>/answer/", views.SubmitAnswerView.as_view(), name="review-answer"),
-    path("session/contact/", views.SessionContactView.as_view(), name="review-session-contact"),
+    path("start/", hot_views.StartSessionView.as_view(), name="review-start"),
+    path("<uuid:session_id>/next/", hot_views.NextQuestionView.as_view(), name="review-next"),
+    path("<uuid:session_id>/answer/", hot_views.SubmitAnswerView.as_view(), name="review-answer"),
+    path("session/contact/", hot_views.SessionContactView.as_view(), name="review-session-contact"),
     path(
         "session/<uuid:review_session_id>/contact/",
         views.SessionContactDetailView.as_view(),
@@ -14,7 +20,7 @@ urlpatterns = [
     ),
     path(
         "session/meeting/request/",
-        views.MeetingRequestCreateView.as_view(),
+        hot_views.MeetingRequestCreateView.as_view(),
         name="review-meeting-request",
     ),
     path(
@@ -1,34 +1,31 @@
 from __future__ import annotations
 
-from django.utils import timezone
+from django.db.models import Count, Max
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ai.services.analysis import enqueue_analysis_for_session
-from review.models import MeetingRequest, ReviewAnswer, ReviewQuestion, ReviewSession
+from ai.services.admission import AnalysisOverloaded
+from core.conditional import Validators
+from core.replicas import ReadOnlyViewMixin, primary_on_miss
+from review.models import MeetingRequest, ReviewSession
 from review.serializers import (
     ContactInfoSerializer,
     CreateReviewSessionSerializer,
     MeetingRequestCreateSerializer,
-    MeetingRequestSerializer,
-    ReviewAnswerSerializer,
-    ReviewQuestionSerializer,
-    ReviewSessionSerializer,
     SubmitAnswerSerializer,
+    flat_meeting_request,
+    flat_review_answer,
+    flat_review_question,
+    flat_review_session,
 )
-
-
-def _get_next_question(session: ReviewSession):
-    answered_ids = ReviewAnswer.objects.filter(session=session).values_list(
-        "question_id", flat=True
-    )
-    return (
-        ReviewQuestion.objects.filter(is_active=True)
-        .exclude(id__in=answered_ids)
-        .order_by("order")
-        .first()
-    )
+from review.services.answers import (
+    AnswerRejected,
+    get_next_question,
+    next_question_validators,
+    submit_answer,
+)
+from review.services.cache import get_review_session, invalidate_review_session
 
 
 class StartSessionView(APIView):
@@ -39,42 +36,49 @@ class StartSessionView(APIView):
         payload_serializer = CreateReviewSessionSerializer(data=request.data)
         payload_serializer.is_valid(raise_exception=True)
         session = ReviewSession.objects.create(**payload_serializer.validated_data)
-        next_question = _get_next_question(session)
+        next_question = get_next_question(session)
         payload = {
-            "session": ReviewSessionSerializer(session).data,
-            "next_question": ReviewQuestionSerializer(next_question).data
+            "session": flat_review_session(session),
+            "next_question": flat_review_question(next_question)
             if next_question
             else None,
         }
         return Response(payload, status=status.HTTP_201_CREATED)
 
 
-class NextQuestionView(APIView):
+class NextQuestionView(ReadOnlyViewMixin, APIView):
     authentication_classes: list = []
     permission_classes: list = []
 
     def get(self, request, session_id):
-        try:
-            session = ReviewSession.objects.get(id=session_id)
-        except ReviewSession.DoesNotExist:
+        session = get_review_session(session_id)
+        if session is None:
             return Response({"detail": "Session not found."}, status=404)
+        validators = next_question_validators(session)
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
 
-        next_question = _get_next_question(session)
+        next_question = get_next_question(session)
         if not next_question:
-            return Response(
+            return validators.apply(
+                Response(
+                    {
+                        "session": flat_review_session(session),
+                        "completed": True,
+                        "next_question": None,
+                    }
+                )
+            )
+
+        return validators.apply(
+            Response(
                 {
-                    "session": ReviewSessionSerializer(session).data,
-                    "completed": True,
-                    "next_question": None,
+                    "session": flat_review_session(session),
+                    "completed": False,
+                    "next_question": flat_review_question(next_question),
                 }
             )
-
-        return Response(
-            {
-                "session": ReviewSessionSerializer(session).data,
-                "completed": False,
-                "next_question": ReviewQuestionSerializer(next_question).data,
-            }
         )
 
 
@@ -87,14 +91,14 @@ class SessionContactView(APIView):
         serializer.is_valid(raise_exception=True)
 
         session_id = serializer.validated_data["review_session_id"]
-        try:
-            session = ReviewSession.objects.get(id=session_id)
-        except ReviewSession.DoesNotExist:
+        session = get_review_session(session_id)
+        if session is None:
             return Response({"detail": "Session not found."}, status=404)
 
         session.email = serializer.validated_data["email"]
         session.phone_number = serializer.validated_data["phone_number"]
         session.save(update_fields=["email", "phone_number", "updated_at"])
+        invalidate_review_session(session.id)
 
         return Response(
             {
@@ -105,14 +109,13 @@ class SessionContactView(APIView):
         )
 
 
-class SessionContactDetailView(APIView):
+class SessionContactDetailView(ReadOnlyViewMixin, APIView):
     authentication_classes: list = []
     permission_classes: list = []
 
     def get(self, request, review_session_id):
-        try:
-            session = ReviewSession.objects.get(id=review_session_id)
-        except ReviewSession.DoesNotExist:
+        session = get_review_session(review_session_id)
+        if session is None:
             return Response({"detail": "Session not found."}, status=404)
 
         email = session.email or None
@@ -134,9 +137,8 @@ class SubmitAnswerView(APIView):
     permission_classes: list = []
 
     def post(self, request, session_id):
-        try:
-            session = ReviewSession.objects.get(id=session_id)
-        except ReviewSession.DoesNotExist:
+        session = get_review_session(session_id)
+        if session is None:
             return Response({"detail": "Session not found."}, status=404)
 
         if session.completed_at:
@@ -147,58 +149,31 @@ class SubmitAnswerView(APIView):
 
         serializer = SubmitAnswerSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        question_id = serializer.validated_data["question_id"]
-        answer_text = serializer.validated_data.get("answer_text", "")
-        audio_file = serializer.validated_data.get("audio_file")
-
         try:
-            question = ReviewQuestion.objects.get(id=question_id, is_active=True)
-        except ReviewQuestion.DoesNotExist:
-            return Response({"detail": "Question not found."}, status=404)
-
-        expected_question = _get_next_question(session)
-        if expected_question and question.id != expected_question.id:
-            return Response(
-                {
-                    "detail": "Answers must be submitted in order.",
-                    "expected_question_id": expected_question.id,
-                },
-                status=status.HTTP_400_BAD_REQUEST,
+            submitted = submit_answer(
+                session,
+                question_id=serializer.validated_data["question_id"],
+                answer_text=serializer.validated_data.get("answer_text", ""),
+                audio_file=serializer.validated_data.get("audio_file"),
+                shed=True,
             )
-        if not expected_question and not session.completed_at:
+        except AnswerRejected as exc:
+            return Response(exc.payload, status=exc.status_code)
+        except AnalysisOverloaded as exc:
+            # Raised before the answer is written; the client resubmits it.
             return Response(
-                {"detail": "All questions already answered."},
-                status=status.HTTP_400_BAD_REQUEST,
+                exc.payload,
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(exc.retry_after)},
             )
-
-        answer, created = ReviewAnswer.objects.get_or_create(
-            session=session,
-            question=question,
-            defaults={"answer_text": answer_text, "audio_file": audio_file},
-        )
-        if not created:
-            answer.answer_text = answer_text
-            if audio_file:
-                answer.audio_file = audio_file
-            update_fields = ["answer_text"]
-            if audio_file:
-                update_fields.append("audio_file")
-            answer.save(update_fields=update_fields)
-
-        next_question = _get_next_question(session)
-        if not next_question:
-            if not session.completed_at:
-                session.completed_at = timezone.now()
-                session.save(update_fields=["completed_at", "updated_at"])
-                enqueue_analysis_for_session(session)
+        answer = submitted.answer
+        next_question = submitted.next_question
 
         return Response(
             {
-                "session": ReviewSessionSerializer(session).data,
-                "answer": ReviewAnswerSerializer(
-                    answer, context={"request": request}
-                ).data,
-                "next_question": ReviewQuestionSerializer(next_question).data
+                "session": flat_review_session(session),
+                "answer": flat_review_answer(answer, {"request": request}),
+                "next_question": flat_review_question(next_question)
                 if next_question
                 else None,
                 "completed": next_question is None,
@@ -216,9 +191,8 @@ class MeetingRequestCreateView(APIView):
         serializer.is_valid(raise_exception=True)
 
         session_id = serializer.validated_data["review_session_id"]
-        try:
-            session = ReviewSession.objects.get(id=session_id)
-        except ReviewSession.DoesNotExist:
+        session = get_review_session(session_id)
+        if session is None:
             return Response({"detail": "Session not found."}, status=404)
 
         if not session.email or not session.phone_number:
@@ -231,21 +205,42 @@ class MeetingRequestCreateView(APIView):
 
         meeting_request = MeetingRequest.objects.create(review_session=session)
         return Response(
-            MeetingRequestSerializer(meeting_request).data,
+            flat_meeting_request(meeting_request),
             status=status.HTTP_201_CREATED,
         )
 
 
-class MeetingRequestListView(APIView):
+class MeetingRequestListView(ReadOnlyViewMixin, APIView):
     authentication_classes: list = []
     permission_classes: list = []
 
     def get(self, request, review_session_id):
-        try:
-            session = ReviewSession.objects.get(id=review_session_id)
-        except ReviewSession.DoesNotExist:
+        version = primary_on_miss(
+            lambda: ReviewSession.objects.filter(id=review_session_id)
+            .order_by()
+            .annotate(
+                requests_changed_at=Max("meeting_requests__updated_at"),
+                request_count=Count("meeting_requests"),
+            )
+            .values_list("updated_at", "requests_changed_at", "request_count")
+            .first()
+        )
+        if version is None:
             return Response({"detail": "Session not found."}, status=404)
-
-        meeting_requests = session.meeting_requests.order_by("-created_at")
-        serializer = MeetingRequestSerializer(meeting_requests, many=True)
-        return Response(serializer.data)
+        updated_at, requests_changed_at, request_count = version
+        validators = Validators(
+            "meeting-requests",
+            updated_at.isoformat(),
+            requests_changed_at.isoformat() if requests_changed_at else None,
+            request_count,
+        )
+        not_modified = validators.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+
+        rows = (
+            MeetingRequest.objects.filter(review_session_id=review_session_id)
+            .order_by("-created_at")
+            .values(*flat_meeting_request.row_keys())
+        )
+        return validators.apply(Response(flat_meeting_request.rows(rows)))